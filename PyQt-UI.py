@@ -1,49 +1,227 @@
 import sys
-import os
-import requests
+import json
+import threading
+from collections import deque
 from dotenv import load_dotenv
 from PyQt5.QtWidgets import (QApplication, QLabel, QWidget, QVBoxLayout, QPushButton, QListWidget,
                              QHBoxLayout, QMessageBox, QLineEdit, QSpinBox, QProgressBar)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThread, QThreadPool, QTimer, pyqtSignal
 
 load_dotenv()
 
-class BaseWorker(QThread):
-    request_finished = pyqtSignal(str, bool)
+from dcc_client import get_client
+
+SEARCH_DEBOUNCE_MS = 250
+SEARCH_LIMIT = 50
+# The server sends a heartbeat every 15 s, so a read that waits 20 s means the
+# connection is dead; closing the window waits at most FEED_STOP_WAIT_MS for the feed
+FEED_READ_TIMEOUT = 20
+FEED_STOP_WAIT_MS = 2000
 
+class BaseWorker(QThread):
     def __init__(self, action, payload=None):
         super().__init__()
-        self.flask_url = os.getenv('FLASK_URL')
-        self.port = os.getenv('PORT')
-        self.url = f"{self.flask_url}:{self.port}/"
+        self.client = get_client()
         self.action = action
         self.payload = payload
 
-class ServerWorker(BaseWorker):
-    data_fetched = pyqtSignal(dict)
-    
+def perform_request(client, action, payload):
+    """Run one API call; returns (success, data). Called on a pool thread.
+
+    For writes ``data`` is the payload that was sent.
+    """
+    if action == "get_all":
+        response = client.get("get-all-items", params={'stream': 'ndjson'}, stream=True)
+        if response.status_code != 200:
+            return False, None
+        data_dict = {}
+        for line in response.iter_lines():
+            if line:
+                item = json.loads(line)
+                data_dict[item[1]] = item[2]
+        version = response.headers.get('X-Inventory-Version')
+        return True, {"items": data_dict, "version": int(version) if version else None}
+    if action == "changes":
+        since = payload["since"]
+        response = client.get("get-all-items", params={'since': since}, headers={'If-None-Match': f'"inv-{since}"'})
+        if response.status_code == 304:
+            return True, {"changes": [], "version": since}
+        return response.status_code == 200, response.json() if response.status_code == 200 else None
+    if action == "get_item":
+        response = client.get("get-item", params={'name': payload["name"]})
+        if response.status_code == 404:
+            return True, {"name": payload["name"], "quantity": None}
+        if response.status_code != 200:
+            return False, None
+        return True, {"name": payload["name"], "quantity": response.json()["res"][2]}
+    if action == "search":
+        response = client.get("search", params=payload)
+        if response.status_code != 200:
+            return False, None
+        return True, {"q": payload["q"], "items": response.json()["res"]}
+    if action == "adjust":
+        response = client.post("adjust-quantity", json=payload)
+        if response.status_code != 200:
+            return False, None
+        return True, {"name": payload["name"], "quantity": response.json()["quantity"]}
+    if action == "add":
+        response = client.post("add-item", json=payload)
+    elif action == "update":
+        response = client.put("update-quantity", json=payload)
+    elif action == "delete":
+        response = client.delete("remove-item", json=payload)
+    else:
+        raise ValueError(f"Unknown action: {action}")
+    return response.status_code in [200, 201], payload
+
+class ApiRequest:
+    def __init__(self, action, payload, key, priority, callback):
+        self.action = action
+        self.payload = payload
+        self.key = key
+        self.priority = priority
+        self.callback = callback
+
+class ApiTask(QRunnable):
+    def __init__(self, dispatcher, request):
+        super().__init__()
+        self.dispatcher = dispatcher
+        self.request = request
+
     def run(self):
         try:
-            headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
-            if self.action == "get_all":
-                response = requests.get(self.url + "get-all-items", headers=headers)
-                if response.status_code == 200:
-                    data_dict = {item[1]: item[2] for item in response.json().get('res', [])}
-                    self.data_fetched.emit(data_dict)
-                else:
-                    self.data_fetched.emit({})
-            elif self.action == "add":
-                response = requests.post(self.url + "add-item", json=self.payload, headers=headers)
-            elif self.action == "update":
-                response = requests.put(self.url + "update-quantity", json=self.payload, headers=headers)
-            elif self.action == "delete":
-                response = requests.delete(self.url + "remove-item", json=self.payload, headers=headers)
-            
-            success = response.status_code in [200, 201]
-            self.request_finished.emit(self.action, success)
+            result, error = perform_request(self.dispatcher.client, self.request.action, self.request.payload), None
         except Exception as e:
-            print("Error in API request:", str(e))
-            self.request_finished.emit(self.action, False)
+            result, error = (False, None), e
+        self.dispatcher.finished.emit(self.request, result, error)
+
+class RequestDispatcher(QObject):
+    """Runs API calls on a bounded QThreadPool instead of a QThread per click.
+
+    Requests sharing a key (an item name, or "refresh" for reloads) run one
+    at a time in the order they were made, so an item's results come back
+    in order; different keys run in parallel, higher priorities first. A
+    coalescing request is dropped while an identical one is still waiting,
+    so a burst of refreshes costs at most one running and one queued load.
+    Callbacks run on the GUI thread.
+    """
+    PRIORITY_USER = 10
+    PRIORITY_REFRESH = 0
+
+    finished = pyqtSignal(object, object, object)
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, max_threads=4, parent=None):
+        super().__init__(parent)
+        self.client = get_client()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.lanes = {}
+        self.running = set()
+        self.pending = 0
+        self.finished.connect(self._on_finished)
+
+    def submit(self, action, payload=None, key=None, priority=PRIORITY_USER, callback=None, coalesce=False):
+        """Queue a request. ``payload`` may be a callable, evaluated when the request starts."""
+        key = action if key is None else key
+        lane = self.lanes.setdefault(key, deque())
+        if coalesce and any(queued.action == action for queued in lane):
+            return None
+        request = ApiRequest(action, payload, key, priority, callback)
+        lane.append(request)
+        self._add_pending(1)
+        if key not in self.running:
+            self._start_next(key)
+        return request
+
+    def _start_next(self, key):
+        lane = self.lanes.get(key)
+        if not lane:
+            self.lanes.pop(key, None)
+            return
+        request = lane.popleft()
+        if callable(request.payload):
+            request.payload = request.payload()
+        self.running.add(key)
+        self.pool.start(ApiTask(self, request), request.priority)
+
+    def _on_finished(self, request, result, error):
+        self.running.discard(request.key)
+        self._add_pending(-1)
+        if error is not None:
+            print("Error in API request:", str(error))
+        if request.callback:
+            request.callback(*result)
+        self._start_next(request.key)
+
+    def _add_pending(self, delta):
+        was_busy = self.pending > 0
+        self.pending += delta
+        if was_busy != (self.pending > 0):
+            self.busy_changed.emit(self.pending > 0)
+
+    def shutdown(self, timeout_ms=2000):
+        self.lanes.clear()
+        self.pool.waitForDone(timeout_ms)
+
+class ChangeFeedWorker(BaseWorker):
+    """Listens to the server's change feed and reports each inventory change."""
+    change_received = pyqtSignal(dict)
+    resync_required = pyqtSignal()
+
+    def __init__(self):
+        super().__init__("feed")
+        self.version = None
+        self.stopping = threading.Event()
+        self.response = None
+
+    def stop(self):
+        """Stop listening; a blocked read ends by the next heartbeat or the read timeout."""
+        self.stopping.set()
+        response = self.response
+        if response is not None:
+            response.close()
+
+    def dispatch(self, event, data):
+        if event == "change":
+            change = json.loads(data)
+            self.version = change["version"]
+            self.change_received.emit(change)
+        elif event == "resync":
+            self.version = None
+            self.resync_required.emit()
+
+    def run(self):
+        retry_delay = 1
+        while not self.stopping.is_set():
+            headers = {'Accept': 'text/event-stream'}
+            if self.version is not None:
+                headers['Last-Event-ID'] = str(self.version)
+            try:
+                self.response = self.client.get("changes/stream", headers=headers, stream=True,
+                                                timeout=(5, FEED_READ_TIMEOUT))
+                event, data = "message", []
+                for line in self.response.iter_lines(chunk_size=None, decode_unicode=True):
+                    if self.stopping.is_set():
+                        break
+                    if line == "":
+                        if data:
+                            self.dispatch(event, "\n".join(data))
+                        event, data = "message", []
+                    elif line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        data.append(line[5:].strip())
+                    retry_delay = 1
+            except Exception as e:
+                if not self.stopping.is_set():
+                    print("Change feed disconnected:", str(e))
+            finally:
+                if self.response is not None:
+                    self.response.close()
+            if self.stopping.wait(retry_delay):
+                break
+            retry_delay = min(retry_delay * 2, 30)
 
 class InventoryApp(QWidget):
     def __init__(self):
@@ -51,9 +229,23 @@ class InventoryApp(QWidget):
         self.setWindowTitle("Inventory Management")
         self.resize(400, 350)
         self.setStyleSheet("background-color: #2E3440; color: white; font-size: 14px;")
+        # Optimistic model: inventory is what the list shows, confirmed is the
+        # server's last known value, in_flight counts unacknowledged writes
         self.inventory = {}
+        self.confirmed = {}
+        self.in_flight = {}
+        self.stale = set()
+        self.version = None
+        # Version of the last feed change applied to each item
+        self.item_versions = {}
+        self.dispatcher = RequestDispatcher(parent=self)
+        self.dispatcher.busy_changed.connect(self.showSpinner)
         self.initUI()
         self.loadInventory()
+        self.feed = ChangeFeedWorker()
+        self.feed.change_received.connect(self.applyChange)
+        self.feed.resync_required.connect(self.reconcile)
+        self.feed.start()
     
     def initUI(self):
         self.layout = QVBoxLayout()
@@ -62,6 +254,14 @@ class InventoryApp(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Enter item name")
         self.search_layout.addWidget(self.search_input)
+
+        # Search as you type, asking the server once typing pauses
+        self.search_results = None
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.runSearch)
+        self.search_input.textChanged.connect(self.search_timer.start)
         
         self.quantity_input = QSpinBox()
         self.quantity_input.setRange(1, 100)
@@ -99,7 +299,7 @@ class InventoryApp(QWidget):
         
         refresh_layout = QVBoxLayout()
         self.refresh_button = QPushButton("Refresh")
-        self.refresh_button.clicked.connect(self.loadInventory)
+        self.refresh_button.clicked.connect(self.reconcile)
 
         refresh_layout.addWidget(self.refresh_button)
         refresh_layout.addStretch()  # Adds space below the button
@@ -118,26 +318,130 @@ class InventoryApp(QWidget):
         self.spinner.setVisible(show)
     
     def loadInventory(self):
-        self.showSpinner(True)
-        self.worker = ServerWorker("get_all")
-        self.worker.data_fetched.connect(self.populateInventory)
-        self.worker.request_finished.connect(lambda action, success: self.showSpinner(False))
-        self.worker.start()
-    
-    def populateInventory(self, items):
-        self.inventory = items
+        self.dispatcher.submit("get_all", key="refresh", priority=RequestDispatcher.PRIORITY_REFRESH,
+                               callback=self.populateInventory, coalesce=True)
+
+    def reconcile(self):
+        """Catch up with the server from the last seen version, or reload when that is too old."""
+        if self.version is None:
+            self.loadInventory()
+            return
+        self.dispatcher.submit("changes", {"since": self.version}, key="refresh",
+                               priority=RequestDispatcher.PRIORITY_REFRESH, callback=self.applyChanges,
+                               coalesce=True)
+
+    def populateInventory(self, success, data):
+        if not success:
+            return
+        items = data["items"]
+        snapshot = data["version"]
+        # The feed may have applied changes newer than this snapshot while it
+        # was loading; those items keep the feed's value
+        def fresh(name):
+            return snapshot is None or self.item_versions.get(name, 0) <= snapshot
+        for name in list(self.inventory):
+            if name not in items and fresh(name):
+                self.applyServerValue(name, None)
+        for name, qty in items.items():
+            if fresh(name):
+                self.applyServerValue(name, qty)
+        if snapshot is not None:
+            self.version = max(self.version or 0, snapshot)
+
+    def applyChanges(self, success, data):
+        if not success:
+            self.loadInventory()
+            return
+        for change in data["changes"]:
+            self.applyChange(change)
+        self.version = max(self.version or 0, data["version"])
+
+    def applyChange(self, change):
+        self.version = max(self.version or 0, change["version"])
+        self.item_versions[change["name"]] = change["version"]
+        self.applyServerValue(change["name"], None if change["op"] == "delete" else change["quantity"])
+
+    def applyServerValue(self, name, quantity):
+        """Take the server's value for an item unless local writes to it are still in flight."""
+        if self.in_flight.get(name):
+            # Checked again once our writes to this item have landed
+            self.stale.add(name)
+            return
+        self.confirmed[name] = quantity
+        self.showQuantity(name, quantity)
+
+    def showQuantity(self, name, quantity):
+        """Update one item in the local state and the list; None removes it."""
+        rows = self.inventory_list.findItems(name, Qt.MatchExactly)
+        if quantity is None:
+            self.inventory.pop(name, None)
+            for row in rows:
+                self.inventory_list.takeItem(self.inventory_list.row(row))
+        else:
+            self.inventory[name] = quantity
+            if not rows and (self.search_results is None or name in self.search_results):
+                self.inventory_list.addItem(name)
+
+    def runSearch(self):
+        if not self.search_input.text().strip():
+            self.search_results = None
+            self.showList(list(self.inventory))
+            return
+        # The query is read when the request starts, so a queued search always uses the latest text
+        self.dispatcher.submit("search", lambda: {"q": self.search_input.text().strip(), "limit": SEARCH_LIMIT},
+                               key="search", callback=self.showSearchResults, coalesce=True)
+
+    def showSearchResults(self, success, data):
+        if not success or data["q"] != self.search_input.text().strip():
+            return
+        self.search_results = {name for _, name, _ in data["items"]}
+        for _, name, quantity in data["items"]:
+            self.applyServerValue(name, quantity)
+        self.showList([name for _, name, _ in data["items"] if name in self.inventory])
+
+    def showList(self, names):
         self.inventory_list.clear()
-        for item, qty in items.items():
-            self.inventory_list.addItem(f"{item}")
+        self.inventory_list.addItems(names)
+
+    def closeEvent(self, event):
+        self.feed.stop()
+        self.feed.wait(FEED_STOP_WAIT_MS)
+        self.dispatcher.shutdown()
+        super().closeEvent(event)
+
+    def write(self, item, action, payload, quantity):
+        """Apply a change locally at once and send it in the background."""
+        self.in_flight[item] = self.in_flight.get(item, 0) + 1
+        self.showQuantity(item, quantity)
+        self.dispatcher.submit(action, payload, key=item,
+                               callback=lambda success, data: self.writeFinished(action, success, item, quantity, data))
+
+    def writeFinished(self, action, success, item, quantity, data):
+        self.in_flight[item] -= 1
+        if success:
+            # Deltas answer with the server's resulting quantity
+            self.confirmed[item] = data["quantity"] if action == "adjust" else quantity
+        else:
+            # Roll back to what the server last confirmed, and re-read the
+            # item once its other writes have landed
+            self.showQuantity(item, self.confirmed.get(item))
+            self.stale.add(item)
+            QMessageBox.warning(self, "Error", f"Failed to {action} item: {item}")
+        if self.in_flight[item] == 0:
+            del self.in_flight[item]
+            if item not in self.stale:
+                self.showQuantity(item, self.confirmed.get(item))
+            else:
+                self.stale.discard(item)
+                self.dispatcher.submit("get_item", {"name": item}, key=item,
+                                       priority=RequestDispatcher.PRIORITY_REFRESH,
+                                       callback=lambda ok, data: ok and self.applyServerValue(item, data["quantity"]))
     
     def addItem(self):
         item_name = self.search_input.text().strip()
         quantity = self.quantity_input.value()
         if item_name and item_name not in self.inventory:
-            self.showSpinner(True)
-            self.worker = ServerWorker("add", {"name": item_name, "quantity": quantity})
-            self.worker.request_finished.connect(lambda action, success: self.handleResponse(action, success, item_name, quantity))
-            self.worker.start()
+            self.write(item_name, "add", {"name": item_name, "quantity": quantity}, quantity)
         self.search_input.clear()
         self.quantity_input.clear()
     
@@ -148,52 +452,24 @@ class InventoryApp(QWidget):
     def buyItem(self):
         item = self.getSelectedItem()
         if item:
-            self.showSpinner(True)
-            self.worker = ServerWorker("update", {"name": item, "quantity": self.inventory[item] + 1})
-            self.worker.request_finished.connect(lambda action, success: self.handleResponse(action, success, item, 1))
-            self.worker.start()
+            self.write(item, "adjust", {"name": item, "delta": 1}, self.inventory[item] + 1)
     
     def returnItem(self):
         item = self.getSelectedItem()
         if item and self.inventory[item] > 1:
-            self.showSpinner(True)
-            self.worker = ServerWorker("update", {"name": item, "quantity": self.inventory[item] - 1})
-            self.worker.request_finished.connect(lambda action, success: self.handleResponse(action + 'R', success, item, -1))
-            self.worker.start()
+            self.write(item, "adjust", {"name": item, "delta": -1, "min": 1}, self.inventory[item] - 1)
         elif item:
             self.deleteItem()
     
     def deleteItem(self):
         item = self.getSelectedItem()
         if item:
-            self.showSpinner(True)
-            self.worker = ServerWorker("delete", {"name": item})
-            self.worker.request_finished.connect(lambda action, success: self.handleResponse(action, success, item, 0))
-            self.worker.start()
+            self.write(item, "delete", {"name": item}, None)
     
     def showStatus(self):
         status = "\n".join([f"{item}: {qty}" for item, qty in self.inventory.items()])
         QMessageBox.information(self, "Inventory Status", status)
     
-    def handleResponse(self, action, success, item, quantity):
-        if success:
-            if action == "add":
-                self.inventory[item] = quantity
-                self.inventory_list.addItem(f"{item} ({quantity})")
-            elif action == "update":
-                self.inventory[item] += quantity
-                self.loadInventory()  # Refresh list
-            elif action == "delete":
-                self.inventory.pop(item, None)
-                self.loadInventory()
-            elif action == "updateR":
-                self.inventory[item] -= 1
-                if self.inventory[item] == 0:
-                    self.inventory.pop(item)
-                self.loadInventory()
-        else:
-            QMessageBox.warning(self, "Error", f"Failed to {action} item: {item}")
-    
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = InventoryApp()
@@ -0,0 +1,190 @@
+import asyncio
+import concurrent.futures
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_DONE = object()
+
+
+class WSGIAdapter:
+    """Serve a WSGI app (the Flask app) from an ASGI server such as uvicorn.
+
+    The event loop only parses requests and writes responses. Handlers, and
+    the SQLite calls they make, run on a bounded thread pool of
+    ``max_workers`` threads; requests beyond that wait on the loop without
+    holding a thread. Buffered responses are sent in one piece.
+
+    Streamed responses (no Content-Length, e.g. the SSE change feed) can
+    block between chunks for as long as the client stays connected, so each
+    one is pulled on its own thread rather than a pool worker, and at most
+    ``max_streams`` run at once (503 beyond that). When the client
+    disconnects the stream is closed as soon as its current chunk returns.
+    """
+
+    def __init__(self, wsgi_app, max_workers=32, max_body_size=64 * 1024 * 1024, max_streams=100):
+        self.wsgi_app = wsgi_app
+        self.max_body_size = max_body_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='wsgi-worker')
+        self.max_streams = max_streams
+        self._streams = threading.BoundedSemaphore(max_streams)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._handle_http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, receive):
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    def _environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+            'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin1').upper().replace('-', '_')
+            value = value.decode('latin1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'CONTENT_LENGTH':
+                key = f'HTTP_{name}'
+                environ[key] = f'{environ[key]},{value}' if key in environ else value
+        return environ
+
+    def _call_app(self, environ):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(k.lower().encode('latin1'), v.encode('latin1')) for k, v in headers]
+            return lambda data: None
+
+        result = self.wsgi_app(environ, start_response)
+        buffered = any(k == b'content-length' for k, _ in response.get('headers', []))
+        if buffered:
+            try:
+                return response, b''.join(result), None
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        return response, None, result
+
+    async def _handle_http(self, scope, receive, send):
+        body = await self._read_body(receive)
+        if body is None:
+            await send({'type': 'http.response.start', 'status': 413, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        loop = asyncio.get_running_loop()
+        response, content, iterable = await loop.run_in_executor(
+            self.executor, self._call_app, self._environ(scope, body))
+
+        if iterable is None:
+            await send({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+            await send({'type': 'http.response.body', 'body': content})
+            return
+
+        if not self._streams.acquire(blocking=False):
+            await loop.run_in_executor(self.executor, self._close, iterable)
+            await send({'type': 'http.response.start', 'status': 503, 'headers': [(b'retry-after', b'5')]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        await send({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+        await self._stream(iterable, receive, send, loop)
+
+    @staticmethod
+    def _close(iterable):
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+    def _pump(self, iterable, chunks, stop, loop):
+        """Pull chunks on this thread and hand them to the loop until done or told to stop."""
+        try:
+            for chunk in iterable:
+                if stop.is_set():
+                    break
+                if not chunk:
+                    continue
+                future = asyncio.run_coroutine_threadsafe(chunks.put(chunk), loop)
+                while True:
+                    try:
+                        future.result(timeout=1.0)
+                        break
+                    except concurrent.futures.TimeoutError:
+                        if stop.is_set():
+                            future.cancel()
+                            return
+        finally:
+            self._close(iterable)
+            self._streams.release()
+            if not stop.is_set():
+                asyncio.run_coroutine_threadsafe(chunks.put(_DONE), loop)
+
+    async def _stream(self, iterable, receive, send, loop):
+        chunks = asyncio.Queue(maxsize=16)
+        stop = threading.Event()
+        threading.Thread(target=self._pump, args=(iterable, chunks, stop, loop),
+                         name='wsgi-stream', daemon=True).start()
+
+        async def wait_for_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        disconnect = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            while True:
+                next_chunk = asyncio.ensure_future(chunks.get())
+                await asyncio.wait([next_chunk, disconnect], return_when=asyncio.FIRST_COMPLETED)
+                if not next_chunk.done():
+                    next_chunk.cancel()
+                    return
+                chunk = next_chunk.result()
+                if chunk is _DONE:
+                    break
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            stop.set()
+            disconnect.cancel()
@@ -0,0 +1,89 @@
+"""Audit-log range queries over large item_log / delete_log tables.
+
+Fills both log tables with synthetic rows spread over a year, times
+fetching the first two pages of each query shape and prints the query plan
+of the SQL SQLiteDB.get_logs builds for it (it should name an idx_* index,
+not SCAN).
+
+    python benchmarks/bench_audit_logs.py --rows 2000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlDB import SQLiteDB
+
+START = datetime(2025, 1, 1)
+
+
+def fill(db, rows, items):
+    def timestamps(count):
+        step = 365 * 24 * 3600 / count
+        for i in range(count):
+            yield (START + timedelta(seconds=i * step)).strftime('%Y-%m-%d %H:%M:%S')
+
+    with db.get_db_connection() as conn:
+        conn.executemany(
+            'INSERT INTO item_log (item_name, old_quantity, new_quantity, updated_at) VALUES (?, ?, ?, ?)',
+            ((f'item_{random.randrange(items)}', i, i + 1, ts) for i, ts in enumerate(timestamps(rows)))
+        )
+        conn.executemany(
+            'INSERT INTO delete_log (item_name, quantity, deleted_at) VALUES (?, ?, ?)',
+            ((f'item_{random.randrange(items)}', i, ts) for i, ts in enumerate(timestamps(rows // 10)))
+        )
+        conn.commit()
+        conn.execute('ANALYZE')
+
+
+def plan(db, sql, params):
+    with db.get_db_connection() as conn:
+        return [row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteDB(os.path.join(tmp, 'logs.db'))
+        start = time.perf_counter()
+        fill(db, args.rows, args.items)
+        print(f"filled {args.rows} update + {args.rows // 10} delete rows in {time.perf_counter() - start:.1f}s\n")
+
+        queries = [
+            ('update, time range', dict(action='update', _from='2025-06-01', _to='2025-06-30')),
+            ('update, one item', dict(action='update', item='item_42')),
+            ('update, item + range', dict(action='update', item='item_42', _from='2025-03-01', _to='2025-09-01')),
+            ('delete, time range', dict(action='delete', _from='2025-11-01')),
+            ('all, time range', dict(action='all', _from='2025-06-01', _to='2025-06-02')),
+        ]
+        for label, query in queries:
+            t0 = time.perf_counter()
+            status, rows, cursor = db.get_logs(limit=args.limit, **query)
+            first = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            if cursor:
+                db.get_logs(limit=args.limit, cursor=cursor, **query)
+            second = time.perf_counter() - t0
+            print(f"{label:>22}: {len(rows):4d} rows  page 1 {first * 1000:7.2f} ms  page 2 {second * 1000:7.2f} ms")
+
+        print('\nquery plans of the SQL get_logs runs (each branch should use an idx_* index, not SCAN):')
+        for label, query in queries:
+            sql, params = db.log_query(limit=args.limit, **query)
+            print(f"  {label}")
+            for line in plan(db, sql, params):
+                print(f"    {line}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
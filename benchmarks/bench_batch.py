@@ -0,0 +1,56 @@
+"""Throughput of the batch SQLiteDB methods against one item per call.
+
+The per-call path is what /add-item, /update-quantity and /remove-item do
+today (one statement and one commit each); the batch path is what
+/add-items, /update-quantities and /remove-items do.
+
+    python benchmarks/bench_batch.py --items 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlDB import SQLiteDB
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--profile', default='wal')
+    args = parser.parse_args()
+
+    items = [{'name': f'item_{i}', 'quantity': i} for i in range(args.items)]
+    updates = [{'name': item['name'], 'quantity': item['quantity'] + 1} for item in items]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        single = SQLiteDB(os.path.join(tmp, 'single.db'), profile=args.profile)
+        batch = SQLiteDB(os.path.join(tmp, 'batch.db'), profile=args.profile)
+
+        rows = [
+            ('add', timed(lambda: [single.add_item(i) for i in items]),
+             timed(lambda: batch.add_items(items))),
+            ('update', timed(lambda: [single.update_qty(i) for i in updates]),
+             timed(lambda: batch.update_qtys(updates))),
+            ('remove', timed(lambda: [single.remove_item(i) for i in items]),
+             timed(lambda: batch.remove_items(items))),
+        ]
+        single.close()
+        batch.close()
+
+    print(f"{'op':>8} {'per-call items/s':>18} {'batch items/s':>15} {'speedup':>8}")
+    for op, per_call, batched in rows:
+        print(f"{op:>8} {args.items / per_call:18.0f} {args.items / batched:15.0f} {per_call / batched:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
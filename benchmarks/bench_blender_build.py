@@ -0,0 +1,62 @@
+"""Scene build time of the operator-based path versus build_item_objects.
+
+Runs inside Blender, without the server:
+
+    blender -b --factory-startup --python benchmarks/bench_blender_build.py -- --sizes 100 1000 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dcc_plugin import ITEM_SPACING, build_item_objects
+
+
+def build_with_operators(collection, data):
+    """The previous per-item path: one primitive_cube_add call per row."""
+    for i, item in enumerate(data):
+        bpy.ops.mesh.primitive_cube_add(size=1.0)
+        cube = bpy.context.active_object
+        bpy.context.scene.collection.objects.unlink(cube)
+        collection.objects.link(cube)
+        cube.name = f"{item[1]}_{item[2]}"
+        cube.location = (i * ITEM_SPACING, 0, 0)
+        cube["item_name"] = item[1]
+        cube["quantity"] = item[2]
+
+
+def fresh_collection():
+    collection = bpy.data.collections.get("Database_Items")
+    if collection is None:
+        collection = bpy.data.collections.new("Database_Items")
+        bpy.context.scene.collection.children.link(collection)
+    bpy.data.batch_remove(list(collection.objects))
+    bpy.data.batch_remove([m for m in bpy.data.meshes if m.users == 0])
+    return collection
+
+
+def main():
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='*', default=[100, 1000, 10000])
+    args = parser.parse_args(argv)
+
+    print(f"{'items':>7} {'operators s':>12} {'batched s':>10} {'speedup':>8}")
+    for size in args.sizes:
+        data = [(i + 1, f'item_{i}', i) for i in range(size)]
+        timings = []
+        for build in (build_with_operators, build_item_objects):
+            collection = fresh_collection()
+            start = time.perf_counter()
+            build(collection, data)
+            bpy.context.view_layer.update()
+            timings.append(time.perf_counter() - start)
+        print(f"{size:7d} {timings[0]:12.3f} {timings[1]:10.3f} {timings[0] / timings[1]:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
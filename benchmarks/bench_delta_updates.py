@@ -0,0 +1,63 @@
+"""Lost updates and throughput of concurrent increments to one hot item.
+
+Compares the old client-side read-modify-write (GET /get-item, then PUT
+/update-quantity with the absolute value) with POST /adjust-quantity.
+Start the server first:
+
+    python flask-app.py
+    python benchmarks/bench_delta_updates.py --url http://127.0.0.1:8000 --clients 32 --increments 100
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dcc_client import DCCClient
+
+
+def read_modify_write(client, name):
+    quantity = client.get('get-item', params={'name': name}).json()['res'][2]
+    client.put('update-quantity', json={'name': name, 'quantity': quantity + 1})
+
+
+def delta(client, name):
+    client.post('adjust-quantity', json={'name': name, 'delta': 1})
+
+
+def run(url, increment, clients, increments):
+    setup = DCCClient(url)
+    name = f'hot_{increment.__name__}_{time.time_ns()}'
+    setup.post('add-item', json={'name': name, 'quantity': 0})
+
+    def worker(_):
+        client = DCCClient(url, retries=0)
+        for _ in range(increments):
+            increment(client, name)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(worker, range(clients)))
+    elapsed = time.perf_counter() - start
+    final = setup.get('get-item', params={'name': name}).json()['res'][2]
+    return elapsed, final
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--increments', type=int, default=100, help='per client')
+    args = parser.parse_args()
+
+    expected = args.clients * args.increments
+    print(f"{'path':>18} {'increments/s':>13} {'final':>7} {'lost':>6}")
+    for increment in (read_modify_write, delta):
+        elapsed, final = run(args.url, increment, args.clients, args.increments)
+        print(f"{increment.__name__:>18} {expected / elapsed:13.0f} {final:7d} {expected - final:6d}")
+
+
+if __name__ == '__main__':
+    main()
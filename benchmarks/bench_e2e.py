@@ -0,0 +1,303 @@
+"""End-to-end throughput, latency and memory of every API against a fresh server.
+
+Starts flask-app.py on a free local port with a temporary database, seeds
+``--items`` items and transforms, then drives each scenario at each
+``--concurrency`` with loadgen and samples the server's resident memory.
+Results (req/s, p50/p95/p99, errors, memory) are printed and written as
+JSON; ``--compare`` prints the change against an earlier results file.
+
+    python benchmarks/bench_e2e.py --items 10000 --concurrency 1 10 50
+    python benchmarks/bench_e2e.py --compare benchmarks/results/e2e-<commit>-<time>.json
+
+Everything runs on localhost. ``--env KEY=VALUE`` passes settings to the
+server (e.g. --env METRICS_ENABLED=0) so configurations can be compared.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from loadgen import Request, run_load, summarize
+from transform_codec import CONTENT_TYPE, encode_transforms
+
+SEED_BATCH = 1000
+TRANSFORM_BATCH = 500
+# Never route the readiness check through an HTTP(S)_PROXY from the environment
+LOCAL_OPENER = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+def transform_arrays(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-100, 100, (count, 3)), rng.uniform(-3.2, 3.2, (count, 3)), rng.uniform(0.1, 4, (count, 3))
+
+
+def transform_body(name, i):
+    return {'object': name, 'item_name': name, 'position': [i % 100, 0, 0], 'rotation': [0, 0, 0], 'scale': [1, 1, 1]}
+
+
+def scenarios(items):
+    """Scenario name -> factory(tag) returning make_request(i).
+
+    ``tag`` keeps the names created by add-item unique per run so that
+    remove-item, which runs after it, deletes exactly those.
+    """
+    def item(i):
+        return f'item_{i % items}'
+
+    location, rotation, scale = transform_arrays(TRANSFORM_BATCH)
+    binary = encode_transforms([f'item_{i}' for i in range(TRANSFORM_BATCH)], location, rotation, scale)
+
+    return {
+        'add-item': lambda tag: lambda i: Request('POST', '/add-item', {'name': f'bench_{tag}_{i}', 'quantity': 1}),
+        'add-items': lambda tag: lambda i: Request(
+            'POST', '/add-items', [{'name': f'batch_{tag}_{i}_{j}', 'quantity': 1} for j in range(100)]),
+        'update-quantity': lambda tag: lambda i: Request('PUT', '/update-quantity', {'name': item(i), 'quantity': i}),
+        'adjust-quantity': lambda tag: lambda i: Request('POST', '/adjust-quantity', {'name': item(i), 'delta': 1}),
+        'get-item': lambda tag: lambda i: Request('GET', f'/get-item?name={item(i)}'),
+        'get-all-items-page': lambda tag: lambda i: Request('GET', f'/get-all-items?limit=100&after_id={i % items}'),
+        'get-all-items': lambda tag: lambda i: Request('GET', '/get-all-items'),
+        'search': lambda tag: lambda i: Request('GET', f'/search?q=item_{i % 1000}&limit=20'),
+        'logs-update': lambda tag: lambda i: Request('GET', '/get-all-logs?action=update&limit=100'),
+        'logs-item': lambda tag: lambda i: Request('GET', f'/get-all-logs?action=all&item={item(i)}&limit=100'),
+        'logs-delete': lambda tag: lambda i: Request('GET', '/get-all-logs?action=delete&limit=100'),
+        'remove-item': lambda tag: lambda i: Request('DELETE', '/remove-item', {'name': f'bench_{tag}_{i}'}),
+        'transform': lambda tag: lambda i: Request('POST', '/transform', transform_body(item(i), i)),
+        'transforms-json': lambda tag: lambda i: Request('POST', '/transforms', {
+            'objects': [transform_body(f'item_{j}', i) for j in range(TRANSFORM_BATCH)]}),
+        'transforms-binary': lambda tag: lambda i: Request(
+            'POST', '/transforms', binary, {'Content-Type': CONTENT_TYPE}),
+        'transforms-get': lambda tag: lambda i: Request('GET', f'/transforms?name=item_{i % TRANSFORM_BATCH}'),
+        'transforms-nearest': lambda tag: lambda i: Request('GET', '/transforms/nearest?point=0,0,0&n=10'),
+        'transforms-box': lambda tag: lambda i: Request('GET', '/transforms/box?min=-10,-10,-10&max=10,10,10&limit=100'),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def descendants(pid):
+    """pid and its child processes, parents first (Linux /proc)."""
+    pids = [pid]
+    for parent in pids:
+        try:
+            with open(f'/proc/{parent}/task/{parent}/children') as f:
+                pids += [int(child) for child in f.read().split()]
+        except OSError:
+            pass
+    return pids
+
+
+def rss_mb(pid):
+    """Resident memory of the serving process: the innermost one when the dev reloader forks a child."""
+    try:
+        with open(f'/proc/{descendants(pid)[-1]}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class MemorySampler:
+    """Polls the server's RSS in a thread and keeps the peak."""
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_mb(self.pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_mb(self.pid))
+
+
+class Server:
+    """flask-app.py in a subprocess against a database in ``workdir``."""
+
+    def __init__(self, workdir, mode='dev', env=None):
+        self.port = free_port()
+        self.url = f'http://127.0.0.1:{self.port}'
+        self.log_path = os.path.join(workdir, 'server.log')
+        self.env = dict(
+            os.environ,
+            DATABASE=os.path.join(workdir, 'bench.db'),
+            FLASK_HOST='127.0.0.1',
+            FLASK_PORT=str(self.port),
+            SERVER_MODE=mode,
+            TRANSFORM_STORE_PATH='',
+            LOG_RETENTION_DAYS='',
+            LOG_MAX_ROWS='',
+            FAULT_CONFIG='',
+            DEBUG_DELAY='0',
+        )
+        self.env.update(env or {})
+        self.process = None
+
+    def start(self, timeout=30.0):
+        started = time.perf_counter()
+        with open(self.log_path, 'wb') as log:
+            self.process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, 'flask-app.py')],
+                                            cwd=REPO_DIR, env=self.env, stdout=log, stderr=subprocess.STDOUT)
+        while time.perf_counter() - started < timeout:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'server exited with {self.process.returncode}:\n{self.log_tail()}')
+            try:
+                with LOCAL_OPENER.open(f'{self.url}/', timeout=1):
+                    return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f'server did not start within {timeout}s:\n{self.log_tail()}')
+
+    def log_tail(self, lines=20):
+        with open(self.log_path, errors='replace') as f:
+            return ''.join(f.readlines()[-lines:])
+
+    def stop(self):
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def seed(url, items):
+    requests = [Request('POST', '/add-items', [{'name': f'item_{i}', 'quantity': 0}
+                                               for i in range(start, min(start + SEED_BATCH, items))])
+                for start in range(0, items, SEED_BATCH)]
+    location, rotation, scale = transform_arrays(items, seed=1)
+    for start in range(0, items, SEED_BATCH):
+        end = min(start + SEED_BATCH, items)
+        body = encode_transforms([f'item_{i}' for i in range(start, end)],
+                                 location[start:end], rotation[start:end], scale[start:end])
+        requests.append(Request('POST', '/transforms', body, {'Content-Type': CONTENT_TYPE}))
+    results, _ = asyncio.run(run_load(url, lambda i: requests[i], 1, len(requests)))
+    failed = [status for _, status, _ in results if not 200 <= status < 300]
+    if failed:
+        raise RuntimeError(f'seeding failed with statuses {sorted(set(failed))}')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(previous_path, results):
+    with open(previous_path) as f:
+        previous = {(r['scenario'], r['concurrency']): r for r in json.load(f)['results']}
+    print(f"\nchange vs {previous_path}")
+    print(f"{'scenario':>20} {'clients':>8} {'req/s':>9} {'p99 ms':>9} {'peak MB':>9}")
+    for r in results:
+        old = previous.get((r['scenario'], r['concurrency']))
+        if old is None:
+            continue
+        rps = (r['rps'] / old['rps'] - 1) * 100 if old['rps'] else 0.0
+        p99 = (r['p99_ms'] / old['p99_ms'] - 1) * 100 if old['p99_ms'] else 0.0
+        print(f"{r['scenario']:>20} {r['concurrency']:8d} {rps:+8.1f}% {p99:+8.1f}% "
+              f"{r['rss_peak_mb'] - old['rss_peak_mb']:+9.1f}")
+
+
+def main():
+    all_scenarios = list(scenarios(1))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000, help='items and transforms seeded before the run')
+    parser.add_argument('--concurrency', type=int, nargs='*', default=[1, 10, 50])
+    parser.add_argument('--requests', type=int, default=2000, help='per scenario and concurrency')
+    parser.add_argument('--duration', type=float, default=None, help='cap each scenario at this many seconds')
+    parser.add_argument('--scenarios', nargs='*', choices=all_scenarios, default=all_scenarios)
+    parser.add_argument('--mode', choices=['dev', 'asgi'], default='dev', help='SERVER_MODE of the server')
+    parser.add_argument('--env', nargs='*', default=[], metavar='KEY=VALUE', help='extra server settings')
+    parser.add_argument('--output', default=None, help='results file (default benchmarks/results/e2e-<commit>-<time>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    commit = git_commit()
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"e2e-{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    factories = scenarios(args.items)
+    results = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server = Server(workdir, args.mode, dict(kv.split('=', 1) for kv in args.env))
+        startup = server.start()
+        try:
+            idle = rss_mb(server.process.pid)
+            seed(server.url, args.items)
+            seeded = rss_mb(server.process.pid)
+            print(f"server {server.url} up in {startup:.2f}s, {idle:.1f} MB idle, {seeded:.1f} MB after seeding {args.items} items")
+            print(f"{'scenario':>20} {'clients':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                  f"{'errors':>7} {'peak MB':>8}")
+            for concurrency in args.concurrency:
+                for name in args.scenarios:
+                    make_request = factories[name](f'c{concurrency}')
+                    with MemorySampler(server.process.pid) as memory:
+                        run, elapsed = asyncio.run(run_load(server.url, make_request, concurrency,
+                                                            args.requests, args.duration))
+                    s = summarize(run, elapsed)
+                    s.update(scenario=name, concurrency=concurrency, seconds=elapsed,
+                             response_bytes=sum(r[2] for r in run) / len(run) if run else 0,
+                             rss_peak_mb=memory.peak, rss_end_mb=rss_mb(server.process.pid))
+                    results.append(s)
+                    print(f"{name:>20} {concurrency:8d} {s['rps']:9.0f} {s['p50_ms']:8.2f} {s['p95_ms']:8.2f} "
+                          f"{s['p99_ms']:8.2f} {s['errors']:7d} {s['rss_peak_mb']:8.1f}")
+            final = rss_mb(server.process.pid)
+        finally:
+            server.stop()
+
+    report = {
+        'commit': commit,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'config': {'items': args.items, 'requests': args.requests, 'duration': args.duration,
+                   'mode': args.mode, 'env': args.env},
+        'server': {'startup_s': startup, 'rss_idle_mb': idle, 'rss_seeded_mb': seeded, 'rss_final_mb': final},
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {output}")
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Per-request overhead of the fault-injection layer on the WSGI path.
+
+Compares a bare WSGI app, the app as installed with faults disabled (the
+production path), and the middleware with rules that match nothing.
+
+    python benchmarks/bench_fault_injection.py --requests 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fault_injection import FaultInjectionMiddleware, FaultRule, install
+
+BODY = [b'{"message": "hii"}']
+
+
+def app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'application/json')])
+    return BODY
+
+
+def start_response(status, headers, exc_info=None):
+    return None
+
+
+def per_call_ns(wsgi_app, requests):
+    environ = {'PATH_INFO': '/get-all-items', 'REQUEST_METHOD': 'GET'}
+    start = time.perf_counter_ns()
+    for _ in range(requests):
+        wsgi_app(environ, start_response)
+    return (time.perf_counter_ns() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200000)
+    args = parser.parse_args()
+
+    unmatched = [FaultRule(route='/transform*', latency={'distribution': 'fixed', 'ms': 100})]
+    variants = [
+        ('bare app', app),
+        ('installed, disabled', install(app)),
+        ('middleware, no match', FaultInjectionMiddleware(app, unmatched)),
+        ('middleware + headers', FaultInjectionMiddleware(app, unmatched, allow_headers=True)),
+    ]
+    baseline = None
+    for label, wsgi_app in variants:
+        ns = per_call_ns(wsgi_app, args.requests)
+        baseline = baseline or ns
+        print(f"{label:>22}: {ns:8.0f} ns/request  (+{ns - baseline:6.0f} ns)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Database size and write latency over a simulated year of inventory churn.
+
+Each simulated day applies a batch of quantity updates and deletes/re-adds
+through SQLiteDB (so the triggers fill item_log, delete_log and
+item_changes), re-stamps that day's log rows with the simulated date, and
+runs one retention pass. Without retention the file grows linearly; with it
+size and write latency level off once the retention window is full.
+
+    python benchmarks/bench_log_retention.py --days 365 --writes-per-day 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_retention import LogRetention, RetentionPolicy
+from sqlDB import SQLiteDB
+
+START = datetime(2025, 1, 1)
+
+
+def restamp(db, day):
+    """Move rows written 'today' to the simulated day."""
+    stamp = day.strftime('%Y-%m-%d 12:00:00')
+    with db.get_db_connection() as conn:
+        conn.execute('UPDATE item_log SET updated_at = ? WHERE updated_at > ?', (stamp, '2100-01-01'))
+        conn.execute('UPDATE delete_log SET deleted_at = ? WHERE deleted_at > ?', (stamp, '2100-01-01'))
+        conn.execute('UPDATE item_changes SET changed_at = ? WHERE changed_at > ?', (stamp, '2100-01-01'))
+        conn.commit()
+
+
+def file_size_mb(db):
+    with db.get_db_connection() as conn:
+        pages = conn.execute('PRAGMA page_count').fetchone()[0] - conn.execute('PRAGMA freelist_count').fetchone()[0]
+        return pages * conn.execute('PRAGMA page_size').fetchone()[0] / 1024 / 1024
+
+
+def simulate(path, days, writes_per_day, items, policy):
+    db = SQLiteDB(path)
+    # Stamp new rows far in the future so restamp() can find them.
+    with db.get_db_connection() as conn:
+        for table, column in (('item_log', 'updated_at'), ('delete_log', 'deleted_at'), ('item_changes', 'changed_at')):
+            conn.execute(f'CREATE TRIGGER IF NOT EXISTS bench_stamp_{table} AFTER INSERT ON {table} BEGIN '
+                         f"UPDATE {table} SET {column} = '2999-01-01' WHERE rowid = NEW.rowid; END")
+        conn.commit()
+    db.add_items([{'name': f'item_{i}', 'quantity': 0} for i in range(items)])
+    retention = LogRetention(db, policy, batch_size=2000, pause=0) if policy else None
+
+    samples = []
+    for d in range(days):
+        day = START + timedelta(days=d)
+        updates = [{'name': f'item_{(d * 7 + i) % items}', 'quantity': d * writes_per_day + i}
+                   for i in range(writes_per_day)]
+        start = time.perf_counter()
+        for chunk in range(0, len(updates), 100):
+            db.update_qtys(updates[chunk:chunk + 100], atomic=False)
+        churn = [{'name': f'item_{(d + i) % items}'} for i in range(writes_per_day // 20)]
+        db.remove_items(churn, atomic=False)
+        db.add_items([{'name': c['name'], 'quantity': 0} for c in churn], atomic=False)
+        write_ms = (time.perf_counter() - start) / (writes_per_day / 100) * 1000
+        restamp(db, day)
+        if retention:
+            retention.run_once(now=day + timedelta(days=1))
+        if d % 30 == 29 or d == days - 1:
+            samples.append((d + 1, file_size_mb(db), write_ms))
+    db.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--writes-per-day', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--retention-days', type=float, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [
+            ('no retention', None),
+            ('summarize', RetentionPolicy(max_age_days=args.retention_days, mode='summarize')),
+            ('archive', RetentionPolicy(max_age_days=args.retention_days, mode='archive',
+                                        archive_path=os.path.join(tmp, 'audit-archive.db'))),
+        ]
+        for label, policy in runs:
+            print(f"\n{label}")
+            print(f"{'day':>5} {'live MB':>8} {'ms / 100 writes':>16}")
+            for day, size, write_ms in simulate(os.path.join(tmp, f'{label}.db'), args.days,
+                                                args.writes_per_day, args.items, policy):
+                print(f"{day:5d} {size:8.2f} {write_ms:16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Overhead of the metrics hooks on SQLiteDB calls and on Flask requests.
+
+Runs the same point reads and writes against a temporary database with and
+without an SQLObserver, then the same /get-item requests through a Flask app
+with and without instrument_app, and prints the best per-call time of a
+few alternating rounds.
+
+    python benchmarks/bench_metrics.py --ops 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify, request
+
+from metrics import MetricsRegistry, SQLObserver, instrument_app
+from sqlDB import SQLiteDB
+
+
+def make_db(path, observed):
+    observer = SQLObserver(MetricsRegistry()) if observed else None
+    db = SQLiteDB(path, observer=observer)
+    db.add_items([{'name': f'item_{i}', 'quantity': i} for i in range(1000)])
+    return db
+
+
+def bench_db(db, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        db.get_item(f'item_{i % 1000}')
+    reads = (time.perf_counter() - start) / ops
+    start = time.perf_counter()
+    for i in range(ops // 10):
+        db.adjust_qty({'name': f'item_{i % 1000}', 'delta': 1})
+    writes = (time.perf_counter() - start) / (ops // 10)
+    return reads, writes
+
+
+def bench_app(db, observer, ops):
+    app = Flask(__name__)
+    if observer is not None:
+        instrument_app(app, MetricsRegistry(), observer)
+
+    @app.route('/get-item')
+    def get_item():
+        status, row = db.get_item(request.args['name'])
+        return jsonify({'status': status, 'res': row}), status
+
+    client = app.test_client()
+    start = time.perf_counter()
+    for i in range(ops):
+        client.get('/get-item', query_string={'name': f'item_{i % 1000}'})
+    return (time.perf_counter() - start) / ops
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=3, help='best of, alternating plain and metrics')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        dbs = {label: make_db(os.path.join(tmp, f'{label}.db'), label == 'metrics') for label in ('plain', 'metrics')}
+        for _ in range(args.rounds):
+            for label, db in dbs.items():
+                reads, writes = bench_db(db, args.ops)
+                request_time = bench_app(db, db.observer, args.ops // 4)
+                best = results.get(label, (float('inf'),) * 3)
+                results[label] = tuple(map(min, best, (reads, writes, request_time)))
+        for db in dbs.values():
+            db.close()
+
+    print(f"{'':>10} {'get_item us':>12} {'adjust_qty us':>14} {'request us':>11}")
+    for label, (reads, writes, request_time) in results.items():
+        print(f"{label:>10} {reads * 1e6:12.1f} {writes * 1e6:14.1f} {request_time * 1e6:11.1f}")
+    overhead = [(m - p) * 1e6 for p, m in zip(results['plain'], results['metrics'])]
+    print(f"{'overhead':>10} {overhead[0]:12.1f} {overhead[1]:14.1f} {overhead[2]:11.1f}")
+
+
+if __name__ == '__main__':
+    main()
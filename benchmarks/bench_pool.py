@@ -0,0 +1,66 @@
+"""Per-request latency of SQLiteDB with and without the connection pool.
+
+Run from the repository root:
+
+    python benchmarks/bench_pool.py --items 1000 --requests 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlDB import SQLiteDB
+
+
+def seed(db, count):
+    for i in range(count):
+        db.add_item({'name': f'item_{i}', 'quantity': i})
+
+
+def run(db, requests, threads, items):
+    """Mix of reads and writes shaped like the Flask routes."""
+    def one(i):
+        name = f'item_{i % items}'
+        start = time.perf_counter()
+        if i % 4 == 0:
+            db.get_all_items()
+        else:
+            db.update_qty({'name': name, 'quantity': i})
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        'rps': requests / elapsed,
+        'p50_us': latencies[len(latencies) // 2] * 1e6,
+        'p99_us': latencies[int(len(latencies) * 0.99)] * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--pool-size', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, pool_size in (('connect-per-call', 0), ('pooled', args.pool_size)):
+            path = os.path.join(tmp, f'{label}.db')
+            db = SQLiteDB(path, pool_size=pool_size)
+            seed(db, args.items)
+            result = run(db, args.requests, args.threads, args.items)
+            db.close()
+            print(f"{label:>18}: {result['rps']:9.0f} req/s  "
+                  f"p50 {result['p50_us']:8.1f} us  p99 {result['p99_us']:8.1f} us")
+
+
+if __name__ == '__main__':
+    main()
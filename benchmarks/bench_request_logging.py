@@ -0,0 +1,166 @@
+"""Per-request cost of request logging: the old print() logging versus RequestLogger.
+
+Sends the same POST through a small Flask app with no logging, with the
+previous log_request (print the route and the whole JSON body), and with
+RequestLogger at full and reduced sampling, for a single-item body and a
+batch body, and prints the best of several rounds. Each round runs the setups
+in a new random order after a gc.collect(), so no setup is favoured by always
+running first. Log output goes to a temporary file, so no terminal skews the
+numbers.
+
+Whole requests cost a few hundred microseconds and vary by tens between runs
+on a busy machine, which hides differences of a few. The second table times
+only the logging work around a WSGI app that does nothing, for a request
+Flask has already routed: the two prints, or RequestLogger's wrapper plus the
+writer thread (process CPU time, so the writer counts even when it runs on
+another core).
+
+    python benchmarks/bench_request_logging.py --requests 5000 --batch 1000
+"""
+import argparse
+import contextlib
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify, request
+
+from request_log import JSONFormatter, RequestLogger
+
+
+def make_app(setup):
+    app = Flask(__name__)
+    app.config['PRINT_BODY'] = setup(app)
+
+    @app.route('/add-items', methods=['POST'])
+    def add_items():
+        if app.config['PRINT_BODY']:
+            print_request()
+        items = request.get_json()
+        return jsonify({'status': 201, 'count': len(items)}), 201
+
+    return app
+
+
+def print_request():
+    print(f"Received request on /add-items - Method: {request.method}")
+    print(f"Data: {request.get_json()}")
+
+
+def no_logging(app):
+    return False
+
+
+def print_logging(app):
+    return True
+
+
+def queued_logging(log_path, sample_rate, body_limit=0):
+    def setup(app):
+        handler = logging.FileHandler(log_path)
+        handler.setFormatter(JSONFormatter())
+        logger = RequestLogger(name=f'bench{time.perf_counter_ns()}', sample_rate=sample_rate,
+                               body_limit=body_limit, handlers=[handler])
+        logger.install(app)
+        app.extensions['request_log'] = logger
+        return False
+    return setup
+
+
+def bench(app, body, requests):
+    client = app.test_client()
+    data = json.dumps(body).encode()
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.post('/add-items', data=data, content_type='application/json')
+    logger = app.extensions.get('request_log')
+    if logger is not None:
+        # Include draining the queue, so the writer's work is not hidden
+        logger.stop()
+    return (time.perf_counter() - start) / requests
+
+
+def bench_logging(setup, body, requests):
+    data = json.dumps(body).encode()
+    app = make_app(no_logging)
+    with app.test_request_context('/add-items', method='POST', data=data, content_type='application/json'):
+        # A request Flask has routed, with the body read as the view would
+        request.get_json()
+        environ = request.environ
+        headers = [('Content-Type', 'application/json'), ('Content-Length', '30')]
+
+        def respond(environ, start_response):
+            if stub.config['PRINT_BODY']:
+                print_request()
+            start_response('201 CREATED', headers)
+            return []
+
+        # Only the logging wraps respond(); routing and the view are not timed
+        stub = types.SimpleNamespace(wsgi_app=respond, extensions={}, config={})
+        stub.config['PRINT_BODY'] = setup(stub)
+        start = time.process_time()
+        for _ in range(requests):
+            stub.wsgi_app(environ, lambda status, headers, exc_info=None: None)
+        logger = stub.extensions.get('request_log')
+        if logger is not None:
+            logger.stop()
+        return (time.process_time() - start) / requests
+
+
+def print_table(title, best, setups, bodies):
+    print(title)
+    print(f"{'logging':>12} " + ' '.join(f'{name + " us":>16} {"overhead":>9}' for name in bodies))
+    for label in setups:
+        print(f"{label:>12} " + ' '.join(
+            f"{best[label, name] * 1e6:16.1f} {(best[label, name] - best['none', name]) * 1e6:+9.1f}"
+            for name in bodies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=1000, help='items in the batch body')
+    parser.add_argument('--rounds', type=int, default=5, help='best of, running the setups in random order')
+    args = parser.parse_args()
+
+    bodies = {
+        'single': [{'name': 'item_0', 'quantity': 1}],
+        f'batch {args.batch}': [{'name': f'item_{i}', 'quantity': i} for i in range(args.batch)],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'requests.log')
+        setups = {
+            'none': no_logging,
+            'print': print_logging,
+            'queue': queued_logging(log_path, 1.0),
+            'queue+body': queued_logging(log_path, 1.0, body_limit=256),
+            'queue 10%': queued_logging(log_path, 0.1),
+        }
+        best, best_logging = {}, {}
+        runs = [(label, name) for label in setups for name in bodies]
+        for _ in range(args.rounds):
+            random.shuffle(runs)
+            for label, name in runs:
+                setup, body = setups[label], bodies[name]
+                gc.collect()
+                with open(log_path, 'a') as out, contextlib.redirect_stdout(out):
+                    per_request = bench(make_app(setup), body, args.requests)
+                    logging_only = bench_logging(setup, body, args.requests)
+                best[label, name] = min(best.get((label, name), per_request), per_request)
+                best_logging[label, name] = min(best_logging.get((label, name), logging_only), logging_only)
+
+    print_table('Whole request (wall clock)', best, setups, bodies)
+    print()
+    print_table('Logging work only (CPU time)', best_logging, setups, bodies)
+
+
+if __name__ == '__main__':
+    main()
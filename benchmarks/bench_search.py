@@ -0,0 +1,56 @@
+"""Search-as-you-type latency over a large catalogue, per search mode.
+
+Fills the items table (the triggers keep the trigram index in step), then
+times each keystroke of a few queries with the read cache off.
+
+    python benchmarks/bench_search.py --items 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlDB import SQLiteDB
+
+WORDS = ['widget', 'gadget', 'sprocket', 'gizmo', 'bracket', 'flange', 'gear', 'bolt', 'valve', 'spring',
+         'blue', 'red', 'steel', 'brass', 'large', 'small', 'hex', 'round', 'left', 'right']
+
+
+def fill(db, items):
+    rng = random.Random(0)
+    names = (f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(WORDS)} {i}" for i in range(items))
+    start = time.perf_counter()
+    with db.get_db_connection() as conn:
+        conn.executemany('INSERT INTO items (name, quantity) VALUES (?, 1)', ((name,) for name in names))
+        conn.commit()
+        conn.execute('ANALYZE')
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=1000000)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteDB(os.path.join(tmp, 'search.db'))
+        print(f"filled {args.items} items in {fill(db, args.items):.1f}s (fts5: {db.fts_enabled})\n")
+        print(f"{'mode':>10} {'query':>14} {'ms / keystroke':>15} {'max ms':>8} {'hits':>5}")
+        for mode, query in [('prefix', 'sprocket bra'), ('substring', 'brass valve'),
+                            ('substring', 'et fla'), ('fuzzy', 'sprokcet')]:
+            timings = []
+            for end in range(1, len(query) + 1):
+                start = time.perf_counter()
+                status, rows, _, _ = db.search_items(query[:end], mode=mode, limit=args.limit)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{mode:>10} {query:>14} {sum(timings) / len(timings):15.2f} {max(timings):8.2f} {len(rows):5d}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Requests per second and p99 latency of a running server at several concurrencies.
+
+Start the server first, e.g. in the async mode:
+
+    SERVER_MODE=asgi python flask-app.py
+    python benchmarks/bench_server_load.py --url http://127.0.0.1:8000
+
+and compare with SERVER_MODE=dev.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadgen import Request, run_load, summarize
+
+
+def make_request(i):
+    if i % 4 == 0:
+        return Request('GET', '/get-all-items?limit=100')
+    if i % 4 == 1:
+        return Request('PUT', '/update-quantity', {'name': f'load_{i % 100}', 'quantity': i})
+    if i % 4 == 2:
+        return Request('POST', '/transform', {'position': [i, 0, 0], 'rotation': [0, 0, 0], 'scale': [1, 1, 1]})
+    return Request('GET', '/')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, nargs='*', default=[10, 100, 1000])
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    seed = [Request('POST', '/add-items', [{'name': f'load_{i}', 'quantity': 0} for i in range(100)])]
+    asyncio.run(run_load(args.url, lambda i: seed[i], 1, 1))
+
+    print(f"{'clients':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for concurrency in args.concurrency:
+        results, elapsed = asyncio.run(run_load(args.url, make_request, concurrency, args.requests))
+        s = summarize(results, elapsed)
+        print(f"{concurrency:8d} {s['rps']:9.0f} {s['p50_ms']:8.1f} {s['p99_ms']:8.1f} {s['errors']:7d}")
+
+
+if __name__ == '__main__':
+    main()
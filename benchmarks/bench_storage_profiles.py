@@ -0,0 +1,77 @@
+"""Multi-process write load against each storage profile.
+
+Every worker process opens its own SQLiteDB (like a Flask worker would) and
+hammers quantity updates, which also fire the item_log trigger, while a
+share of requests read the whole table. Reports throughput, the number of
+busy retries and the rate of requests that still failed with a lock error.
+
+    python benchmarks/bench_storage_profiles.py --processes 8 --ops 500
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlDB import STORAGE_PROFILES, SQLiteDB
+
+
+def worker(args):
+    path, profile, ops, items, seed, max_retries = args
+    db = SQLiteDB(path, pool_size=1, profile=profile, max_retries=max_retries)
+    failures = 0
+    for i in range(ops):
+        if i % 5 == 0:
+            res = db.get_all_items()
+            if isinstance(res, tuple):
+                failures += 1
+        else:
+            status, _ = db.update_qty({'name': f'item_{(seed + i) % items}', 'quantity': seed * ops + i})
+            if status != 200:
+                failures += 1
+    retries = db.busy_retries
+    db.close()
+    return failures, retries
+
+
+def run_profile(tmp, profile, processes, ops, items, max_retries):
+    path = os.path.join(tmp, f'{profile}-{max_retries}.db')
+    db = SQLiteDB(path, pool_size=1, profile=profile)
+    for i in range(items):
+        db.add_item({'name': f'item_{i}', 'quantity': 0})
+    db.close()
+
+    jobs = [(path, profile, ops, items, seed, max_retries) for seed in range(processes)]
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(worker, jobs)
+    elapsed = time.perf_counter() - start
+
+    total = processes * ops
+    failures = sum(r[0] for r in results)
+    retries = sum(r[1] for r in results)
+    return total / elapsed, retries, failures / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=300)
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--profiles', nargs='*', default=list(STORAGE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':>12} {'retries':>8} {'ops/s':>9} {'busy retries':>13} {'lock errors':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in args.profiles:
+            for max_retries in (0, 5):
+                rps, retries, error_rate = run_profile(
+                    tmp, profile, args.processes, args.ops, args.items, max_retries)
+                print(f"{profile:>12} {max_retries:>8} {rps:9.0f} {retries:13d} {error_rate:11.2%}")
+
+
+if __name__ == '__main__':
+    main()
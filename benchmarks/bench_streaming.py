@@ -0,0 +1,54 @@
+"""Peak Python memory of get_all_items versus streaming with iter_items.
+
+    python benchmarks/bench_streaming.py --sizes 10000 100000 500000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlDB import SQLiteDB
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def full_body(db):
+    json.dumps({'message': 'All items fetched successfully', 'res': db.get_all_items()})
+
+
+def streamed_body(db):
+    for row in db.iter_items():
+        json.dumps(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'fetchall MB':>12} {'stream MB':>10} {'fetchall s':>11} {'stream s':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            db = SQLiteDB(os.path.join(tmp, f'{size}.db'))
+            db.add_items([{'name': f'item_{i}', 'quantity': i} for i in range(size)])
+            full_s, full_mb = measure(lambda: full_body(db))
+            stream_s, stream_mb = measure(lambda: streamed_body(db))
+            db.close()
+            print(f"{size:8d} {full_mb:12.1f} {stream_mb:10.1f} {full_s:11.2f} {stream_s:9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Update and query times of TransformStore with hundreds of thousands of objects.
+
+    python benchmarks/bench_transform_store.py --objects 100000 500000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transform_codec import TransformBatch
+from transform_store import TransformStore
+
+
+def timed(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--objects', type=int, nargs='*', default=[100000, 500000])
+    parser.add_argument('--batch', type=int, default=500, help='objects per update, like one live-sync flush')
+    parser.add_argument('--history', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'objects':>8} {'fill s':>7} {'update ms':>10} {'box ms':>8} {'nearest ms':>11} "
+          f"{'export ms':>10} {'save ms':>8} {'load ms':>8}")
+    for count in args.objects:
+        ids = [f'item_{i}' for i in range(count)]
+        location = rng.uniform(-1000, 1000, (count, 3)).astype(np.float32)
+        rotation = rng.uniform(-3.2, 3.2, (count, 3)).astype(np.float32)
+        scale = np.ones((count, 3), dtype=np.float32)
+
+        store = TransformStore(history_size=args.history)
+        start = time.perf_counter()
+        for i in range(0, count, 10000):
+            store.update(TransformBatch(ids[i:i + 10000], location[i:i + 10000], rotation[i:i + 10000], scale[i:i + 10000]))
+        fill = time.perf_counter() - start
+
+        picks = rng.choice(count, args.batch, replace=False)
+        moved = TransformBatch([ids[i] for i in picks], location[picks] + 1, rotation[picks], scale[picks])
+        update_ms, _ = timed(lambda: store.update(moved))
+        box_ms, _ = timed(lambda: store.select_box([-50, -50, -50], [50, 50, 50], limit=1000))
+        nearest_ms, _ = timed(lambda: store.nearest([0, 0, 0], 10))
+        export_ms, _ = timed(store.export)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'transforms.npz')
+            save_ms, _ = timed(lambda: store.save(path), repeat=1)
+            load_ms, _ = timed(lambda: TransformStore().load(path), repeat=1)
+        print(f"{count:8d} {fill:7.2f} {update_ms:10.2f} {box_ms:8.2f} {nearest_ms:11.2f} "
+              f"{export_ms:10.2f} {save_ms:8.1f} {load_ms:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Payload size and throughput of per-object JSON transforms versus batched JSON and binary.
+
+Sizes are computed locally; throughput needs a running server:
+
+    python flask-app.py
+    python benchmarks/bench_transforms.py --url http://127.0.0.1:8000 --objects 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loadgen import Request, run_load, summarize
+from transform_codec import CONTENT_TYPE, encode_transforms
+
+
+def selection(count, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = [f'item_{i}' for i in range(count)]
+    return ids, rng.uniform(-100, 100, (count, 3)), rng.uniform(-3.2, 3.2, (count, 3)), rng.uniform(0.1, 4, (count, 3))
+
+
+def json_objects(ids, location, rotation, scale):
+    """What DCC_send posts for each object."""
+    return [{'object': name, 'item_name': name, 'quantity': 0,
+             'position': loc.tolist(), 'rotation': rot.tolist(), 'scale': scl.tolist()}
+            for name, loc, rot, scl in zip(ids, location, rotation, scale)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=None, help='server to measure throughput against (sizes only if omitted)')
+    parser.add_argument('--objects', type=int, nargs='*', default=[1, 50, 500, 5000])
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'objects':>8} {'per-object JSON B':>18} {'batch JSON B':>13} {'binary B':>9} {'JSON/binary':>12}")
+    for count in args.objects:
+        batch = selection(count)
+        objects = json_objects(*batch)
+        per_object = sum(len(json.dumps(obj)) for obj in objects)
+        batched = len(json.dumps({'objects': objects}))
+        binary = len(encode_transforms(*batch))
+        print(f"{count:8d} {per_object:18d} {batched:13d} {binary:9d} {batched / binary:11.1f}x")
+
+    if not args.url:
+        return
+
+    print(f"\n{'objects':>8} {'path':>16} {'req/s':>9} {'objects/s':>11} {'p99 ms':>8} {'errors':>7}")
+    for count in args.objects:
+        batch = selection(count)
+        objects = json_objects(*batch)
+        body = encode_transforms(*batch)
+        paths = [
+            ('per-object JSON', 1, lambda i: Request('POST', '/transform', objects[i % count])),
+            ('batch JSON', count, lambda i: Request('POST', '/transforms', {'objects': objects})),
+            ('binary', count, lambda i: Request('POST', '/transforms', body, {'Content-Type': CONTENT_TYPE})),
+        ]
+        for label, per_request, make_request in paths:
+            total = args.requests if per_request == 1 else max(args.requests // max(count // 10, 1), 50)
+            results, elapsed = asyncio.run(run_load(args.url, make_request, args.concurrency, total))
+            s = summarize(results, elapsed)
+            print(f"{count:8d} {label:>16} {s['rps']:9.0f} {s['rps'] * per_request:11.0f} "
+                  f"{s['p99_ms']:8.1f} {s['errors']:7d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Minimal asyncio HTTP/1.1 load generator with no third-party dependencies.
+
+Each virtual client keeps one keep-alive connection open (reconnecting when
+the server closes it) and issues requests back to back.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+class Request:
+    def __init__(self, method, path, body=None, headers=None):
+        self.method = method
+        self.path = path
+        self.headers = dict(headers or {})
+        if body is not None and not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+            self.headers.setdefault('Content-Type', 'application/json')
+        self.body = body or b''
+
+    def encode(self, host):
+        lines = [f'{self.method} {self.path} HTTP/1.1', f'Host: {host}', f'Content-Length: {len(self.body)}']
+        lines += [f'{k}: {v}' for k, v in self.headers.items()]
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin1') + self.body
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    length, chunked, close = None, False, status_line.startswith(b'HTTP/1.0')
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value:
+            chunked = True
+        elif name == 'connection' and value == 'close':
+            close = True
+
+    if chunked:
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            body += await reader.readexactly(size)
+            await reader.readline()
+        body = bytes(body)
+    elif length is not None:
+        body = await reader.readexactly(length)
+    else:
+        body = await reader.read()
+        close = True
+    return status, body, close
+
+
+async def _client(url, next_request, results, deadline):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    reader = writer = None
+    try:
+        while time.perf_counter() < deadline:
+            request = next_request()
+            if request is None:
+                break
+            start = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(host, port)
+                writer.write(request.encode(f'{host}:{port}'))
+                await writer.drain()
+                status, body, close = await _read_response(reader)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                status, body, close = 0, b'', True
+            results.append((time.perf_counter() - start, status, len(body)))
+            if close and writer is not None:
+                writer.close()
+                reader = writer = None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def run_load(url, make_request, concurrency, total, duration=None):
+    """Issue ``total`` requests from ``concurrency`` clients.
+
+    ``make_request(i)`` builds the i-th Request. Returns a list of
+    (latency_seconds, status, body_bytes) and the wall-clock time taken.
+    """
+    counter = iter(range(total))
+
+    def next_request():
+        i = next(counter, None)
+        return None if i is None else make_request(i)
+
+    results = []
+    deadline = time.perf_counter() + (duration or float('inf'))
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(url, next_request, results, deadline) for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(results, elapsed):
+    latencies = sorted(r[0] for r in results)
+    errors = sum(1 for r in results if not 200 <= r[1] < 400)
+    return {
+        'requests': len(results),
+        'errors': errors,
+        'rps': len(results) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
@@ -0,0 +1,108 @@
+import json
+import logging
+import queue
+import threading
+
+logger = logging.getLogger('dcc.change_feed')
+
+
+class Subscription:
+    """A subscriber's bounded buffer of encoded change events.
+
+    A slow client never blocks the feed: once its buffer is full the
+    subscription is marked as overflowed and it has to resync.
+    """
+
+    def __init__(self, buffer_size):
+        self.queue = queue.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def push(self, version, event):
+        try:
+            self.queue.put_nowait((version, event))
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def encode_event(row, event='change'):
+    """Encode an item_changes row as a Server-Sent Event."""
+    version, item_id, name, op, quantity = row
+    data = json.dumps({'version': version, 'id': item_id, 'name': name, 'op': op, 'quantity': quantity})
+    return f'id: {version}\nevent: {event}\ndata: {data}\n\n'
+
+
+class ChangeFeed:
+    """Fans inventory changes out to any number of subscribers.
+
+    A single background thread tails the item_changes table, so changes made
+    by every worker process are seen, and encodes each event once no matter
+    how many subscribers there are. Local writes wake it immediately; other
+    processes' writes are picked up within ``poll_interval`` seconds.
+    """
+
+    def __init__(self, db, poll_interval=0.5, buffer_size=256, max_subscribers=100):
+        self.db = db
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._last_version = None
+        db.write_listeners.append(self._wake.set)
+
+    def subscribe(self):
+        """Register a subscriber, or return None when the feed is at capacity."""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            if self._last_version is None:
+                self._last_version = self.db.get_version()
+            subscription = Subscription(self.buffer_size)
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+                self._thread.start()
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._subscribers:
+                    self._last_version = None
+                    continue
+                after = self._last_version
+            try:
+                rows = self.db.get_change_log(after)
+            except Exception as e:
+                logger.exception("Error reading change feed")
+                continue
+            if not rows:
+                continue
+
+            events = [(row[0], encode_event(row)) for row in rows]
+            with self._lock:
+                self._last_version = rows[-1][0]
+                subscribers = list(self._subscribers)
+            for subscription in subscribers:
+                for version, event in events:
+                    subscription.push(version, event)
+            if len(rows) == self.db.CHANGE_LOG_BATCH:
+                self._wake.set()
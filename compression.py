@@ -0,0 +1,114 @@
+import gzip
+import io
+import json
+import zlib
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+def gunzip_stream(stream, length, max_size):
+    """Decompress ``length`` bytes of gzip from ``stream`` a chunk at a time.
+
+    Raises BodyTooLarge as soon as the output would exceed ``max_size``, so a
+    small compressed body cannot expand into unbounded memory; a malformed or
+    truncated body raises zlib.error.
+    """
+    out, size = [], 0
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    while length > 0:
+        data = stream.read(min(CHUNK_SIZE, length))
+        if not data:
+            break
+        length -= len(data)
+        while data:
+            chunk = decoder.decompress(data, max_size - size + 1)
+            size += len(chunk)
+            if size > max_size:
+                raise BodyTooLarge()
+            out.append(chunk)
+            data = decoder.unconsumed_tail
+            if decoder.eof and decoder.unused_data:
+                # Concatenated gzip members, as gzip.decompress accepts
+                data, decoder = decoder.unused_data, zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if not decoder.eof:
+        raise zlib.error('Truncated gzip body')
+    return b''.join(out)
+
+
+class GzipMiddleware:
+    """WSGI middleware for gzip in both directions.
+
+    Request bodies sent with Content-Encoding: gzip are decompressed before
+    the app sees them. Buffered responses of at least ``min_size`` bytes are
+    compressed for clients that accept gzip; streamed responses (no
+    Content-Length, e.g. NDJSON or the SSE feed) pass through untouched so
+    they are not held back. ``min_size=None`` turns response compression off.
+    Request bodies that decompress to more than ``max_body_size`` bytes are
+    rejected with 413.
+    """
+
+    def __init__(self, wsgi_app, min_size=1024, level=5, max_body_size=64 * 1024 * 1024):
+        self.wsgi_app = wsgi_app
+        self.min_size = min_size
+        self.level = level
+        self.max_body_size = max_body_size
+
+    def _error(self, start_response, status, message):
+        body = json.dumps({'error': message}).encode()
+        start_response(status, [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+        ])
+        return [body]
+
+    def _compressible(self, headers):
+        values = {name.lower(): value for name, value in headers}
+        length = values.get('content-length')
+        return (length is not None and int(length) >= self.min_size
+                and 'content-encoding' not in values
+                and not values.get('content-type', '').startswith('text/event-stream'))
+
+    def __call__(self, environ, start_response):
+        if environ.get('HTTP_CONTENT_ENCODING', '').lower() == 'gzip':
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            try:
+                body = gunzip_stream(environ['wsgi.input'], length, self.max_body_size)
+            except BodyTooLarge:
+                return self._error(start_response, '413 Request Entity Too Large',
+                                   f'Decompressed body exceeds {self.max_body_size} bytes')
+            except zlib.error:
+                return self._error(start_response, '400 Bad Request', 'Invalid gzip body')
+            environ['wsgi.input'] = io.BytesIO(body)
+            environ['CONTENT_LENGTH'] = str(len(body))
+            del environ['HTTP_CONTENT_ENCODING']
+
+        if self.min_size is None or 'gzip' not in environ.get('HTTP_ACCEPT_ENCODING', '').lower():
+            return self.wsgi_app(environ, start_response)
+
+        response = {}
+
+        def capture(status, headers, exc_info=None):
+            if not self._compressible(headers):
+                response['passed'] = True
+                return start_response(status, headers, exc_info)
+            response['status'], response['headers'] = status, headers
+            return response.setdefault('chunks', []).append
+
+        # Flask calls start_response before returning the body iterable
+        result = self.wsgi_app(environ, capture)
+        if response.get('passed') or 'status' not in response:
+            return result
+        try:
+            body = b''.join(response.get('chunks', []) + list(result))
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        body = gzip.compress(body, compresslevel=self.level)
+        headers = [(name, value) for name, value in response['headers'] if name.lower() != 'content-length']
+        headers += [('Content-Encoding', 'gzip'), ('Content-Length', str(len(body))), ('Vary', 'Accept-Encoding')]
+        start_response(response['status'], headers)
+        return [body]
@@ -0,0 +1,94 @@
+import gzip
+import json as jsonlib
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Safe to resend after a timeout or a 502/503/504: repeating them has the
+# same effect as sending them once. POST is only retried when the
+# connection could not be made at all.
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+RETRY_STATUSES = (502, 503, 504)
+
+
+class DCCClient:
+    """HTTP client shared by the Qt app and the Blender plugin.
+
+    One pooled requests.Session keeps connections to the server alive
+    between calls. Every call has a (connect, read) timeout; idempotent
+    calls are retried ``retries`` times with exponential backoff starting
+    at ``backoff`` seconds. With ``gzip_min_bytes`` set, request bodies at
+    least that large are sent gzip-compressed.
+    """
+
+    def __init__(self, base_url, timeout=(5.0, 30.0), retries=3, backoff=0.2, pool_size=10, gzip_min_bytes=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.gzip_min_bytes = gzip_min_bytes
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept': 'application/json', 'Accept-Encoding': 'gzip'})
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, json=None, data=None, headers=None, timeout=None, **kwargs):
+        headers = dict(headers or {})
+        if json is not None:
+            data = jsonlib.dumps(json).encode('utf-8')
+            headers.setdefault('Content-Type', 'application/json')
+        if data is not None and self.gzip_min_bytes is not None and len(data) >= self.gzip_min_bytes:
+            data = gzip.compress(data, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        return self.session.request(method, self.url(path), data=data, headers=headers,
+                                    timeout=timeout or self.timeout, **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide client, configured once from the environment.
+
+    FLASK_URL and PORT give the server address; DCC_CONNECT_TIMEOUT,
+    DCC_REQUEST_TIMEOUT, DCC_RETRIES and DCC_GZIP_MIN_BYTES tune it.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            gzip_min_bytes = os.getenv("DCC_GZIP_MIN_BYTES")
+            _client = DCCClient(
+                f"{os.getenv('FLASK_URL', 'http://localhost')}:{os.getenv('PORT', '5000')}",
+                timeout=(float(os.getenv("DCC_CONNECT_TIMEOUT", "5")), float(os.getenv("DCC_REQUEST_TIMEOUT", "30"))),
+                retries=int(os.getenv("DCC_RETRIES", "3")),
+                gzip_min_bytes=int(gzip_min_bytes) if gzip_min_bytes else None,
+            )
+        return _client
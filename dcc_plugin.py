@@ -1,8 +1,394 @@
 import bpy
-import requests
+import bmesh
 import os
+import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from math import radians
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dcc_client import get_client
+from transform_codec import CONTENT_TYPE as TRANSFORM_CONTENT_TYPE, encode_transforms
+
+ITEM_MESH_NAME = "DCC_Item_Cube"
+ITEM_SPACING = 2.0
+
+
+class RequestJob:
+    """One HTTP request running in the background."""
+
+    def __init__(self, label, on_done):
+        self.label = label
+        self.on_done = on_done
+        self.started = time.monotonic()
+        self.progress = None
+        self.cancelled = False
+        self.future = None
+
+
+class RequestRunner:
+    """Runs network calls off Blender's main thread.
+
+    Work functions run on a small thread pool and must not touch bpy. A
+    bpy.app.timers callback polls for finished jobs and runs their
+    ``on_done`` callback on the main thread, where it is safe to edit the
+    scene. Cancelled jobs are allowed to finish (bounded by the client's timeout)
+    but their results are dropped. The timer is persistent, so jobs are still
+    collected after a file load, which cancels them (see dcc_load_post).
+    """
+
+    def __init__(self, max_workers=2, poll_interval=0.1):
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dcc-request")
+        self.jobs = []
+        self.status = ""
+        self._polling = False
+
+    def busy(self, label):
+        return any(job.label == label for job in self.jobs)
+
+    def submit(self, label, work, on_done):
+        """Run work(job) in the background, then on_done(result) on the main thread."""
+        job = RequestJob(label, on_done)
+        job.future = self.executor.submit(work, job)
+        self.jobs.append(job)
+        self.status = f"{label}..."
+        if not self._polling:
+            self._polling = True
+            bpy.app.timers.register(self._poll, first_interval=self.poll_interval, persistent=True)
+        return job
+
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancelled = True
+
+    def _poll(self):
+        for job in [job for job in self.jobs if job.future.done()]:
+            self.jobs.remove(job)
+            if job.cancelled:
+                self.status = f"{job.label} cancelled"
+                continue
+            try:
+                self.status = job.on_done(job.future.result()) or f"{job.label} done"
+            except Exception as e:
+                self.status = f"{job.label} failed: {e}"
+        redraw_panels()
+        if not self.jobs:
+            self._polling = False
+            return None
+        return self.poll_interval
+
+    def shutdown(self):
+        self.cancel_all()
+        if self._polling and bpy.app.timers.is_registered(self._poll):
+            bpy.app.timers.unregister(self._poll)
+        self._polling = False
+        self.executor.shutdown(wait=False)
+
+
+def redraw_panels():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+RUNNER = None
+
+
+@bpy.app.handlers.persistent
+def dcc_load_post(*args):
+    """Reset background work for the file that was just opened.
+
+    Results of requests made for the closed file are dropped, and live
+    sync follows the new scene's dcc_live_sync setting (property update
+    callbacks do not run on load).
+    """
+    if RUNNER is not None:
+        RUNNER.cancel_all()
+    LIVE_SYNC.stop()
+    if bpy.context.scene.dcc_live_sync:
+        LIVE_SYNC.start()
+
+
+# api_endpoint choice -> (server route, transform fields sent)
+ENDPOINT_ROUTES = {
+    'transform': ('transform', ('position', 'rotation', 'scale')),
+    'translation': ('transform', ('position',)),
+    'rotation': ('rotate', ('rotation',)),
+    'scale': ('scale', ('scale',)),
+}
+
+
+def object_transform(obj, fields):
+    """The JSON body describing one object's transform."""
+    data = {"object": obj.name}
+    if 'position' in fields:
+        data['position'] = list(obj.location)
+    if 'rotation' in fields:
+        data['rotation'] = list(obj.rotation_euler)
+    if 'scale' in fields:
+        data['scale'] = list(obj.scale)
+    # Add item information to the data if it exists
+    if "item_name" in obj:
+        data["item_name"] = obj["item_name"]
+        data["quantity"] = obj["quantity"]
+    return data
+
+
+class LiveSync:
+    """Streams the transforms of objects as they move.
+
+    The depsgraph handler only records which objects changed. A timer
+    flushes that set at most ``dcc_live_rate`` times a second, so an object
+    touched on every frame of a drag is sent once per flush with its latest
+    transform. A flush is one POST to /transforms in the packed binary
+    format (split every ``batch_size`` objects) made from a single worker
+    thread over the shared client's keep-alive connection. While
+    a send is in flight new edits keep coalescing into the next flush
+    instead of queueing requests. Like the depsgraph handler, the timer
+    survives file loads; dcc_load_post restarts sync for the new file.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.dirty = set()
+        self.executor = None
+        self.pending = None
+        self.sent = 0
+        self.requests = 0
+        self.status = ""
+
+    @property
+    def running(self):
+        return self.executor is not None
+
+    def start(self):
+        if self.running:
+            return
+        self.dirty.clear()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dcc-live-sync")
+        self.sent = self.requests = 0
+        self.status = "Live sync on"
+        if live_sync_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.append(live_sync_depsgraph_update)
+        bpy.app.timers.register(self._flush, first_interval=0.1, persistent=True)
+
+    def stop(self):
+        if not self.running:
+            return
+        if live_sync_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.remove(live_sync_depsgraph_update)
+        if bpy.app.timers.is_registered(self._flush):
+            bpy.app.timers.unregister(self._flush)
+        self.executor.shutdown(wait=False)
+        self.executor = None
+        self.pending = None
+        self.dirty.clear()
+        self.status = "Live sync off"
+
+    def mark_dirty(self, depsgraph):
+        for update in depsgraph.updates:
+            if update.is_updated_transform and isinstance(update.id, bpy.types.Object):
+                self.dirty.add(update.id.original.name)
+
+    def _send(self, ids, location, rotation, scale):
+        # Worker thread: network only, no bpy
+        for start in range(0, len(ids), self.batch_size):
+            end = start + self.batch_size
+            body = encode_transforms(ids[start:end], location[start:end], rotation[start:end], scale[start:end])
+            response = get_client().post("transforms", data=body, headers={'Content-Type': TRANSFORM_CONTENT_TYPE})
+            response.raise_for_status()
+            self.requests += 1
+        self.sent += len(ids)
+
+    def _flush(self):
+        scene = bpy.context.scene
+        interval = 1.0 / max(scene.dcc_live_rate, 0.1)
+        if self.pending is not None:
+            if not self.pending.done():
+                return interval
+            error = self.pending.exception()
+            self.status = (f"Live sync failed: {error}" if error
+                           else f"Live sync: {self.sent} transforms in {self.requests} requests")
+            self.pending = None
+            redraw_panels()
+
+        if self.dirty:
+            objects = [obj for obj in (bpy.data.objects.get(name) for name in self.dirty) if obj is not None]
+            self.dirty.clear()
+            if objects:
+                ids = [obj.get("item_name", obj.name) for obj in objects]
+                location = [tuple(obj.location) for obj in objects]
+                rotation = [tuple(obj.rotation_euler) for obj in objects]
+                scale = [tuple(obj.scale) for obj in objects]
+                self.pending = self.executor.submit(self._send, ids, location, rotation, scale)
+        return interval
+
+
+LIVE_SYNC = LiveSync()
+
+
+@bpy.app.handlers.persistent
+def live_sync_depsgraph_update(scene, depsgraph):
+    LIVE_SYNC.mark_dirty(depsgraph)
+
+
+def toggle_live_sync(scene, context):
+    if scene.dcc_live_sync:
+        LIVE_SYNC.start()
+    else:
+        LIVE_SYNC.stop()
+
+
+def get_item_mesh():
+    """Return the unit cube mesh shared by every item object, creating it once."""
+    mesh = bpy.data.meshes.get(ITEM_MESH_NAME)
+    if mesh is None:
+        mesh = bpy.data.meshes.new(ITEM_MESH_NAME)
+        bm = bmesh.new()
+        bmesh.ops.create_cube(bm, size=1.0)
+        bm.to_mesh(mesh)
+        bm.free()
+    return mesh
+
+
+def build_item_objects(collection, data, first_slot=0):
+    """Create one object per item row directly in ``collection``.
+
+    Unlike bpy.ops.mesh.primitive_cube_add this triggers no operator,
+    depsgraph update or undo push per object: every object instances the
+    same mesh datablock. foreach_set writes every object in the collection,
+    so locations go in one call only when the collection held nothing
+    before (a first or full fetch); when adding to existing objects, as
+    incremental syncs do, each new object's location is set on its own.
+    """
+    mesh = get_item_mesh()
+    objects = []
+    for item in data:
+        name, quantity = item[1], item[2]
+        obj = bpy.data.objects.new(f"{name}_{quantity}", mesh)
+        obj["item_name"] = name
+        obj["quantity"] = quantity
+        collection.objects.link(obj)
+        objects.append(obj)
+
+    xs = [(first_slot + i) * ITEM_SPACING for i in range(len(objects))]
+    if len(collection.objects) == len(objects):
+        locations = [0.0] * (3 * len(objects))
+        locations[0::3] = xs
+        collection.objects.foreach_set("location", locations)
+    else:
+        for obj, x in zip(objects, xs):
+            obj.location = (x, 0.0, 0.0)
+    return objects
+
+
+class ItemIndex:
+    """Maps item_name to the object standing in for it in the items collection.
+
+    Objects are identified by their "item_name" custom property; the object
+    name is only a cached handle, so renaming an object in Blender does not
+    make the sync create a second one. Also remembers the inventory version
+    the collection was last synced to, so the next fetch only has to ask the
+    server for what changed since.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.version = None
+        self.next_slot = 0
+
+    def _index_names(self, collection):
+        self.objects = {obj["item_name"]: obj.name for obj in collection.objects if "item_name" in obj}
+
+    def rebuild(self, collection):
+        self._index_names(collection)
+        xs = [obj.location.x for obj in collection.objects]
+        self.next_slot = int(max(xs) // ITEM_SPACING) + 1 if xs else 0
+        self.version = None
+
+    def ensure(self, collection):
+        """Rebuild when the collection was edited outside the sync (forcing a full sync)."""
+        if len(self.objects) != len(collection.objects):
+            self.rebuild(collection)
+
+    def lookup(self, collection, name):
+        """The object whose item_name property is ``name``, or None."""
+        if name not in self.objects:
+            return None
+        obj = collection.objects.get(self.objects[name])
+        if obj is None or obj.get("item_name") != name:
+            # Renamed outside the sync: find the objects by their property again
+            self._index_names(collection)
+            obj = collection.objects.get(self.objects.get(name, ""))
+        return obj
+
+
+ITEM_INDEX = ItemIndex()
+
+
+def get_items_collection(collection_name="Database_Items"):
+    """Return the collection holding item objects, creating it if needed."""
+    if collection_name not in bpy.data.collections:
+        new_collection = bpy.data.collections.new(collection_name)
+        bpy.context.scene.collection.children.link(new_collection)
+    return bpy.data.collections[collection_name]
+
+
+def apply_item_changes(collection, upserts, deletes):
+    """Create, update and remove only the objects whose items changed.
+
+    ``upserts`` maps item_name to quantity; ``deletes`` is a set of names.
+    Returns (created, updated, removed) counts.
+    """
+    index = ITEM_INDEX
+    removed = [obj for obj in (index.lookup(collection, name) for name in deletes) if obj is not None]
+    if removed:
+        bpy.data.batch_remove(removed)
+    for name in deletes:
+        index.objects.pop(name, None)
+
+    new_rows, updated = [], 0
+    for name, quantity in upserts.items():
+        obj = index.lookup(collection, name)
+        if obj is None:
+            new_rows.append((None, name, quantity))
+        elif obj.get("quantity") != quantity:
+            obj["quantity"] = quantity
+            obj.name = f"{name}_{quantity}"
+            index.objects[name] = obj.name
+            updated += 1
+
+    for obj in build_item_objects(collection, new_rows, index.next_slot):
+        index.objects[obj["item_name"]] = obj.name
+    index.next_slot += len(new_rows)
+    return len(new_rows), updated, len(removed)
+
+
+def sync_all_items(collection, rows):
+    """Diff a full item listing against the collection."""
+    ITEM_INDEX.ensure(collection)
+    upserts = {row[1]: row[2] for row in rows}
+    deletes = set(ITEM_INDEX.objects) - set(upserts)
+    return apply_item_changes(collection, upserts, deletes)
+
+
+def sync_item_changes(collection, changes):
+    """Apply change events from /get-all-items?since=<version>."""
+    upserts, deletes = {}, set()
+    for change in changes:
+        if change["op"] == "delete":
+            deletes.add(change["name"])
+            upserts.pop(change["name"], None)
+        else:
+            upserts[change["name"]] = change["quantity"]
+            deletes.discard(change["name"])
+    return apply_item_changes(collection, upserts, deletes)
+
+
 class DCC_transform(bpy.types.Panel):
     bl_label = "DCC Plugin"
     bl_idname = "DCC_panel"
@@ -17,6 +403,17 @@ class DCC_transform(bpy.types.Panel):
         # Add button to fetch and create items
         layout.operator("dcc.fetch_items", text="Fetch Items from Database")
 
+        # Requests in flight, with a way out of slow ones
+        if RUNNER is not None and RUNNER.jobs:
+            box = layout.box()
+            for job in RUNNER.jobs:
+                elapsed = time.monotonic() - job.started
+                progress = f", {job.progress} received" if job.progress else ""
+                box.label(text=f"{job.label}... {elapsed:.1f}s{progress}", icon='TIME')
+            box.operator("dcc.cancel_requests", text="Cancel")
+        elif RUNNER is not None and RUNNER.status:
+            layout.label(text=RUNNER.status)
+
         if obj:
             # Display object transforms
             layout.label(text=f"Selected: {obj.name}")
@@ -32,87 +429,77 @@ class DCC_transform(bpy.types.Panel):
         else:
             layout.label(text="No object selected")
 
+        # Continuous streaming of moved objects
+        layout.prop(context.scene, "dcc_live_sync")
+        if context.scene.dcc_live_sync:
+            layout.prop(context.scene, "dcc_live_rate")
+            if LIVE_SYNC.status:
+                layout.label(text=LIVE_SYNC.status)
+
 class DCC_fetch_items(bpy.types.Operator):
     bl_label = "Fetch Items"
     bl_idname = "dcc.fetch_items"
 
-    def create_cube_for_item(self, name, quantity):
-        # Create a cube
-        bpy.ops.mesh.primitive_cube_add(size=1.0)
-        cube = bpy.context.active_object
-        
-        # Name the cube based on item name and quantity
-        cube.name = f"{name}_{quantity}"
-        
-        # Set default transforms
-        cube.location = (0, 0, 0)
-        cube.rotation_euler = (0, 0, 0)
-        cube.scale = (1, 1, 1)
-        
-        # Add custom properties to store item info
-        cube["item_name"] = name
-        cube["quantity"] = quantity
-
     def execute(self, context):
-        FLASK_URL = os.getenv("FLASK_URL", "http://localhost")
-        PORT = os.getenv("PORT", "5000")
-        
-        url = f"{FLASK_URL}:{PORT}/get-all-items"
-        
-        try:
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            }
-            
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                data = response.json()['res']
-                
-                # Create a collection for our items if it doesn't exist
-                collection_name = "Database_Items"
-                if collection_name not in bpy.data.collections:
-                    new_collection = bpy.data.collections.new(collection_name)
-                    bpy.context.scene.collection.children.link(new_collection)
-                
-                # Set the active collection
-                collection = bpy.data.collections[collection_name]
-                
-                # Clear existing objects in the collection
-                for obj in collection.objects:
-                    bpy.data.objects.remove(obj, do_unlink=True)
-                
-                # Create cubes for each item
-                spacing = 2.0  
-                for i, item in enumerate(data):
-                    name = item[1]  # item name
-                    quantity = item[2]  # item quantity
-                    
-                    # Create a cube
-                    bpy.ops.mesh.primitive_cube_add(size=1.0)
-                    cube = bpy.context.active_object
-                    
-                    # Move from default collection to our collection
-                    bpy.context.scene.collection.objects.unlink(cube)
-                    collection.objects.link(cube)
-                    
-                    # Name and position the cube
-                    cube.name = f"{name}_{quantity}"
-                    cube.location = (i * spacing, 0, 0)  
-                    
-                    # Add custom properties
-                    cube["item_name"] = name
-                    cube["quantity"] = quantity
-                
-                self.report({'INFO'}, f"Created {len(data)} items from database")
-                
+        client = get_client()
+
+        if RUNNER.busy(self.bl_label):
+            self.report({'WARNING'}, "A fetch is already in progress")
+            return {'CANCELLED'}
+
+        # Create a collection for our items if it doesn't exist
+        collection = get_items_collection()
+        ITEM_INDEX.ensure(collection)
+        version = ITEM_INDEX.version
+
+        def work(job):
+            # Runs on a worker thread: network and JSON only, no bpy
+            if version is not None:
+                # Only what changed since the last sync; 410 means fall back to a full listing
+                response = client.get("get-all-items", params={'since': version},
+                                      headers={'If-None-Match': f'"inv-{version}"'})
+                if response.status_code == 200:
+                    return 'changes', response.json(), None
+                if response.status_code == 304:
+                    return 'unchanged', None, version
+
+            response = client.get("get-all-items", params={'stream': 'ndjson'}, stream=True)
+            if response.status_code != 200:
+                raise RuntimeError(f"Failed to fetch items: {response.status_code}")
+            rows = []
+            with response:
+                for line in response.iter_lines():
+                    if job.cancelled:
+                        return 'cancelled', None, None
+                    if line:
+                        rows.append(json.loads(line))
+                        job.progress = len(rows)
+            return 'full', rows, response.headers.get('X-Inventory-Version')
+
+        def on_done(result):
+            # Back on the main thread
+            kind, payload, new_version = result
+            collection = get_items_collection()
+            if kind == 'changes':
+                counts = sync_item_changes(collection, payload['changes'])
+                ITEM_INDEX.version = payload['version']
+            elif kind == 'full':
+                counts = sync_all_items(collection, payload)
+                ITEM_INDEX.version = int(new_version) if new_version else None
             else:
-                self.report({'ERROR'}, f"Failed to fetch items: {response.status_code}")
-                
-        except Exception as e:
-            self.report({'ERROR'}, f"Error: {str(e)}")
-            
+                counts = (0, 0, 0)
+            created, updated, removed = counts
+            return f"Synced items: {created} created, {updated} updated, {removed} removed"
+
+        RUNNER.submit(self.bl_label, work, on_done)
+        return {'FINISHED'}
+
+class DCC_cancel_requests(bpy.types.Operator):
+    bl_label = "Cancel Requests"
+    bl_idname = "dcc.cancel_requests"
+
+    def execute(self, context):
+        RUNNER.cancel_all()
         return {'FINISHED'}
 
 class DCC_send(bpy.types.Operator):
@@ -122,50 +509,24 @@ class DCC_send(bpy.types.Operator):
     def execute(self, context):
         obj = context.object
         if obj:
-            data = {}
-            
-            data = {
-                "position": list(obj.location),
-                "rotation": list(obj.rotation_euler),
-                "scale": list(obj.scale),
-            }
-            endpoint = context.scene.api_endpoint
-
-            if endpoint == 'translation':
-                data = {
-                    'position': list(obj.location)
-                }
-            elif endpoint == 'rotation':
-                data = {
-                    'rotation': list(obj.rotation_euler)
-                }
-            elif endpoint == 'scale':
-                data = {
-                    'scale': list(obj.scale)
-                }
-            
-            # Add item information to the data if it exists
-            if "item_name" in obj:
-                data["item_name"] = obj["item_name"]
-                data["quantity"] = obj["quantity"]
-
-            FLASK_URL = os.getenv("FLASK_URL", "http://localhost")
-            PORT = os.getenv("PORT", "5000")
-
-            url = f"{FLASK_URL}:{PORT}/{endpoint}"
+            route, fields = ENDPOINT_ROUTES[context.scene.api_endpoint]
+            data = object_transform(obj, fields)
 
-            try:
-                response = requests.post(url, json=data)
-                self.report({'INFO'}, f"Sent data: {response.status_code}")
-            except Exception as e:
-                self.report({'ERROR'}, f"Failed: {e}")
+            def work(job):
+                return get_client().post(route, json=data).status_code
+
+            RUNNER.submit(f"Send {obj.name}", work, lambda status: f"Sent data: {status}")
 
         return {'FINISHED'}
 
 def register():
+    global RUNNER
+    RUNNER = RequestRunner()
+    bpy.app.handlers.load_post.append(dcc_load_post)
     bpy.utils.register_class(DCC_transform)
     bpy.utils.register_class(DCC_send)
     bpy.utils.register_class(DCC_fetch_items)
+    bpy.utils.register_class(DCC_cancel_requests)
     bpy.types.Scene.api_endpoint = bpy.props.EnumProperty(
         name="API Endpoint",
         items=[
@@ -175,12 +536,49 @@ def register():
             ('scale', "Scale Only", ""),
         ]
     )
+    bpy.types.Scene.dcc_live_sync = bpy.props.BoolProperty(
+        name="Live Sync",
+        description="Stream transforms to the server as objects move",
+        default=False,
+        update=toggle_live_sync,
+    )
+    bpy.types.Scene.dcc_live_rate = bpy.props.FloatProperty(
+        name="Max Sends / s",
+        description="Upper bound on batched transform requests per second",
+        default=10.0,
+        min=0.5,
+        max=60.0,
+    )
 
 def unregister():
+    global RUNNER
+    if dcc_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(dcc_load_post)
+    RUNNER.shutdown()
+    RUNNER = None
+
+
+@bpy.app.handlers.persistent
+def dcc_load_post(*args):
+    """Reset background work for the file that was just opened.
+
+    Results of requests made for the closed file are dropped, and live
+    sync follows the new scene's dcc_live_sync setting (property update
+    callbacks do not run on load).
+    """
+    if RUNNER is not None:
+        RUNNER.cancel_all()
+    LIVE_SYNC.stop()
+    if bpy.context.scene.dcc_live_sync:
+        LIVE_SYNC.start()
+    LIVE_SYNC.stop()
     bpy.utils.unregister_class(DCC_transform)
     bpy.utils.unregister_class(DCC_send)
     bpy.utils.unregister_class(DCC_fetch_items)
+    bpy.utils.unregister_class(DCC_cancel_requests)
     del bpy.types.Scene.api_endpoint
+    del bpy.types.Scene.dcc_live_sync
+    del bpy.types.Scene.dcc_live_rate
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
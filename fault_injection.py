@@ -0,0 +1,128 @@
+import fnmatch
+import json
+import random
+import time
+
+
+class FaultRule:
+    """Latency, error and timeout behaviour for routes matching ``route``.
+
+    ``latency`` is a dict with a ``distribution`` of fixed, uniform, normal or
+    exponential and its parameters in milliseconds. A request fails with
+    ``error_status`` with probability ``error_rate``; a sampled delay longer
+    than ``timeout_ms`` is cut short and answered with 504.
+    """
+
+    def __init__(self, route='*', latency=None, error_rate=0.0, error_status=503, timeout_ms=None):
+        self.route = route
+        self.latency = latency or {}
+        self.error_rate = float(error_rate)
+        self.error_status = int(error_status)
+        self.timeout_ms = timeout_ms
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            route=data.get('route', '*'),
+            latency=data.get('latency'),
+            error_rate=data.get('error_rate', 0.0),
+            error_status=data.get('error_status', 503),
+            timeout_ms=data.get('timeout_ms'),
+        )
+
+    def sample_delay_ms(self):
+        kind = self.latency.get('distribution', 'fixed')
+        if kind == 'fixed':
+            return float(self.latency.get('ms', 0))
+        if kind == 'uniform':
+            return random.uniform(self.latency.get('min_ms', 0), self.latency.get('max_ms', 0))
+        if kind == 'normal':
+            return max(0.0, random.gauss(self.latency.get('mean_ms', 0), self.latency.get('stddev_ms', 0)))
+        if kind == 'exponential':
+            mean = self.latency.get('mean_ms', 0)
+            return random.expovariate(1.0 / mean) if mean else 0.0
+        raise ValueError(f"Unknown latency distribution: {kind}")
+
+
+class FaultInjectionMiddleware:
+    """WSGI middleware that delays or fails requests according to FaultRules.
+
+    When ``allow_headers`` is set, a request can also ask for its own fault
+    through X-Fault-Delay-Ms, X-Fault-Error-Rate and X-Fault-Status. That
+    lets any client hold a worker thread or fail requests at will, so it is
+    for staging only; header delays are clamped to ``max_header_delay_ms``.
+    """
+
+    def __init__(self, wsgi_app, rules=(), allow_headers=False, max_header_delay_ms=5000):
+        self.wsgi_app = wsgi_app
+        self.rules = list(rules)
+        self.allow_headers = allow_headers
+        self.max_header_delay_ms = max_header_delay_ms
+        self._route_cache = {}
+
+    def _match(self, path):
+        try:
+            return self._route_cache[path]
+        except KeyError:
+            rule = next((r for r in self.rules if fnmatch.fnmatchcase(path, r.route)), None)
+            if len(self._route_cache) < 1024:
+                self._route_cache[path] = rule
+            return rule
+
+    def _from_headers(self, environ, rule):
+        delay = environ.get('HTTP_X_FAULT_DELAY_MS')
+        error_rate = environ.get('HTTP_X_FAULT_ERROR_RATE')
+        if delay is None and error_rate is None:
+            return rule
+        try:
+            return FaultRule(
+                latency={'distribution': 'fixed', 'ms': min(max(0.0, float(delay or 0)), self.max_header_delay_ms)},
+                error_rate=float(error_rate or 0),
+                error_status=int(environ.get('HTTP_X_FAULT_STATUS', 503)),
+                timeout_ms=rule.timeout_ms if rule else None,
+            )
+        except ValueError:
+            return rule
+
+    def _fail(self, start_response, status, message):
+        body = json.dumps({'error': message}).encode()
+        start_response(f'{status} Injected Fault', [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+        ])
+        return [body]
+
+    def __call__(self, environ, start_response):
+        rule = self._match(environ.get('PATH_INFO', ''))
+        if self.allow_headers:
+            rule = self._from_headers(environ, rule)
+        if rule is None:
+            return self.wsgi_app(environ, start_response)
+
+        delay_ms = rule.sample_delay_ms()
+        if rule.timeout_ms is not None and delay_ms > rule.timeout_ms:
+            time.sleep(rule.timeout_ms / 1000)
+            return self._fail(start_response, 504, 'Injected timeout')
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+        if rule.error_rate and random.random() < rule.error_rate:
+            return self._fail(start_response, rule.error_status, 'Injected error')
+        return self.wsgi_app(environ, start_response)
+
+
+def load_fault_config(path):
+    """Read a JSON fault config: {"allow_headers": bool, "max_header_delay_ms": number, "rules": [...]}.
+
+    Returns (rules, allow_headers, max_header_delay_ms).
+    """
+    with open(path) as f:
+        config = json.load(f)
+    return ([FaultRule.from_dict(r) for r in config.get('rules', [])], bool(config.get('allow_headers', False)),
+            float(config.get('max_header_delay_ms', 5000)))
+
+
+def install(wsgi_app, rules=(), allow_headers=False, max_header_delay_ms=5000):
+    """Wrap wsgi_app only when there is something to inject, so production pays nothing."""
+    if not rules and not allow_headers:
+        return wsgi_app
+    return FaultInjectionMiddleware(wsgi_app, rules, allow_headers, max_header_delay_ms)
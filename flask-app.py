@@ -1,60 +1,269 @@
-from flask import Flask, request, jsonify
-import time
+from flask import Flask, Response, request, jsonify
+import atexit
+import logging
 import os
+import sys
 import json
 from sqlDB import SQLiteDB
+from read_cache import ReadCache
+from change_feed import ChangeFeed, encode_event
+from log_retention import LogRetention, RetentionPolicy
+from compression import GzipMiddleware
+from fault_injection import FaultRule, install as install_faults, load_fault_config
+from transform_codec import CONTENT_TYPE as TRANSFORM_CONTENT_TYPE, decode_transforms, encode_transforms, transforms_from_json
+from transform_store import TransformStore
+from metrics import MetricsRegistry, SQLObserver, instrument_app
+from request_log import AccessLogFilter, JSONFormatter, RequestLogger, parse_level, parse_route_levels
 from dotenv import load_dotenv
 
 load_dotenv()
 
 db_name = os.getenv("DATABASE")
-db = SQLiteDB(db_path=db_name)
+
+# The dev server's reloader runs this module twice: a watcher parent that
+# never serves requests and the serving child (WERKZEUG_RUN_MAIN=true). Only
+# the serving process loads state, saves it on exit or starts background work.
+reloader_parent = (__name__ == '__main__' and os.getenv("SERVER_MODE", "dev") != 'asgi'
+                   and os.environ.get("WERKZEUG_RUN_MAIN") != "true")
+
+# Prometheus metrics on /metrics; METRICS_ENABLED=0 turns collection off.
+# Statements slower than SLOW_QUERY_MS are listed on /metrics/slow-queries.
+metrics_enabled = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "")
+metrics = MetricsRegistry()
+sql_observer = SQLObserver(metrics, slow_query_ms=float(os.getenv("SLOW_QUERY_MS", "100"))) if metrics_enabled else None
+
+cache_size = int(os.getenv("ITEM_CACHE_SIZE", "256"))
+db = SQLiteDB(
+    db_path=db_name,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+    profile=os.getenv("DB_PROFILE", "wal"),
+    cache=ReadCache(max_entries=cache_size, ttl=float(os.getenv("ITEM_CACHE_TTL", "30"))) if cache_size else None,
+    observer=sql_observer,
+)
+atexit.register(db.close)
+feed = ChangeFeed(
+    db,
+    poll_interval=float(os.getenv("FEED_POLL_INTERVAL", "0.5")),
+    buffer_size=int(os.getenv("FEED_BUFFER_SIZE", "256")),
+    max_subscribers=int(os.getenv("FEED_MAX_SUBSCRIBERS", "100")),
+)
+
+# Audit log retention runs in the background when an age or row limit is set
+log_max_age = os.getenv("LOG_RETENTION_DAYS")
+log_max_rows = os.getenv("LOG_MAX_ROWS")
+if (log_max_age or log_max_rows) and not reloader_parent:
+    retention = LogRetention(
+        db,
+        RetentionPolicy(
+            max_age_days=float(log_max_age) if log_max_age else None,
+            max_rows=int(log_max_rows) if log_max_rows else None,
+            mode=os.getenv("LOG_RETENTION_MODE", "summarize"),
+            archive_path=os.getenv("LOG_ARCHIVE_PATH") or None,
+        ),
+        interval=float(os.getenv("LOG_RETENTION_INTERVAL", "300")),
+    )
+    retention.start()
+    atexit.register(retention.stop)
+
+# Latest transform per object, snapshotted to TRANSFORM_STORE_PATH (.npz)
+# every TRANSFORM_SNAPSHOT_SECONDS and on exit
+transforms = TransformStore(history_size=int(os.getenv("TRANSFORM_HISTORY", "0")))
+transform_store_path = os.getenv("TRANSFORM_STORE_PATH")
+if transform_store_path and not reloader_parent:
+    transforms.load(transform_store_path)
+    transforms.start_snapshots(transform_store_path, float(os.getenv("TRANSFORM_SNAPSHOT_SECONDS", "60")))
+    atexit.register(transforms.stop_snapshots, transform_store_path)
+
 app = Flask(__name__)
+if metrics_enabled:
+    instrument_app(app, metrics, sql_observer)
 
-def log_request(endpoint):
-    """Logs incoming request details."""
-    print(f"Received request on {endpoint} - Method: {request.method}")
-    if request.method in ['POST', 'PUT'] and request.is_json:
-        print(f"Data: {request.get_json()}")
-    else:
-        print("No JSON data in request or not required")
+
+def collect_stats():
+    """Pool, cache and feed numbers read at scrape time."""
+    stats = [
+        ('sqlite_busy_retries_total', 'counter', 'Operations retried because the database was busy', db.busy_retries),
+        ('change_feed_subscribers', 'gauge', 'Connected change feed subscribers', feed.subscriber_count()),
+        ('transform_store_objects', 'gauge', 'Objects held in the transform store', len(transforms)),
+    ]
+    if db.pool is not None:
+        pool = db.pool.stats()
+        stats += [
+            ('sqlite_pool_size', 'gauge', 'Maximum pooled connections', pool['size']),
+            ('sqlite_pool_open', 'gauge', 'Open pooled connections', pool['open']),
+            ('sqlite_pool_in_use', 'gauge', 'Pooled connections checked out', pool['in_use']),
+        ]
+    if db.cache is not None:
+        cache = db.cache.stats()
+        stats += [
+            ('read_cache_entries', 'gauge', 'Entries in the read cache', cache['entries']),
+            ('read_cache_hits_total', 'counter', 'Read cache hits', cache['hits']),
+            ('read_cache_misses_total', 'counter', 'Read cache misses', cache['misses']),
+            ('read_cache_evictions_total', 'counter', 'Read cache evictions', cache['evictions']),
+        ]
+    return stats
+
+
+metrics.add_collector(collect_stats)
+
+# One JSON line per request, written by a background thread. Successful
+# requests are sampled at REQUEST_LOG_SAMPLE_RATE (errors always logged);
+# REQUEST_LOG_ROUTE_LEVELS (e.g. /metrics=DEBUG) quiets or raises routes;
+# REQUEST_LOG_BODY_BYTES > 0 adds that much of each JSON body.
+request_log_file = os.getenv("REQUEST_LOG_FILE")
+request_log_handler = logging.FileHandler(request_log_file) if request_log_file else logging.StreamHandler(sys.stdout)
+request_log_handler.setFormatter(JSONFormatter())
+request_log = RequestLogger(
+    level=parse_level(os.getenv("REQUEST_LOG_LEVEL", "INFO"), "REQUEST_LOG_LEVEL"),
+    sample_rate=float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1")),
+    route_levels=parse_route_levels(os.getenv("REQUEST_LOG_ROUTE_LEVELS")),
+    body_limit=int(os.getenv("REQUEST_LOG_BODY_BYTES", "0")),
+    handlers=[request_log_handler],
+)
+request_log.install(app)
+atexit.register(request_log.stop)
+# The dev server's own access lines would duplicate these records
+logging.getLogger('werkzeug').addFilter(AccessLogFilter())
+logger = logging.getLogger('dcc.app')
+
+# Simulated latency and failures for staging. FAULT_CONFIG points at a JSON
+# rule file; DEBUG_DELAY (seconds) is a shortcut for a fixed delay on every
+# route. Rules are first-match, so the DEBUG_DELAY rule goes first and
+# overrides the file's rules while it is set. With neither set the app is
+# served unwrapped. Never enable allow_headers outside staging: it lets any
+# client delay or fail requests.
+fault_rules, fault_headers, fault_max_header_delay = [], False, 5000
+if os.getenv("FAULT_CONFIG"):
+    fault_rules, fault_headers, fault_max_header_delay = load_fault_config(os.environ["FAULT_CONFIG"])
+if float(os.getenv("DEBUG_DELAY", "0")):
+    fault_rules.insert(0, FaultRule(latency={'distribution': 'fixed', 'ms': float(os.environ["DEBUG_DELAY"]) * 1000}))
+# gzip request bodies are always accepted, up to GZIP_MAX_BODY bytes once
+# decompressed; GZIP_MIN_SIZE (bytes, empty to disable) sets the smallest
+# buffered response worth compressing.
+gzip_min_size = os.getenv("GZIP_MIN_SIZE", "1024")
+app.wsgi_app = GzipMiddleware(app.wsgi_app, min_size=int(gzip_min_size) if gzip_min_size else None,
+                              max_body_size=int(os.getenv("GZIP_MAX_BODY", str(64 * 1024 * 1024))))
+app.wsgi_app = install_faults(app.wsgi_app, fault_rules, fault_headers, fault_max_header_delay)
 
 @app.route('/')
 def hello():
-    time.sleep(10)
     return jsonify({"message": "hii"})
 
+def transform_objects(data):
+    """Per-object transforms in a body: one object, or {"objects": [...]} from live sync."""
+    if isinstance(data, dict) and isinstance(data.get('objects'), list):
+        return data['objects']
+    return [data]
+
+def store_transforms(data):
+    """Store the objects in a JSON body that name an item or object; return how many were sent."""
+    objects = transform_objects(data)
+    named = [obj for obj in objects if isinstance(obj, dict) and (obj.get('item_name') or obj.get('object'))]
+    transforms.update(transforms_from_json(named))
+    return len(objects)
+
 @app.route('/transform', methods=['POST'])
 def receive_transform():
-    log_request('/transform')
-    time.sleep(10)
     data = request.json
     if not data:
         return jsonify({"error": "No data received"}), 400 
-    return jsonify({"message": "Transform received successfully!"}), 200  
+    try:
+        count = store_transforms(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"message": "Transform received successfully!", "count": count}), 200  
 
 @app.route('/scale', methods=['POST'])
 def receive_scale():
-    log_request('/scale')
-    time.sleep(10)
     data = request.json
     if not data:
         return jsonify({"error": "No data received"}), 400
-    return jsonify({"message": "Scale received successfully!"}), 200
+    try:
+        count = store_transforms(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"message": "Scale received successfully!", "count": count}), 200
 
 @app.route('/rotate', methods=['POST'])
 def receive_rotation():
-    log_request('/rotate')
-    time.sleep(10)
     data = request.json
     if not data:
         return jsonify({"error": "No data received"}), 400
-    return jsonify({"message": "Rotation received successfully!"}), 200
+    try:
+        count = store_transforms(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"message": "Rotation received successfully!", "count": count}), 200
+
+@app.route('/transforms', methods=['POST'])
+def receive_transforms():
+    """Many objects' transforms in one request, as JSON or the packed binary format."""
+    try:
+        if request.mimetype == TRANSFORM_CONTENT_TYPE:
+            batch = decode_transforms(request.get_data(cache=False))
+        else:
+            data = request.get_json(silent=True)
+            objects = data.get('objects') if isinstance(data, dict) else data
+            if not isinstance(objects, list):
+                return jsonify({"error": "Expected a list of objects"}), 400
+            batch = transforms_from_json(objects)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    transforms.update(batch)
+    return jsonify({"message": "Transforms received successfully!", "count": len(batch)}), 200
+
+def parse_vector(name):
+    """Read an "x,y,z" query parameter; raises ValueError if missing or malformed."""
+    parts = request.args.get(name, '').split(',')
+    if len(parts) != 3:
+        raise ValueError(f"{name} must be x,y,z")
+    return [float(p) for p in parts]
+
+@app.route('/transforms', methods=['GET'])
+def get_transform():
+    """Latest transform of one object (?name=), with ?history=true for its recent updates."""
+    name = request.args.get('name')
+    if not name:
+        return jsonify({'status': 400, 'message': 'name is required'}), 400
+    entry = transforms.get(name, history=request.args.get('history', 'false').lower() == 'true')
+    if entry is None:
+        return jsonify({'status': 404, 'message': f"No transform for {name}"}), 404
+    return jsonify(entry), 200
+
+@app.route('/transforms/box', methods=['GET'])
+def get_transforms_in_box():
+    """Objects whose location lies in the box ?min=x,y,z&max=x,y,z."""
+    try:
+        low, high = parse_vector('min'), parse_vector('max')
+        limit = int(request.args.get('limit', MAX_PAGE_SIZE))
+    except ValueError as e:
+        return jsonify({'status': 400, 'message': str(e)}), 400
+    objects = transforms.select_box(low, high, limit=max(1, min(limit, MAX_PAGE_SIZE)))
+    return jsonify({'objects': objects, 'count': len(objects)}), 200
+
+@app.route('/transforms/nearest', methods=['GET'])
+def get_nearest_transforms():
+    """The ?n= objects nearest to ?point=x,y,z."""
+    try:
+        point = parse_vector('point')
+        n = int(request.args.get('n', 10))
+    except ValueError as e:
+        return jsonify({'status': 400, 'message': str(e)}), 400
+    objects = transforms.nearest(point, max(1, min(n, MAX_PAGE_SIZE)))
+    return jsonify({'objects': objects, 'count': len(objects)}), 200
+
+@app.route('/transforms/export', methods=['GET'])
+def export_transforms():
+    """Every stored transform; packed binary when the client accepts it, JSON otherwise."""
+    batch = transforms.export()
+    if request.accept_mimetypes.best_match([TRANSFORM_CONTENT_TYPE, 'application/json']) == TRANSFORM_CONTENT_TYPE:
+        body = encode_transforms(batch.ids, batch.location, batch.rotation, batch.scale)
+        return Response(body, mimetype=TRANSFORM_CONTENT_TYPE)
+    return jsonify({'ids': batch.ids, 'location': batch.location.tolist(),
+                    'rotation': batch.rotation.tolist(), 'scale': batch.scale.tolist()}), 200
 
 @app.route('/file-path', methods=['GET'])
 def get_file_path():
-    log_request('/file-path')
-    time.sleep(10)
     projectpath = request.args.get('projectpath', default='false', type=str)
     if projectpath.lower() == 'true':
         project_folder_path = os.path.abspath(os.getcwd())
@@ -65,8 +274,6 @@ def get_file_path():
 
 @app.route('/add-item', methods=['POST'])
 def add_item_to_db():
-    log_request('/add-item')
-    time.sleep(10)
     try:
         data = request.get_json()
         if not data or 'name' not in data or 'quantity' not in data:
@@ -80,22 +287,189 @@ def add_item_to_db():
     except Exception:
         return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
 
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+def stream_items(mode, after_id):
+    """Stream the items table as NDJSON or as a chunked JSON body.
+
+    X-Inventory-Version is read before streaming starts, so it never claims
+    more than the body contains; clients can pass it as ?since= next time.
+    """
+    headers = {'X-Inventory-Version': str(db.get_version())}
+    if mode == 'ndjson':
+        def generate():
+            for row in db.iter_items(after_id, STREAM_BATCH_SIZE):
+                yield json.dumps(row) + '\n'
+        return Response(generate(), mimetype='application/x-ndjson', headers=headers)
+
+    if mode == 'json':
+        # Same shape as the non-streamed response so clients parse it the same way
+        def generate():
+            yield '{"message": "All items fetched successfully", "res": ['
+            separator = ''
+            for row in db.iter_items(after_id, STREAM_BATCH_SIZE):
+                yield separator + json.dumps(row)
+                separator = ','
+            yield ']}'
+        return Response(generate(), mimetype='application/json', headers=headers)
+
+    return jsonify({'status': 400, 'message': 'stream must be "ndjson" or "json"'}), 400
+
 @app.route('/get-all-items', methods=['GET'])
 def get_items():
-    log_request('/get-all-items')
-    time.sleep(10)
     try:
-        res = db.get_all_items()
-        if res:
-            return jsonify({'message': 'All items fetched successfully', 'res': res}), 200
-        return jsonify({'message': 'Could not fetch all the items'}), 500
+        after_id = request.args.get('after_id', default=0, type=int)
+        limit = request.args.get('limit', type=int)
+        stream = request.args.get('stream', type=str)
+        since = request.args.get('since', type=int)
+
+        if stream:
+            return stream_items(stream.lower(), after_id)
+
+        version = db.get_version()
+        etag = f'inv-{version}'
+        if etag in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        if since is not None:
+            status, changes = db.get_changes_since(since)
+            if status != 200:
+                return jsonify({'status': status, 'message': changes}), status
+            response = jsonify({
+                'message': 'Changes fetched successfully',
+                'version': version,
+                'changes': [
+                    {'version': v, 'id': item_id, 'name': name, 'op': op, 'quantity': qty}
+                    for v, item_id, name, op, qty in changes
+                ],
+            })
+        elif limit is not None:
+            if limit < 1 or limit > MAX_PAGE_SIZE:
+                return jsonify({'status': 400, 'message': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+            page = db.get_items_page(limit, after_id)
+            if isinstance(page, tuple):
+                return jsonify({'message': 'Could not fetch the items'}), 500
+            next_after_id = page[-1][0] if len(page) == limit else None
+            response = jsonify({'message': 'Items fetched successfully', 'res': page,
+                                'next_after_id': next_after_id, 'version': version})
+        else:
+            res = db.get_all_items()
+            if not isinstance(res, list):
+                return jsonify({'message': 'Could not fetch all the items'}), 500
+            response = jsonify({'message': 'All items fetched successfully', 'res': res, 'version': version})
+
+        response.set_etag(etag)
+        return response
+    except Exception:
+        return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
+
+FEED_HEARTBEAT = 15.0
+RESYNC_EVENT = 'event: resync\ndata: {}\n\n'
+
+@app.route('/changes/stream', methods=['GET'])
+def stream_changes():
+    """Server-Sent Events feed of inventory changes.
+
+    Resumes after ?since=<version> or Last-Event-ID. A client that falls
+    too far behind receives a "resync" event and should reload.
+    """
+    since = request.args.get('since', type=int)
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+
+    subscription = feed.subscribe()
+    if subscription is None:
+        return jsonify({'status': 503, 'message': 'Too many change feed subscribers'}), 503
+
+    def generate():
+        try:
+            seen = 0
+            if since is not None:
+                status, changes = db.get_changes_since(since)
+                if status != 200:
+                    yield RESYNC_EVENT
+                    return
+                for row in changes:
+                    seen = max(seen, row[0])
+                    yield encode_event(row)
+            yield ': connected\n\n'
+            while not subscription.overflowed:
+                item = subscription.get(FEED_HEARTBEAT)
+                if item is None:
+                    yield ': keepalive\n\n'
+                elif item[0] > seen:
+                    yield item[1]
+            yield RESYNC_EVENT
+        finally:
+            feed.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/get-item', methods=['GET'])
+def get_item():
+    name = request.args.get('name', type=str)
+    if not name:
+        return jsonify({'status': 400, 'message': 'Missing required parameter: name'}), 400
+    try:
+        status, res = db.get_item(name)
+        if status != 200:
+            return jsonify({'status': status, 'message': res}), status
+        if res is None:
+            return jsonify({'status': 404, 'message': 'Item not found'}), 404
+        return jsonify({'message': 'Item fetched successfully', 'res': res}), 200
     except Exception:
         return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
 
+@app.route('/search', methods=['GET'])
+def search_items():
+    """Indexed item search: ?q=&mode=prefix|substring|fuzzy&limit=&cursor=."""
+    query = request.args.get('q', default='', type=str).strip()
+    if not query:
+        return jsonify({'status': 400, 'message': 'Missing required parameter: q'}), 400
+    limit = request.args.get('limit', default=20, type=int)
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        return jsonify({'status': 400, 'message': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+    try:
+        status, rows, next_cursor, truncated = db.search_items(
+            query,
+            mode=request.args.get('mode', default='substring', type=str).lower(),
+            limit=limit,
+            cursor=request.args.get('cursor', type=str),
+        )
+        if status != 200:
+            return jsonify({'status': status, 'message': rows}), status
+        # truncated: only the first SEARCH_CANDIDATES matches were ranked and paged
+        return jsonify({'message': 'Items found', 'res': rows, 'next_cursor': next_cursor, 'truncated': truncated}), 200
+    except Exception:
+        return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    if db.cache is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **db.cache.stats()}), 200
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/slow-queries', methods=['GET'])
+def slow_queries():
+    if sql_observer is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({
+        'enabled': True,
+        'threshold_ms': sql_observer.slow_query_seconds * 1000,
+        'queries': list(sql_observer.slow_queries),
+    }), 200
+
 @app.route('/remove-item', methods=['DELETE'])
 def delete_item():
-    log_request('/remove-item')
-    time.sleep(10)
     try:
         data = request.get_json()
         status, message = db.remove_item(data)
@@ -107,8 +481,6 @@ def delete_item():
 
 @app.route('/update-quantity', methods=['PUT'])
 def update():
-    log_request('/update-quantity')
-    time.sleep(10)
     try:
         data = request.get_json()
         status, message = db.update_qty(data)
@@ -118,27 +490,120 @@ def update():
     except Exception:
         return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
 
+@app.route('/adjust-quantity', methods=['POST'])
+def adjust():
+    """Add a delta to an item's quantity: {"name", "delta", "min"?, "max"?}.
+
+    POST rather than PUT: replaying a delta is not idempotent.
+    """
+    try:
+        status, result = db.adjust_qty(request.get_json())
+        if status != 200:
+            return jsonify({'status': status, 'message': result}), status
+        return jsonify({'status': status, 'message': 'Item quantity adjusted successfully', 'quantity': result}), status
+    except json.JSONDecodeError:
+        return jsonify({'status': 400, 'message': 'Invalid JSON format'}), 400
+    except Exception:
+        return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
+
+def parse_batch(data):
+    """Split a batch request body into its item list and atomic flag."""
+    if isinstance(data, list):
+        return data, True
+    if isinstance(data, dict) and isinstance(data.get('items'), list):
+        return data['items'], bool(data.get('atomic', True))
+    return None, True
+
+def batch_response(status, results):
+    if isinstance(results, str):
+        return jsonify({'status': status, 'message': results}), status
+    failed = sum(1 for r in results if r['status'] >= 400)
+    message = f"{len(results) - failed} of {len(results)} items applied"
+    return jsonify({'status': status, 'message': message, 'results': results}), status
+
+@app.route('/add-items', methods=['POST'])
+def add_items_to_db():
+    try:
+        items, atomic = parse_batch(request.get_json())
+        if items is None:
+            return jsonify({'status': 400, 'message': 'Expected a list of items'}), 400
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get('quantity'), dict):
+                item['quantity'] = json.dumps(item['quantity'])
+        return batch_response(*db.add_items(items, atomic=atomic))
+    except json.JSONDecodeError:
+        return jsonify({'status': 400, 'message': 'Invalid JSON format'}), 400
+    except Exception:
+        return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
 
-# now we ned to define tigger to get all the logs of delete / update including provded timestamp
+@app.route('/update-quantities', methods=['PUT'])
+def update_many():
+    try:
+        items, atomic = parse_batch(request.get_json())
+        if items is None:
+            return jsonify({'status': 400, 'message': 'Expected a list of items'}), 400
+        return batch_response(*db.update_qtys(items, atomic=atomic))
+    except json.JSONDecodeError:
+        return jsonify({'status': 400, 'message': 'Invalid JSON format'}), 400
+    except Exception:
+        return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
+
+@app.route('/adjust-quantities', methods=['POST'])
+def adjust_many():
+    try:
+        items, atomic = parse_batch(request.get_json())
+        if items is None:
+            return jsonify({'status': 400, 'message': 'Expected a list of items'}), 400
+        return batch_response(*db.adjust_qtys(items, atomic=atomic))
+    except json.JSONDecodeError:
+        return jsonify({'status': 400, 'message': 'Invalid JSON format'}), 400
+    except Exception:
+        return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
+
+@app.route('/remove-items', methods=['DELETE'])
+def delete_many():
+    try:
+        items, atomic = parse_batch(request.get_json())
+        if items is None:
+            return jsonify({'status': 400, 'message': 'Expected a list of items'}), 400
+        return batch_response(*db.remove_items(items, atomic=atomic))
+    except json.JSONDecodeError:
+        return jsonify({'status': 400, 'message': 'Invalid JSON format'}), 400
+    except Exception:
+        return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
+
+
+# Audit log of item updates / deletes, filtered by item, action and time range
+# and paged with an opaque cursor. ?delete=true is kept for older clients.
 @app.route('/get-all-logs',methods=['GET'])
 def get_all_logs():
     try:
-        log_request('/get-all-logs')
-        time.sleep(10)
-        delete = request.args.get('delete', default='false', type=str)
+        body = request.get_json(silent=True) or {}
+        action = request.args.get('action', type=str)
+        if action is None:
+            action = 'delete' if request.args.get('delete', default='false', type=str).lower() == 'true' else 'update'
+        limit = request.args.get('limit', default=100, type=int)
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            return jsonify({'status': 400, 'message': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
 
-        data = request.get_json()
-        if delete.tolower() == 'true':
-            #itsabout delete
-            status , data_ = db.get_all_delete_logs(data)
-            return status,data_
-        else:
-            #its all about update
-            status , data_ = db.get_all_update_logs(data)
-            return status,data_
-
-    except Exception as e:
-        print("Error in getting logs: ",str(e))
+        status, rows, next_cursor = db.get_logs(
+            action=action.lower(),
+            item=request.args.get('item', type=str),
+            _from=request.args.get('from', type=str) or body.get('_from'),
+            _to=request.args.get('to', type=str) or body.get('_to'),
+            cursor=request.args.get('cursor', type=str),
+            limit=limit,
+        )
+        if status != 200:
+            return jsonify({'status': status, 'message': rows}), status
+        logs = [
+            {'action': kind, 'id': id_, 'item_name': name, 'old_quantity': old, 'new_quantity': new, 'timestamp': ts}
+            for kind, id_, name, old, new, ts in rows
+        ]
+        return jsonify({'message': 'Logs fetched successfully', 'res': logs, 'next_cursor': next_cursor}), 200
+    except Exception:
+        logger.exception("Error in getting logs")
+        return jsonify({'status': 500, 'message': 'Internal Server Error'}), 500
 
 
 @app.errorhandler(404)
@@ -147,6 +612,28 @@ def not_found(error):
 
 flask_host = os.getenv("FLASK_HOST", "127.0.0.1")
 flask_port = int(os.getenv("FLASK_PORT", "8000"))
+server_mode = os.getenv("SERVER_MODE", "dev")
+worker_threads = int(os.getenv("WORKER_THREADS", "32"))
+max_concurrency = int(os.getenv("MAX_CONCURRENCY", "1000"))
+# Each change feed subscriber holds a dedicated stream thread in the ASGI mode
+stream_threads = int(os.getenv("STREAM_THREADS", "64"))
 
 if __name__ == '__main__':
-    app.run(host=flask_host, port=flask_port, debug=True)
+    if server_mode == 'asgi':
+        import uvicorn
+        from asgi_adapter import WSGIAdapter
+
+        feed.max_subscribers = min(feed.max_subscribers, stream_threads)
+        logger.info("Serving on http://%s:%s (asgi)", flask_host, flask_port)
+        uvicorn.run(
+            WSGIAdapter(app, max_workers=worker_threads, max_streams=stream_threads),
+            host=flask_host,
+            port=flask_port,
+            limit_concurrency=max_concurrency,
+            backlog=max_concurrency,
+            log_level="warning",
+        )
+    else:
+        if not reloader_parent:
+            logger.info("Serving on http://%s:%s", flask_host, flask_port)
+        app.run(host=flask_host, port=flask_port, debug=True, threaded=True)
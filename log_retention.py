@@ -0,0 +1,225 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger('dcc.log_retention')
+
+
+class RetentionPolicy:
+    """How much audit history to keep.
+
+    Rows older than ``max_age_days`` or beyond the newest ``max_rows`` of a
+    log table are expired. In "summarize" mode expired rows are rolled up
+    into log_daily_summary; in "archive" mode they are moved to the SQLite
+    file at ``archive_path``; in "drop" mode they are just deleted.
+    """
+
+    MODES = ('summarize', 'archive', 'drop')
+
+    def __init__(self, max_age_days=None, max_rows=None, mode='summarize', archive_path=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown retention mode: {mode}")
+        if mode == 'archive' and not archive_path:
+            raise ValueError("archive mode needs an archive_path")
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+        self.mode = mode
+        self.archive_path = archive_path
+
+
+# table -> (timestamp column, summary action, SQL for the quantity change of a row)
+LOG_TABLES = {
+    'item_log': ('updated_at', 'update', 'new_quantity - old_quantity'),
+    'delete_log': ('deleted_at', 'delete', '-quantity'),
+}
+
+ARCHIVE_SCHEMA = {
+    'item_log': '''
+        CREATE TABLE IF NOT EXISTS archive.item_log (
+            id INTEGER PRIMARY KEY,
+            item_name TEXT,
+            old_quantity INTEGER,
+            new_quantity INTEGER,
+            updated_at TIMESTAMP
+        )
+    ''',
+    'delete_log': '''
+        CREATE TABLE IF NOT EXISTS archive.delete_log (
+            id INTEGER PRIMARY KEY,
+            item_name TEXT,
+            quantity INTEGER,
+            deleted_at TIMESTAMP
+        )
+    ''',
+}
+
+
+class LogRetention:
+    """Expires audit rows in small batches, each in its own short transaction.
+
+    Covers item_log and delete_log (per the policy's mode) and the
+    item_changes feed behind ?since= (always dropped; clients that ask for
+    a pruned version get 410 and reload). Between batches it sleeps for
+    ``pause`` seconds so that writers are never locked out for long.
+    """
+
+    def __init__(self, db, policy, batch_size=1000, pause=0.01, interval=300.0):
+        if policy.archive_path and os.path.abspath(policy.archive_path) == os.path.abspath(db.db_path):
+            raise ValueError("The archive must be a different file from the database")
+        self.db = db
+        self.policy = policy
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._create_tables()
+
+    def _create_tables(self):
+        def create(conn):
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS log_daily_summary (
+                    day TEXT NOT NULL,
+                    item_name TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    events INTEGER NOT NULL,
+                    net_change INTEGER,
+                    PRIMARY KEY (day, item_name, action)
+                )
+            ''')
+            conn.commit()
+
+        self.db.run(create)
+
+    def _expired_through(self, conn, table, ts_column, id_column, now):
+        """Return the highest id that the policy expires in ``table``, or None."""
+        limits = []
+        if self.policy.max_age_days is not None:
+            cutoff = (now - timedelta(days=self.policy.max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+            limits.append(conn.execute(f'SELECT MAX({id_column}) FROM {table} WHERE {ts_column} < ?',
+                                       (cutoff,)).fetchone()[0])
+        if self.policy.max_rows is not None:
+            row = conn.execute(f'SELECT {id_column} FROM {table} ORDER BY {id_column} DESC LIMIT 1 OFFSET ?',
+                               (self.policy.max_rows,)).fetchone()
+            limits.append(row[0] if row else None)
+        limits = [limit for limit in limits if limit is not None]
+        return max(limits) if limits else None
+
+    def _expire_batch(self, table, through_id):
+        """Expire one batch of rows with id <= through_id; return how many went."""
+        ts_column, action, change = LOG_TABLES[table]
+
+        def expire(conn):
+            # ATTACH is not allowed inside a transaction, so the archive is
+            # attached around each batch. INSERT OR IGNORE keeps a batch that
+            # was archived but not yet deleted from being copied twice.
+            archive = self.policy.mode == 'archive'
+            if archive:
+                conn.execute('ATTACH DATABASE ? AS archive', (self.policy.archive_path,))
+            try:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.execute(f'SELECT MIN(id), MAX(id) FROM (SELECT id FROM {table} WHERE id <= ? ORDER BY id LIMIT ?)',
+                               (through_id, self.batch_size))
+                low, high = cursor.fetchone()
+                if low is None:
+                    return 0
+                if self.policy.mode == 'summarize':
+                    cursor.execute(f'''
+                        INSERT INTO log_daily_summary (day, item_name, action, events, net_change)
+                        SELECT date({ts_column}), COALESCE(item_name, ''), ?, COUNT(*), SUM({change})
+                        FROM {table} WHERE id BETWEEN ? AND ?
+                        GROUP BY 1, 2
+                        ON CONFLICT (day, item_name, action) DO UPDATE SET
+                            events = events + excluded.events,
+                            net_change = COALESCE(net_change, 0) + COALESCE(excluded.net_change, 0)
+                    ''', (action, low, high))
+                elif archive:
+                    cursor.execute(f'INSERT OR IGNORE INTO archive.{table} SELECT * FROM main.{table} '
+                                   'WHERE id BETWEEN ? AND ?', (low, high))
+                cursor.execute(f'DELETE FROM {table} WHERE id BETWEEN ? AND ?', (low, high))
+                count = cursor.rowcount
+                conn.commit()
+                return count
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                if archive:
+                    conn.execute('DETACH DATABASE archive')
+
+        return self.db.run(expire)
+
+    def _expire_changes(self, now):
+        def expire(conn):
+            through = self._expired_through(conn, 'item_changes', 'changed_at', 'version', now)
+            if through is None:
+                return 0
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM item_changes WHERE version IN '
+                           '(SELECT version FROM item_changes WHERE version <= ? ORDER BY version LIMIT ?)',
+                           (through, self.batch_size))
+            count = cursor.rowcount
+            conn.commit()
+            return count
+
+        total = 0
+        while not self._stop.is_set():
+            count = self.db.run(expire)
+            total += count
+            if count < self.batch_size:
+                break
+            time.sleep(self.pause)
+        return total
+
+    def run_once(self, now=None):
+        """Apply the policy once to every log table; return rows expired per table."""
+        # CURRENT_TIMESTAMP in the triggers is UTC
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        expired = {}
+
+        if self.policy.mode == 'archive':
+            with self.db.get_db_connection() as conn:
+                conn.execute('ATTACH DATABASE ? AS archive', (self.policy.archive_path,))
+                for schema in ARCHIVE_SCHEMA.values():
+                    conn.execute(schema)
+                conn.commit()
+                conn.execute('DETACH DATABASE archive')
+
+        for table, (ts_column, _, _) in LOG_TABLES.items():
+            through = self.db.run(lambda conn: self._expired_through(conn, table, ts_column, 'id', now))
+            total = 0
+            while through is not None and not self._stop.is_set():
+                count = self._expire_batch(table, through)
+                total += count
+                if count < self.batch_size:
+                    break
+                time.sleep(self.pause)
+            expired[table] = total
+
+        expired['item_changes'] = self._expire_changes(now)
+        return expired
+
+    def start(self):
+        """Run the policy every ``interval`` seconds on a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='log-retention', daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except sqlite3.Error as e:
+                logger.exception("Error applying log retention")
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
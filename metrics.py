@@ -0,0 +1,304 @@
+import bisect
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A named metric with one series per combination of label values.
+
+    Past ``max_series`` series, new label combinations are folded into a
+    single "other" series so that a runaway label cannot grow memory.
+    """
+
+    kind = 'untyped'
+
+    def __init__(self, name, help, labels=(), max_series=500):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.max_series = max_series
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _key(self, values):
+        if values in self._series or len(self._series) < self.max_series:
+            return values
+        return ('other',) * len(self.labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            series = list(self._series.items())
+        for values, value in series:
+            lines.append(f'{self.name}{_format_labels(self.labels, values)} {_format_value(value)}')
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *values, amount=1):
+        with self._lock:
+            key = self._key(values)
+            self._series[key] = self._series.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, *values, amount=1):
+        with self._lock:
+            key = self._key(values)
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, *values, amount=1):
+        self.inc(*values, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS, max_series=500):
+        super().__init__(name, help, labels, max_series)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(values)
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            series = [(values, list(counts), total, count) for values, (counts, total, count) in self._series.items()]
+        for values, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, values)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, values)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format.
+
+    Collectors are callables run at scrape time that return
+    (name, type, help, value) tuples, for numbers that already live
+    elsewhere such as pool and cache statistics.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collect):
+        self.collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collect in self.collectors:
+            for name, kind, help, value in collect():
+                lines += [f'# HELP {name} {help}', f'# TYPE {name} {kind}', f'{name} {_format_value(value)}']
+        return '\n'.join(lines) + '\n'
+
+
+class SQLObserver:
+    """Times SQLiteDB operations and the individual statements they run.
+
+    Pass it to SQLiteDB(observer=...). Operations (one per SQLiteDB method
+    call, retries included) are timed in SQLiteDB.run; statements through the
+    connection class from ``connection_factory``, whose cursors time every
+    execute/executemany (for SELECTs that covers finding the first row,
+    not fetching the rest). Statements slower than ``slow_query_ms`` are
+    counted and the latest ``keep_slow`` are kept for /metrics/slow-queries.
+    SQL time is also summed per thread so a request can report its share.
+    """
+
+    def __init__(self, registry, slow_query_ms=100.0, keep_slow=100):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.slow_queries = deque(maxlen=keep_slow)
+        self.operation_seconds = registry.histogram(
+            'sqlite_operation_seconds', 'Time spent in SQLiteDB operations, retries included', ['operation'])
+        self.operation_errors = registry.counter(
+            'sqlite_operation_errors_total', 'SQLiteDB operations that raised', ['operation'])
+        self.statement_seconds = registry.histogram(
+            'sqlite_statement_seconds', 'Time spent executing each SQL statement', ['statement'])
+        self.slow_total = registry.counter('sqlite_slow_queries_total', 'Statements slower than the slow-query threshold')
+        self._names = {}
+        self._fingerprints = {}
+        self._local = threading.local()
+        self.connection_factory = _timed_connection_class(self)
+
+    def operation_name(self, operation):
+        """'SQLiteDB.get_item.<locals>.select' -> 'get_item'."""
+        qualname = getattr(operation, '__qualname__', 'unknown')
+        name = self._names.get(qualname)
+        if name is None:
+            name = qualname.split('.<locals>')[0]
+            if name.startswith('SQLiteDB.'):
+                name = name[len('SQLiteDB.'):]
+            if len(self._names) < 1000:
+                self._names[qualname] = name
+        return name
+
+    def observe_operation(self, operation, seconds, failed=False):
+        name = self.operation_name(operation)
+        self.operation_seconds.observe(seconds, name)
+        if failed:
+            self.operation_errors.inc(name)
+
+    def fingerprint(self, sql):
+        """The statement with whitespace collapsed and placeholder lists folded, as a label."""
+        label = self._fingerprints.get(sql)
+        if label is None:
+            label = re.sub(r'\?(\s*,\s*\?)+', '?+', ' '.join(sql.split()))[:160]
+            if len(self._fingerprints) < 1000:
+                self._fingerprints[sql] = label
+        return label
+
+    def observe_statement(self, sql, seconds):
+        label = self.fingerprint(sql)
+        self.statement_seconds.observe(seconds, label)
+        self._local.sql_seconds = getattr(self._local, 'sql_seconds', 0.0) + seconds
+        if seconds >= self.slow_query_seconds:
+            self.slow_total.inc()
+            self.slow_queries.append({
+                'statement': label,
+                'ms': round(seconds * 1000, 3),
+                'at': time.time(),
+                'thread': threading.current_thread().name,
+            })
+
+    def reset_thread_sql_time(self):
+        self._local.sql_seconds = 0.0
+
+    def thread_sql_time(self):
+        return getattr(self._local, 'sql_seconds', 0.0)
+
+
+def _timed_connection_class(observer):
+    class TimedCursor(sqlite3.Cursor):
+        def execute(self, sql, parameters=()):
+            start = time.perf_counter()
+            try:
+                return super().execute(sql, parameters)
+            finally:
+                observer.observe_statement(sql, time.perf_counter() - start)
+
+        def executemany(self, sql, seq_of_parameters):
+            start = time.perf_counter()
+            try:
+                return super().executemany(sql, seq_of_parameters)
+            finally:
+                observer.observe_statement(sql, time.perf_counter() - start)
+
+    class TimedConnection(sqlite3.Connection):
+        def cursor(self, factory=TimedCursor):
+            return super().cursor(factory)
+
+        def execute(self, sql, parameters=()):
+            return self.cursor().execute(sql, parameters)
+
+        def executemany(self, sql, seq_of_parameters):
+            return self.cursor().executemany(sql, seq_of_parameters)
+
+    return TimedConnection
+
+
+def instrument_app(app, registry, observer=None):
+    """Record per-route request counts, latency, in-flight requests, SQL and JSON time for a Flask app.
+
+    Routes are labelled by their URL rule (e.g. /get-item), not the raw
+    path, so label counts stay bounded. For streamed responses the latency
+    covers producing the response object, not sending the whole body.
+    """
+    from flask import g, has_request_context, request
+
+    requests_total = registry.counter('http_requests_total', 'HTTP requests handled', ['route', 'method', 'status'])
+    duration = registry.histogram('http_request_duration_seconds', 'Time to handle a request', ['route', 'method'])
+    in_flight = registry.gauge('http_requests_in_flight', 'Requests currently being handled', ['route'])
+    json_seconds = registry.histogram('http_json_encode_seconds', 'Time spent encoding JSON responses', ['route'])
+    sql_seconds = registry.histogram('http_request_sql_seconds', 'SQL time within a request', ['route']) if observer else None
+
+    @app.before_request
+    def start_timer():
+        g.metrics_route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        g.metrics_start = time.perf_counter()
+        g.metrics_status = '500'
+        in_flight.inc(g.metrics_route)
+        if observer:
+            observer.reset_thread_sql_time()
+
+    @app.after_request
+    def record_status(response):
+        g.metrics_status = str(response.status_code)
+        return response
+
+    @app.teardown_request
+    def stop_timer(exc):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return
+        route = g.metrics_route
+        in_flight.dec(route)
+        duration.observe(time.perf_counter() - start, route, request.method)
+        requests_total.inc(route, request.method, g.metrics_status)
+        if observer:
+            sql_seconds.observe(observer.thread_sql_time(), route)
+
+    class TimedJSONProvider(type(app.json)):
+        def dumps(self, obj, **kwargs):
+            start = time.perf_counter()
+            try:
+                return super().dumps(obj, **kwargs)
+            finally:
+                route = g.get('metrics_route', 'none') if has_request_context() else 'none'
+                json_seconds.observe(time.perf_counter() - start, route)
+
+    app.json = TimedJSONProvider(app)
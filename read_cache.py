@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReadCache:
+    """LRU cache for inventory reads, bounded by entry count and TTL.
+
+    Every entry remembers the inventory version it was read at. A lookup only
+    hits when the caller's current version matches, so a write made by any
+    worker process (which bumps the version in the database) invalidates the
+    entries of every other worker on their next read.
+    """
+
+    def __init__(self, max_entries=256, ttl=30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hit_time = 0.0
+        self._miss_time = 0.0
+
+    def get_or_load(self, key, version, load):
+        """Return the cached value for key at version, calling load() on a miss."""
+        start = time.perf_counter()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._hit_time += time.perf_counter() - start
+                return entry[2]
+
+        value = load()
+        with self._lock:
+            self._entries[key] = (version, now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self.misses += 1
+            self._miss_time += time.perf_counter() - start
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'avg_hit_ms': self._hit_time / self.hits * 1000 if self.hits else 0.0,
+                'avg_miss_ms': self._miss_time / self.misses * 1000 if self.misses else 0.0,
+            }
@@ -0,0 +1,392 @@
+import json
+from json.encoder import encode_basestring_ascii as encode_string
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+
+LEVELS = {'DEBUG': logging.DEBUG, 'INFO': logging.INFO, 'WARNING': logging.WARNING, 'ERROR': logging.ERROR}
+
+
+def parse_level(text, setting='log level'):
+    """'info' -> logging.INFO; anything outside LEVELS is a ValueError naming the setting."""
+    level = (text or '').strip().upper()
+    if level not in LEVELS:
+        raise ValueError(f"Unknown {setting}: {text!r} (expected one of {', '.join(LEVELS)})")
+    return LEVELS[level]
+
+
+def parse_route_levels(text):
+    """'/metrics=DEBUG,/get-all-items=WARNING' -> {'/metrics': 10, '/get-all-items': 30}."""
+    levels = {}
+    for entry in filter(None, (part.strip() for part in (text or '').split(','))):
+        route, _, level = entry.partition('=')
+        levels[route.strip()] = parse_level(level, f'log level for {route.strip()}')
+    return levels
+
+
+def byte_count(value):
+    """A Content-Length as an int: None when it is missing or is not a number."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class AccessLogFilter(logging.Filter):
+    """Drops the werkzeug dev server's per-request access lines.
+
+    RequestLogger already records every request; the server's startup
+    banner, debugger PIN and errors still go through.
+    """
+
+    def filter(self, record):
+        return not (isinstance(record.msg, str) and record.msg.endswith('"%s" %s %s'))
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the record's ``fields``."""
+
+    encoder = json.JSONEncoder(default=str)
+
+    def format(self, record):
+        exc = None
+        if record.exc_info:
+            exc = self.formatException(record.exc_info)
+        elif record.exc_text:
+            exc = record.exc_text
+        return self.format_fields(record.created, record.levelname, record.name, record.getMessage(),
+                                  getattr(record, 'fields', {}), exc)
+
+    def format_fields(self, created, level_name, name, message, fields, exc=None):
+        """The JSON line for these values, for callers that have no LogRecord."""
+        entry = {'ts': round(created, 3), 'level': level_name, 'logger': name, 'msg': message}
+        entry.update(fields)
+        if exc is not None:
+            entry['exc'] = exc
+        return self.encoder.encode(entry)
+
+
+# The keys RequestLogger.request_fields() and JSONFormatter always write
+REQUEST_FIELDS = frozenset({'ts', 'level', 'logger', 'msg', 'route', 'method', 'status', 'duration_ms',
+                            'request_bytes', 'response_bytes', 'sample_rate', 'body', 'path'})
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks or formats on the request thread.
+
+    The stock prepare() formats the message in the caller; request records
+    only carry plain values, so they are queued as they are and formatted
+    by the listener thread. When ``max_size`` records are already waiting
+    the record is dropped and counted instead of waiting for the writer.
+    """
+
+    def __init__(self, log_queue, max_size):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def prepare(self, record):
+        if record.exc_info:
+            # Tracebacks hold frames that should not outlive the request
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+
+class _RequestQueueListener(logging.handlers.QueueListener):
+    """QueueListener that also accepts RequestLogger's batches of plain tuples.
+
+    Other loggers queue LogRecords one at a time. Request entries arrive as
+    lists of tuples and are only turned into records here, on the writer
+    thread. When nothing has arrived for ``flush_interval`` seconds the
+    listener collects the request entries still waiting for a full batch.
+    """
+
+    def __init__(self, log_queue, request_logger, *handlers, respect_handler_level=False):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.request_logger = request_logger
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get(block, self.request_logger.flush_interval)
+        except queue.Empty:
+            return self.request_logger.take_pending()
+
+    def handle(self, record):
+        if not isinstance(record, list):
+            super().handle(record)
+            return
+        request_logger = self.request_logger
+        for handler in self.handlers:
+            accepted = record
+            if self.respect_handler_level and handler.level:
+                accepted = [e for e in record if e[0] >= handler.level]
+            if not accepted:
+                continue
+            if (isinstance(handler, logging.StreamHandler) and type(handler.formatter) is JSONFormatter
+                    and handler.stream is not None and not handler.filters):
+                # The common case: JSON lines built straight from the tuples,
+                # with one write and one flush per batch
+                terminator = handler.terminator
+                text = ''.join(request_logger.json_line(e) + terminator for e in accepted)
+                handler.acquire()
+                try:
+                    handler.stream.write(text)
+                    handler.flush()
+                except Exception:
+                    handler.handleError(request_logger.build_record(request_logger.request_fields(accepted[0])))
+                finally:
+                    handler.release()
+            else:
+                for e in accepted:
+                    handler.handle(request_logger.build_record(request_logger.request_fields(e)))
+
+
+class RequestLogger:
+    """Structured, sampled request logging written from a background thread.
+
+    Every request produces one record with its route, method, status,
+    duration and payload sizes. The request thread only appends a tuple of
+    those values to a pending batch; every ``batch_size`` entries the batch
+    goes on the queue in one put, so the writer thread is woken (and takes
+    the GIL) once per batch rather than once per request. When the queue
+    has been idle for ``flush_interval`` seconds the writer takes whatever
+    is pending, so quiet periods are not held back. The QueueListener
+    thread builds, formats and writes the records. At most ``queue_size``
+    batches and other records wait on the queue; past that they are
+    dropped and counted in ``dropped``.
+
+    Responses below 400 are kept with probability ``sample_rate``; client
+    and server errors are always kept (at WARNING and ERROR). ``route_levels``
+    sets the level of successful requests per URL rule (default INFO), so
+    a noisy route can be pushed to DEBUG and drop below ``level``. With
+    ``body_limit`` above 0 the first that many bytes of JSON request bodies
+    are included.
+    """
+
+    def __init__(self, name='dcc', level=logging.INFO, sample_rate=1.0, route_levels=None,
+                 body_limit=0, queue_size=10000, handlers=None, batch_size=64, flush_interval=0.5):
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._line_heads = {}
+        self.route_levels = route_levels or {}
+        self.body_limit = body_limit
+        # The queue sits on ``name``; request records use its "requests" child
+        # and other loggers under ``name`` (e.g. dcc.app) share the same writer.
+        self.root = logging.getLogger(name)
+        self.root.setLevel(level)
+        self.root.propagate = False
+        self.logger = logging.getLogger(f'{name}.requests')
+        if handlers is None:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(JSONFormatter())
+            handlers = [handler]
+        # SimpleQueue.put never waits on a lock the writer thread is holding
+        self.handler = _NonBlockingQueueHandler(queue.SimpleQueue(), queue_size)
+        self.root.addHandler(self.handler)
+        self.queue = self.handler.queue
+        self.listener = _RequestQueueListener(self.queue, self, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+    @property
+    def dropped(self):
+        return self.handler.dropped
+
+    def level_for(self, route, status):
+        if status >= 500:
+            return logging.ERROR
+        if status >= 400:
+            return logging.WARNING
+        return self.route_levels.get(route, logging.INFO)
+
+    def sampled_level(self, route, status):
+        """The level to log a request at, or None when it is filtered out or not sampled."""
+        level = self.level_for(route, status)
+        if not self.logger.isEnabledFor(level):
+            return None
+        if level < logging.WARNING and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        return level
+
+    def log(self, route, method, status, duration, request_bytes=None, response_bytes=None, body=None, path=None,
+            **extra):
+        level = self.sampled_level(route, status)
+        if level is not None:
+            self.emit(level, route, method, status, duration, request_bytes, response_bytes, body, path, **extra)
+
+    def emit(self, level, route, method, status, duration, request_bytes=None, response_bytes=None, body=None,
+             path=None, **extra):
+        self._append((level, time.time(), route, method, status, duration, request_bytes, response_bytes, body, path,
+                      extra))
+
+    def _append(self, entry):
+        with self._pending_lock:
+            pending = self._pending
+            pending.append(entry)
+            if len(pending) < self.batch_size:
+                # The listener takes a part batch once the queue has been idle for flush_interval
+                return
+            self._pending = []
+        self._enqueue(pending)
+
+    def take_pending(self):
+        """Detach the entries waiting for a full batch (listener thread or stop())."""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        return batch
+
+    def _enqueue(self, batch):
+        if self.queue.qsize() >= self.handler.max_size:
+            self.handler.dropped += len(batch)
+        else:
+            self.queue.put_nowait(batch)
+
+    def request_fields(self, entry):
+        """Listener thread: (level, created, message, fields) for a queued request tuple."""
+        level, created, route, method, status, duration, request_bytes, response_bytes, body, path, extra = entry
+        fields = {
+            'route': route,
+            'method': method,
+            'status': status,
+            'duration_ms': round(duration * 1000, 3),
+            'request_bytes': byte_count(request_bytes),
+            'response_bytes': byte_count(response_bytes),
+        }
+        if self.sample_rate < 1.0 and level < logging.WARNING:
+            fields['sample_rate'] = self.sample_rate
+        if body is not None:
+            fields['body'] = self.truncate(body)
+        if path is not None:
+            fields['path'] = path
+        fields.update(extra)
+        return level, created, f'{method} {route} {status}', fields
+
+    def json_line(self, entry):
+        """Listener thread: JSONFormatter's line for a queued request tuple, without a dict or LogRecord.
+
+        The part that only depends on level, method, route and status is
+        encoded once and reused; per request only the time, duration, sizes
+        and extras are formatted.
+        """
+        level, created, route, method, status, duration, request_bytes, response_bytes, body, path, extra = entry
+        if extra and not extra.keys().isdisjoint(REQUEST_FIELDS):
+            # An extra replacing a standard field; let the dict decide
+            level, created, message, fields = self.request_fields(entry)
+            return JSONFormatter().format_fields(created, logging.getLevelName(level), self.logger.name,
+                                                 message, fields)
+        key = (level, method, route, status)
+        head = self._line_heads.get(key)
+        if head is None:
+            if len(self._line_heads) >= 1024:
+                # Bounded: the method of an unmatched request comes from the client
+                self._line_heads.clear()
+            head = JSONFormatter.encoder.encode({
+                'level': logging.getLevelName(level), 'logger': self.logger.name,
+                'msg': f'{method} {route} {status}', 'route': route, 'method': method, 'status': status,
+            })[1:-1]
+            self._line_heads[key] = head
+        # %.3f is the same number as round(x, 3), at a fraction of the cost
+        request_bytes, response_bytes = byte_count(request_bytes), byte_count(response_bytes)
+        line = '{"ts": %.3f, %s, "duration_ms": %.3f, "request_bytes": %s, "response_bytes": %s' % (
+            created, head, duration * 1000,
+            'null' if request_bytes is None else request_bytes,
+            'null' if response_bytes is None else response_bytes)
+        if self.sample_rate < 1.0 and level < logging.WARNING:
+            line += ', "sample_rate": %r' % self.sample_rate
+        if body is not None:
+            line += ', "body": ' + encode_string(self.truncate(body))
+        if path is not None:
+            line += ', "path": ' + encode_string(path)
+        for name, value in extra.items():
+            line += ', %s: %s' % (encode_string(name), encode_string(value) if type(value) is str
+                                  else JSONFormatter.encoder.encode(value))
+        return line + '}'
+
+    def build_record(self, request_fields):
+        """Listener thread: a LogRecord for handlers that need one."""
+        level, created, message, fields = request_fields
+        record = self.logger.makeRecord(self.logger.name, level, '(request)', 0, message, None, None,
+                                        extra={'fields': fields})
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        return record
+
+    def truncate(self, body):
+        text = body[:self.body_limit].decode('utf-8', errors='replace')
+        if len(body) > self.body_limit:
+            text += f'...[{len(body) - self.body_limit} more bytes]'
+        return text
+
+    def install(self, app):
+        """Log every request handled by a Flask app.
+
+        A WSGI wrapper around ``app.wsgi_app`` rather than Flask hooks: its
+        start_response reads the status and Content-Length, and the matched
+        rule from the request Flask keeps in ``environ['werkzeug.request']``
+        while it responds, so a request costs no hook dispatch or context
+        lookups.
+        """
+        wsgi_app = app.wsgi_app
+
+        def logged_wsgi_app(environ, start_response):
+            start = time.perf_counter()
+            req = status = headers = None
+
+            def capture_start_response(response_status, response_headers, exc_info=None):
+                nonlocal req, status, headers
+                # Flask responds before popping the request context, which
+                # is when it clears environ['werkzeug.request']
+                req = environ.get('werkzeug.request')
+                status, headers = response_status, response_headers
+                return start_response(response_status, response_headers, exc_info)
+
+            result = wsgi_app(environ, capture_start_response)
+            if status is None:
+                return result
+            duration = time.perf_counter() - start
+            rule = req.url_rule if req is not None else None
+            route = rule.rule if rule is not None else 'unmatched'
+            code = int(status[:3])
+            # Requests that are filtered out or not sampled cost nothing beyond this
+            level = self.sampled_level(route, code)
+            if level is None:
+                return result
+            response_bytes = None
+            for name, value in headers:
+                if name == 'Content-Length':
+                    response_bytes = value
+                    break
+            # Raw environ and header values; the listener converts them (a
+            # client can send any Content-Length, so byte_count() allows for that)
+            request_bytes = environ.get('CONTENT_LENGTH') or None
+            body = None
+            if self.body_limit and request_bytes and req is not None and req.is_json:
+                # JSON views read the body through get_json(), so this is the cached copy
+                body = req.get_data(cache=True)
+            path = req.path if req is not None else environ.get('PATH_INFO', '')
+            self._append((level, time.time(), route, environ['REQUEST_METHOD'], code, duration,
+                          request_bytes, response_bytes, body, path, {}))
+            return result
+
+        app.wsgi_app = logged_wsgi_app
+
+    def stop(self):
+        """Flush queued records and stop the writer thread."""
+        if self.handler not in self.root.handlers:
+            return
+        self.root.removeHandler(self.handler)
+        self.queue.put_nowait(self.take_pending())
+        self.listener.stop()
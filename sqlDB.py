@@ -1,21 +1,281 @@
+import base64
+import json
+import queue
+import random
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 
 
+# Pragmas applied to every connection when it is opened. "default" leaves
+# SQLite's rollback journal untouched; the WAL profiles let readers run
+# alongside a writer and trade durability for write latency via `synchronous`.
+STORAGE_PROFILES = {
+    'default': {},
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -16000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    'wal_durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+        'cache_size': -16000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+_PRAGMA_ORDER = ('busy_timeout', 'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+
+
+def resolve_profile(profile):
+    """Return the pragma dict for a profile name, or the dict itself."""
+    if profile is None:
+        return {}
+    if isinstance(profile, dict):
+        return profile
+    try:
+        return STORAGE_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown storage profile: {profile}") from None
+
+
+def connect(db_path, pragmas=None, check_same_thread=True, factory=sqlite3.Connection):
+    """Open a connection and apply the given pragmas to it."""
+    conn = sqlite3.connect(db_path, check_same_thread=check_same_thread, factory=factory)
+    for key in _PRAGMA_ORDER:
+        if pragmas and key in pragmas:
+            conn.execute(f'PRAGMA {key} = {pragmas[key]}')
+    return conn
+
+
+def is_busy_error(error):
+    """True if a sqlite3 error means the database was busy or locked."""
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        return (code & 0xff) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def like_escape(text):
+    """Escape LIKE wildcards in ``text`` for use with ESCAPE '\\'."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of long-lived SQLite connections.
+
+    Connections are opened lazily up to ``size`` and handed out on a
+    checkout/return basis. Idle connections that have not been used for
+    ``health_check_interval`` seconds are pinged before being reused.
+    """
+
+    def __init__(self, db_path, size=5, timeout=30.0, health_check_interval=30.0, pragmas=None,
+                 factory=sqlite3.Connection):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.db_path = db_path
+        self.pragmas = pragmas
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _connect(self):
+        return connect(self.db_path, self.pragmas, check_same_thread=False, factory=self.factory)
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def acquire(self):
+        """Check a connection out of the pool, opening one if there is room."""
+        while True:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = self._opened < self.size
+                    if can_open:
+                        self._opened += 1
+                if can_open:
+                    try:
+                        return self._connect()
+                    except sqlite3.Error:
+                        with self._lock:
+                            self._opened -= 1
+                        raise
+                try:
+                    conn, last_used = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError("Timed out waiting for a pooled connection")
+
+            stale = time.monotonic() - last_used > self.health_check_interval
+            if stale and not self._is_healthy(conn):
+                self._discard(conn)
+                continue
+            return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, rolling back any open transaction."""
+        if self._closed:
+            self._discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._idle.put_nowait((conn, time.monotonic()))
+
+    def stats(self):
+        """Return a snapshot of pool usage."""
+        idle = self._idle.qsize()
+        return {'size': self.size, 'open': self._opened, 'idle': idle, 'in_use': self._opened - idle}
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
 class SQLiteDB:
-    def __init__(self, db_path):
-        """Initialize SQLite database connection."""
+    CHANGE_LOG_BATCH = 1000
+
+    def __init__(self, db_path, pool_size=5, profile='wal', max_retries=5, retry_delay=0.01, cache=None,
+                 observer=None):
+        """Initialize SQLite database connection.
+
+        ``pool_size`` bounds the number of pooled connections; pass 0 to
+        open a fresh connection for every call instead. ``profile`` names an
+        entry of STORAGE_PROFILES (or is a pragma dict). Operations that hit
+        SQLITE_BUSY are retried up to ``max_retries`` times with jittered
+        exponential backoff starting at ``retry_delay`` seconds. ``cache`` is an
+        optional ReadCache placed in front of item reads. ``observer`` is an
+        optional metrics.SQLObserver that times every operation and statement.
+        """
         self.db_path = db_path
+        self.pragmas = resolve_profile(profile)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.busy_retries = 0
+        self.cache = cache
+        self.write_listeners = []
+        self.observer = observer
+        self.factory = observer.connection_factory if observer else sqlite3.Connection
+        self.pool = ConnectionPool(db_path, size=pool_size, pragmas=self.pragmas,
+                                   factory=self.factory) if pool_size else None
         self._create_tables()
+        self._create_search_index()
 
     @contextmanager
     def get_db_connection(self):
         """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
+        if self.pool is None:
+            conn = connect(self.db_path, self.pragmas, factory=self.factory)
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        conn = self.pool.acquire()
         try:
             yield conn
         finally:
-            conn.close()
+            self.pool.release(conn)
+
+    def close(self):
+        """Close all pooled connections."""
+        if self.pool is not None:
+            self.pool.close()
+
+    def run(self, operation):
+        """Run operation(conn) in one transaction and return its result.
+
+        Busy errors are retried and the call is timed by the observer if
+        there is one. Used by every method here and by callers that need
+        their own SQL on the same database, such as log retention.
+        """
+        if self.observer is None:
+            return self._attempt(operation)
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = self._attempt(operation)
+            failed = False
+            return result
+        finally:
+            self.observer.observe_operation(operation, time.perf_counter() - start, failed)
+
+    def _attempt(self, operation):
+        """Run operation(conn), retrying when the database is busy."""
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.get_db_connection() as conn:
+                    return operation(conn)
+            except sqlite3.OperationalError as e:
+                if attempt == self.max_retries or not is_busy_error(e):
+                    raise
+                self.busy_retries += 1
+                time.sleep(delay + random.uniform(0, delay))
+                delay *= 2
+
+    def _write(self, operation):
+        """Run a write operation, drop cached reads and notify write listeners."""
+        try:
+            return self.run(operation)
+        finally:
+            if self.cache is not None:
+                self.cache.clear()
+            for listener in self.write_listeners:
+                listener()
+
+    def _cached(self, key, load):
+        """Serve a read from the cache, keyed on the current inventory version."""
+        if self.cache is None:
+            return load()
+        return self.cache.get_or_load(key, self.get_version(), load)
+
+    def get_version(self):
+        """Return the inventory version, bumped by triggers on every items write."""
+        def select(conn):
+            cursor = conn.cursor()
+            cursor.execute('SELECT version FROM inventory_version WHERE id = 1')
+            return cursor.fetchone()[0]
+
+        return self.run(select)
 
     def _create_tables(self):
         """Create necessary tables if they don't exist."""
@@ -68,29 +328,138 @@ class SQLiteDB:
             END;
         '''
 
+        # A single-row counter bumped on every change to items, so caches in
+        # any worker process can tell whether their reads are still current.
+        create_version_table = '''
+            CREATE TABLE IF NOT EXISTS inventory_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            )
+        '''
+
+        # One row per change to items, stamped with the version it produced,
+        # so clients can ask for everything that changed since a version.
+        create_changes_table = '''
+            CREATE TABLE IF NOT EXISTS item_changes (
+                version INTEGER PRIMARY KEY,
+                item_id INTEGER,
+                item_name TEXT,
+                op TEXT NOT NULL,
+                quantity INTEGER,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        '''
+
+        version_triggers = [
+            f'''
+            CREATE TRIGGER IF NOT EXISTS bump_version_after_item_{event.lower()}
+            AFTER {event} ON items
+            FOR EACH ROW
+            BEGIN
+                UPDATE inventory_version SET version = version + 1 WHERE id = 1;
+                INSERT INTO item_changes (version, item_id, item_name, op, quantity)
+                SELECT version, {row}.id, {row}.name, '{event.lower()}', {row}.quantity
+                FROM inventory_version WHERE id = 1;
+            END;
+            '''
+            for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD'))
+        ]
+
+        log_indexes = [
+            'CREATE INDEX IF NOT EXISTS idx_item_log_updated_at ON item_log (updated_at)',
+            'CREATE INDEX IF NOT EXISTS idx_item_log_item ON item_log (item_name, updated_at)',
+            'CREATE INDEX IF NOT EXISTS idx_delete_log_deleted_at ON delete_log (deleted_at)',
+            'CREATE INDEX IF NOT EXISTS idx_delete_log_item ON delete_log (item_name, deleted_at)',
+            'CREATE INDEX IF NOT EXISTS idx_item_changes_changed_at ON item_changes (changed_at)',
+        ]
+
+        def create(conn):
+            cursor = conn.cursor()
+            cursor.execute(create_table_query)
+            cursor.execute(create_update_log)
+            cursor.execute(create_delete_log)
+            cursor.execute(create_trigger_query)
+            cursor.execute(delete_trigger)
+            cursor.execute(create_version_table)
+            cursor.execute(create_changes_table)
+            cursor.execute('INSERT OR IGNORE INTO inventory_version (id, version) VALUES (1, 0)')
+            for trigger in version_triggers:
+                cursor.execute(trigger)
+            for index in log_indexes:
+                cursor.execute(index)
+            conn.commit()
+
         try:
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(create_table_query)
-                cursor.execute(create_update_log)
-                cursor.execute(create_delete_log)
-                cursor.execute(create_trigger_query)
-                cursor.execute(delete_trigger)
-                conn.commit()
+            self.run(create)
         except sqlite3.Error as e:
             print(f"Error creating tables: {str(e)}")
             raise
 
+    def _create_search_index(self):
+        """Create the indexes behind search_items, if this SQLite build allows.
+
+        Prefix search range-scans a NOCASE index on items.name. Substring
+        and fuzzy search use an FTS5 trigram index over the names, kept in
+        step with items by triggers; it is external-content, so names are
+        not stored twice. Without FTS5 those modes fall back to LIKE scans.
+        """
+        search_triggers = [
+            '''
+            CREATE TRIGGER IF NOT EXISTS items_fts_after_insert AFTER INSERT ON items BEGIN
+                INSERT INTO items_fts (rowid, name) VALUES (NEW.id, NEW.name);
+            END;
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS items_fts_after_delete AFTER DELETE ON items BEGIN
+                INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+            END;
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS items_fts_after_rename AFTER UPDATE OF name ON items BEGIN
+                INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+                INSERT INTO items_fts (rowid, name) VALUES (NEW.id, NEW.name);
+            END;
+            ''',
+        ]
+
+        def create(conn):
+            cursor = conn.cursor()
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_items_name_nocase ON items (name COLLATE NOCASE, id)')
+            conn.commit()
+            try:
+                cursor.execute('BEGIN IMMEDIATE')
+                exists = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'").fetchone()
+                cursor.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+                        name, content='items', content_rowid='id', tokenize='trigram'
+                    )
+                ''')
+                for trigger in search_triggers:
+                    cursor.execute(trigger)
+                if not exists:
+                    # Index the items that predate the search index
+                    cursor.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+                conn.commit()
+                return True
+            except sqlite3.OperationalError as e:
+                conn.rollback()
+                print(f"Full-text search unavailable, falling back to LIKE scans: {str(e)}")
+                return False
+
+        self.fts_enabled = self.run(create)
+
     def add_item(self, data):
         """Add a new item to the inventory."""
+        def insert(conn):
+            cursor = conn.cursor()
+            cursor.execute(
+                'INSERT INTO items (name, quantity) VALUES (?, ?)',
+                (data['name'], data['quantity'])
+            )
+            conn.commit()
+
         try:
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    'INSERT INTO items (name, quantity) VALUES (?, ?)',
-                    (data['name'], data['quantity'])
-                )
-                conn.commit()
+            self._write(insert)
             return 201, "Item successfully added to database"
         except sqlite3.IntegrityError as e:
             return 400, f"Item already exists: {str(e)}"
@@ -98,81 +467,509 @@ class SQLiteDB:
             return 500, f"Database error: {str(e)}"
 
     def get_all_items(self):
-        """Retrieve all items from the inventory."""
+        """Retrieve all items from the inventory.
+
+        With a cache configured the returned list may be shared between
+        callers and must not be mutated.
+        """
+        def select(conn):
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM items')
+            return cursor.fetchall()
+
         try:
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM items')
-                return cursor.fetchall()
+            return self._cached(('all',), lambda: self.run(select))
         except sqlite3.Error as e:
             return None, f"Database error: {str(e)}"
 
+    def get_changes_since(self, version):
+        """Retrieve the latest change per item made after ``version``.
+
+        Returns (410, message) when older changes have already been pruned and
+        the caller has to fall back to a full reload, including when retention
+        has emptied item_changes while the inventory moved past ``version``.
+        A ``version`` ahead of the current one is a 410 as well: the caller
+        saw a database that has since been reset or replaced.
+        """
+        def select(conn):
+            cursor = conn.cursor()
+            cursor.execute('SELECT (SELECT MIN(version) FROM item_changes), '
+                           '(SELECT version FROM inventory_version WHERE id = 1)')
+            oldest, current = cursor.fetchone()
+            if version > current:
+                return None
+            # Every version bump writes a change row, so version + 1 must still be there
+            if version < current and (oldest is None or version + 1 < oldest):
+                return None
+            cursor.execute('''
+                SELECT c.version, c.item_id, c.item_name, c.op, c.quantity
+                FROM item_changes c
+                JOIN (
+                    SELECT item_name, MAX(version) AS version
+                    FROM item_changes WHERE version > ?
+                    GROUP BY item_name
+                ) latest ON c.version = latest.version
+                ORDER BY c.version
+            ''', (version,))
+            return cursor.fetchall()
+
+        try:
+            changes = self.run(select)
+            if changes is None:
+                return 410, "Changes since this version are not available; reload all items"
+            return 200, changes
+        except sqlite3.Error as e:
+            return 500, f"Database error: {str(e)}"
+
+    def get_change_log(self, after_version, limit=None):
+        """Retrieve raw item_changes rows after ``after_version`` in version order."""
+        def select(conn):
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT version, item_id, item_name, op, quantity FROM item_changes '
+                'WHERE version > ? ORDER BY version LIMIT ?',
+                (after_version, limit or self.CHANGE_LOG_BATCH)
+            )
+            return cursor.fetchall()
+
+        return self.run(select)
+
+    def get_item(self, name):
+        """Retrieve a single item by name, or None if it does not exist."""
+        def select(conn):
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM items WHERE name = ?', (name,))
+            return cursor.fetchone()
+
+        try:
+            return 200, self._cached(('item', name), lambda: self.run(select))
+        except sqlite3.Error as e:
+            return 500, f"Database error: {str(e)}"
+
+    def get_items_page(self, limit, after_id=0):
+        """Retrieve up to ``limit`` items with an id greater than ``after_id``."""
+        def select(conn):
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM items WHERE id > ? ORDER BY id LIMIT ?', (after_id, limit))
+            return cursor.fetchall()
+
+        try:
+            return self._cached(('page', limit, after_id), lambda: self.run(select))
+        except sqlite3.Error as e:
+            return None, f"Database error: {str(e)}"
+
+    def iter_items(self, after_id=0, batch_size=500):
+        """Yield items in id order, reading ``batch_size`` rows at a time.
+
+        Each batch is its own short read of the rows after the last id
+        seen, so no pooled connection is held while the caller sends rows
+        to a slow client, and every batch gets busy retries and observer
+        timing. A row changed between batches is read as it is when its
+        batch is fetched.
+        """
+        def select(conn):
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM items WHERE id > ? ORDER BY id LIMIT ?', (after_id, batch_size))
+            return cursor.fetchall()
+
+        while True:
+            rows = self.run(select)
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            after_id = rows[-1][0]
+
     def remove_item(self, data):
         """Remove an item from the inventory based on its name."""
+        def delete(conn):
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM items WHERE name = ?', (data['name'],))
+            conn.commit()
+
         try:
-            name = data['name']
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM items WHERE name = ?', (name,))
-                conn.commit()
+            self._write(delete)
             return 200, "Item deleted successfully"
         except sqlite3.Error as e:
             return 500, f"Database error: {str(e)}"
 
     def update_qty(self, data):
         """Update the quantity of an existing item."""
+        def update(conn):
+            cursor = conn.cursor()
+            cursor.execute('UPDATE items SET quantity = ? WHERE name = ?', (data['quantity'], data['name']))
+            conn.commit()
+
         try:
-            name, new_qty = data['name'], data['quantity']
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('UPDATE items SET quantity = ? WHERE name = ?', (new_qty, name))
-                conn.commit()
+            self._write(update)
             return 200, "Item quantity updated successfully"
         except sqlite3.Error as e:
             return 500, f"Database error: {str(e)}"
 
-    def get_all_delete_logs(self, data=None):
-        """Retrieve delete logs with optional filtering by date range."""
+    ADJUST_SQL = '''
+        UPDATE items SET quantity = quantity + :delta
+        WHERE name = :name
+          AND (:min IS NULL OR quantity + :delta >= :min)
+          AND (:max IS NULL OR quantity + :delta <= :max)
+    '''
+    # RETURNING arrived in SQLite 3.35; older libraries read the new value back
+    # with a SELECT in the same transaction
+    RETURNING_SUPPORTED = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    @staticmethod
+    def _check_adjust(item):
+        """Return None for a well-formed delta, or a (status, message) failure."""
+        if not isinstance(item, dict) or 'name' not in item or 'delta' not in item:
+            return 400, "Missing required fields: name and delta"
+        for key in ('delta', 'min', 'max'):
+            value = item.get(key)
+            if (value is not None or key == 'delta') and (not isinstance(value, int) or isinstance(value, bool)):
+                return 400, f"{key} must be an integer"
+
+    def _adjust(self, cursor, item):
+        """Apply one delta inside the caller's transaction; return (status, message, quantity)."""
+        params = {'name': item['name'], 'delta': item['delta'], 'min': item.get('min'), 'max': item.get('max')}
+        if self.RETURNING_SUPPORTED:
+            row = cursor.execute(self.ADJUST_SQL + 'RETURNING quantity', params).fetchone()
+            if row is not None:
+                return 200, "OK", row[0]
+            updated = False
+        else:
+            updated = cursor.execute(self.ADJUST_SQL, params).rowcount == 1
+        current = cursor.execute('SELECT quantity FROM items WHERE name = ?', (item['name'],)).fetchone()
+        if updated:
+            return 200, "OK", current[0]
+        if current is None:
+            return 404, "Item not found", None
+        return 409, "Quantity would leave the allowed range", current[0]
+
+    def adjust_qty(self, data):
+        """Add ``delta`` to an item's quantity in one statement.
+
+        Optional ``min`` and ``max`` reject a change that would leave the
+        quantity outside them (409). The after_item_update trigger still
+        logs the change. Returns (status, new quantity or message).
+        """
+        failure = self._check_adjust(data)
+        if failure:
+            return failure
+
+        def adjust(conn):
+            cursor = conn.cursor()
+            status, message, quantity = self._adjust(cursor, data)
+            conn.commit()
+            return status, quantity if status == 200 else message
+
         try:
-            _from = data.get('_from') if data else None
-            _to = data.get('_to') if data else None
+            return self._write(adjust)
+        except sqlite3.Error as e:
+            return 500, f"Database error: {str(e)}"
 
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
+    def adjust_qtys(self, items, atomic=True):
+        """Apply many deltas in a single transaction, returning a status and new quantity per item.
 
-                if not _from and not _to:
-                    cursor.execute('SELECT * FROM delete_log')
-                elif not _from:
-                    cursor.execute('SELECT * FROM delete_log WHERE deleted_at <= ?', (_to,))
-                elif not _to:
-                    cursor.execute('SELECT * FROM delete_log WHERE deleted_at >= ?', (_from,))
+        Deltas to the same item apply in order. In atomic mode any failure
+        rolls the whole batch back.
+        """
+        def apply(conn):
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            results = []
+            for item in items:
+                failure = self._check_adjust(item)
+                if failure:
+                    status, message, quantity = failure + (None,)
                 else:
-                    cursor.execute('SELECT * FROM delete_log WHERE deleted_at BETWEEN ? AND ?', (_from, _to))
+                    status, message, quantity = self._adjust(cursor, item)
+                name = item.get('name') if isinstance(item, dict) else None
+                results.append({'name': name, 'status': status, 'message': message, 'quantity': quantity})
+
+            failed = any(r['status'] >= 400 for r in results)
+            if atomic and failed:
+                conn.rollback()
+                for r in results:
+                    if r['status'] < 400:
+                        r['status'], r['message'], r['quantity'] = 409, "Not applied: batch rolled back", None
+                return 400, results
+            conn.commit()
+            return (207 if failed else 200), results
 
-                data_ = cursor.fetchall()
-                return 200 if data_ else ("No records found", 404) ,data_
+        try:
+            return self._write(apply)
         except sqlite3.Error as e:
             return 500, f"Database error: {str(e)}"
 
-    def get_all_update_logs(self, data=None):
-        """Retrieve update logs with optional filtering by date range."""
-        try:
-            _from = data.get('_from') if data else None
-            _to = data.get('_to') if data else None
+    def _existing_names(self, cursor, names):
+        """Return the subset of names that are present in the items table."""
+        existing = set()
+        names = list(set(names))
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'SELECT name FROM items WHERE name IN ({placeholders})', chunk)
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
 
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
+    def _apply_batch(self, items, statement, to_params, check, ok_status, atomic):
+        """Validate a batch, then apply it with executemany in one transaction.
 
-                if not _from and not _to:
-                    cursor.execute('SELECT * FROM item_log')
-                elif not _from:
-                    cursor.execute('SELECT * FROM item_log WHERE updated_at <= ?', (_to,))
-                elif not _to:
-                    cursor.execute('SELECT * FROM item_log WHERE updated_at >= ?', (_from,))
+        ``check(item, existing, seen)`` returns None for an applicable item or
+        a (status, message) failure. In atomic mode any failure rolls the whole
+        batch back; otherwise the valid items are applied and the rest reported.
+        """
+        def apply(conn):
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            names = [item['name'] for item in items if isinstance(item, dict) and 'name' in item]
+            existing = self._existing_names(cursor, names)
+
+            results, params, seen = [], [], set()
+            for item in items:
+                failure = check(item, existing, seen)
+                if failure:
+                    status, message = failure
                 else:
-                    cursor.execute('SELECT * FROM item_log WHERE updated_at BETWEEN ? AND ?', (_from, _to))
+                    status, message = ok_status, "OK"
+                    params.append(to_params(item))
+                name = item.get('name') if isinstance(item, dict) else None
+                results.append({'name': name, 'status': status, 'message': message})
+
+            failed = any(r['status'] >= 400 for r in results)
+            if atomic and failed:
+                conn.rollback()
+                for r in results:
+                    if r['status'] < 400:
+                        r['status'], r['message'] = 409, "Not applied: batch rolled back"
+                return 400, results
 
-                data_ = cursor.fetchall()
-                return  200 if data_ else ("No records found", 404), data_  
+            cursor.executemany(statement, params)
+            conn.commit()
+            return (207 if failed else ok_status), results
+
+        try:
+            return self._write(apply)
         except sqlite3.Error as e:
             return 500, f"Database error: {str(e)}"
+
+    def add_items(self, items, atomic=True):
+        """Add many items in a single transaction, returning a status per item."""
+        def check(item, existing, seen):
+            if not isinstance(item, dict) or 'name' not in item or 'quantity' not in item:
+                return 400, "Missing required fields: name and quantity"
+            if item['name'] in existing or item['name'] in seen:
+                return 400, "Item already exists"
+            seen.add(item['name'])
+
+        return self._apply_batch(
+            items, 'INSERT INTO items (name, quantity) VALUES (?, ?)',
+            lambda item: (item['name'], item['quantity']), check, 201, atomic)
+
+    def update_qtys(self, items, atomic=True):
+        """Update many item quantities in a single transaction, returning a status per item."""
+        def check(item, existing, seen):
+            if not isinstance(item, dict) or 'name' not in item or 'quantity' not in item:
+                return 400, "Missing required fields: name and quantity"
+            if item['name'] not in existing:
+                return 404, "Item not found"
+
+        return self._apply_batch(
+            items, 'UPDATE items SET quantity = ? WHERE name = ?',
+            lambda item: (item['quantity'], item['name']), check, 200, atomic)
+
+    def remove_items(self, items, atomic=True):
+        """Remove many items in a single transaction, returning a status per item."""
+        def check(item, existing, seen):
+            if not isinstance(item, dict) or 'name' not in item:
+                return 400, "Missing required field: name"
+            if item['name'] not in existing or item['name'] in seen:
+                return 404, "Item not found"
+            seen.add(item['name'])
+
+        return self._apply_batch(
+            items, 'DELETE FROM items WHERE name = ?',
+            lambda item: (item['name'],), check, 200, atomic)
+
+    SEARCH_MODES = ('prefix', 'substring', 'fuzzy')
+    SEARCH_CANDIDATES = 2000
+
+    @staticmethod
+    def _fts_phrase(text):
+        return '"' + text.replace('"', '""') + '"'
+
+    def search_items(self, query, mode='substring', limit=20, cursor=None):
+        """Find items by name; returns (status, rows, next_cursor, truncated).
+
+        ``prefix`` lists names starting with ``query`` in name order.
+        ``substring`` finds names containing it anywhere, those starting
+        with it and then the shortest first. To keep broad queries fast only
+        the first SEARCH_CANDIDATES matches are ranked; when there are more,
+        ``truncated`` is True and paging stops at the end of that window,
+        so callers should ask for a narrower query. ``fuzzy``
+        finds names sharing any three-letter run with it, so typos still
+        match, ranked by bm25; it scores every candidate and is the slower,
+        fall-back mode. Matching ignores case. Queries shorter than three
+        letters are too short for trigrams and search by prefix. Pass the
+        returned cursor back to fetch the next page.
+        """
+        if mode not in self.SEARCH_MODES:
+            return 400, f"mode must be one of {', '.join(self.SEARCH_MODES)}", None, False
+        if len(query) < 3:
+            mode = 'prefix'
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode())) if cursor else None
+        except ValueError:
+            return 400, "Invalid cursor", None, False
+        if position is not None:
+            # prefix pages resume after a (name, id); ranked pages at an offset
+            valid = (isinstance(position, list) and len(position) == 2) if mode == 'prefix' else isinstance(position, int)
+            if not valid:
+                return 400, "Invalid cursor", None, False
+
+        def select_prefix(conn):
+            after_name, after_id = position if position else ('', 0)
+            return conn.execute('''
+                SELECT id, name, quantity FROM items
+                WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE
+                  AND (name COLLATE NOCASE, id) > (?, ?)
+                ORDER BY name COLLATE NOCASE, id
+                LIMIT ?
+            ''', (query, query + '\U0010ffff', after_name, after_id, limit + 1)).fetchall(), False
+
+        def select_ranked(conn):
+            offset = int(position or 0)
+            if not self.fts_enabled:
+                pattern = '%' + like_escape(query) + '%'
+                return conn.execute('''
+                    SELECT id, name, quantity FROM items WHERE name LIKE ? ESCAPE '\\'
+                    ORDER BY length(name), name LIMIT ? OFFSET ?
+                ''', (pattern, limit + 1, offset)).fetchall(), False
+            if mode == 'substring':
+                # bm25 would score every match; instead take the first
+                # SEARCH_CANDIDATES matches from the index and put names that
+                # start with the query, then shorter names, first
+                phrase = self._fts_phrase(query)
+                candidates = conn.execute(
+                    'SELECT count(*) FROM (SELECT rowid FROM items_fts WHERE items_fts MATCH ? LIMIT ?)',
+                    (phrase, self.SEARCH_CANDIDATES + 1)).fetchone()[0]
+                rows = conn.execute('''
+                    SELECT i.id, i.name, i.quantity
+                    FROM (SELECT rowid FROM items_fts WHERE items_fts MATCH ? LIMIT ?) f
+                    JOIN items i ON i.id = f.rowid
+                    ORDER BY i.name NOT LIKE ? ESCAPE '\\', length(i.name), i.name COLLATE NOCASE
+                    LIMIT ? OFFSET ?
+                ''', (phrase, self.SEARCH_CANDIDATES, like_escape(query) + '%',
+                      limit + 1, offset)).fetchall()
+                return rows, candidates > self.SEARCH_CANDIDATES
+            # fuzzy: any shared trigram matches; bm25 ranks names sharing the
+            # most (and rarest) trigrams first
+            folded = query.lower()
+            trigrams = dict.fromkeys(folded[i:i + 3] for i in range(len(folded) - 2))
+            return conn.execute('''
+                SELECT i.id, i.name, i.quantity
+                FROM (SELECT rowid, rank FROM items_fts WHERE items_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?) f
+                JOIN items i ON i.id = f.rowid
+                ORDER BY f.rank
+            ''', (' OR '.join(self._fts_phrase(t) for t in trigrams), limit + 1, offset)).fetchall(), False
+
+        def load():
+            rows, truncated = self.run(select_prefix if mode == 'prefix' else select_ranked)
+            next_position = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_position = [rows[-1][1], rows[-1][0]] if mode == 'prefix' else int(position or 0) + limit
+            next_cursor = (base64.urlsafe_b64encode(json.dumps(next_position).encode()).decode()
+                           if next_position is not None else None)
+            return rows, next_cursor, truncated
+
+        try:
+            rows, next_cursor, truncated = self._cached(('search', query, mode, limit, cursor), load)
+            return 200, rows, next_cursor, truncated
+        except sqlite3.Error as e:
+            return 500, f"Database error: {str(e)}", None, False
+
+    # Log tables as seen by get_logs: action -> (table, timestamp column, quantity columns)
+    LOG_SOURCES = {
+        'delete': ('delete_log', 'deleted_at', 'quantity, NULL'),
+        'update': ('item_log', 'updated_at', 'old_quantity, new_quantity'),
+    }
+
+    @staticmethod
+    def encode_log_cursor(row):
+        """Turn the last row of a page into an opaque cursor for the next one."""
+        action, id_, _, _, _, ts = row
+        return base64.urlsafe_b64encode(json.dumps([ts, action, id_]).encode()).decode()
+
+    @staticmethod
+    def decode_log_cursor(cursor):
+        ts, action, id_ = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(ts), str(action), int(id_)
+
+    def log_query(self, action='all', item=None, _from=None, _to=None, cursor=None, limit=100):
+        """Build the SQL behind get_logs; returns (sql, params).
+
+        Raises ValueError for an unknown action or a malformed cursor.
+        """
+        if action == 'all':
+            actions = sorted(self.LOG_SOURCES)
+        elif action in self.LOG_SOURCES:
+            actions = [action]
+        else:
+            raise ValueError(f"Unknown action: {action}")
+        try:
+            after = self.decode_log_cursor(cursor) if cursor else None
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor") from None
+
+        branches, params = [], []
+        for name in actions:
+            table, ts, quantities = self.LOG_SOURCES[name]
+            where, args = [], []
+            if item:
+                where.append('item_name = ?')
+                args.append(item)
+            if _from:
+                where.append(f'{ts} >= ?')
+                args.append(_from)
+            if _to:
+                where.append(f'{ts} <= ?')
+                args.append(_to)
+            if after:
+                after_ts, after_action, after_id = after
+                if name == after_action:
+                    where.append(f'({ts}, id) > (?, ?)')
+                    args += [after_ts, after_id]
+                else:
+                    where.append(f'{ts} > ?' if name < after_action else f'{ts} >= ?')
+                    args.append(after_ts)
+            condition = f"WHERE {' AND '.join(where)}" if where else ''
+            branches.append(
+                f"SELECT * FROM (SELECT '{name}' AS action, id, item_name, {quantities}, {ts} AS ts "
+                f"FROM {table} {condition} ORDER BY {ts}, id LIMIT ?)"
+            )
+            params += args + [limit]
+
+        return ' UNION ALL '.join(branches) + ' ORDER BY ts, action, id LIMIT ?', params + [limit]
+
+    def get_logs(self, action='all', item=None, _from=None, _to=None, cursor=None, limit=100):
+        """Retrieve one page of audit log entries in (timestamp, action, id) order.
+
+        ``action`` is 'update', 'delete' or 'all'. Every filter is answered
+        from the timestamp or (item_name, timestamp) index of each log table.
+        Returns (status, rows, next_cursor); rows are
+        (action, id, item_name, old_quantity, new_quantity, timestamp).
+        """
+        try:
+            query, params = self.log_query(action, item, _from, _to, cursor, limit)
+        except ValueError as e:
+            return 400, str(e), None
+
+        def select(conn):
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+        try:
+            rows = self.run(select)
+            next_cursor = self.encode_log_cursor(rows[-1]) if len(rows) == limit else None
+            return 200, rows, next_cursor
+        except sqlite3.Error as e:
+            return 500, f"Database error: {str(e)}", None
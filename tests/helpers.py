@@ -0,0 +1,29 @@
+"""Shared setup for the database tests."""
+
+
+def add(db, count, prefix='item'):
+    status, _ = db.add_items([{'name': f'{prefix}_{i:05d}', 'quantity': i} for i in range(count)])
+    assert status == 201
+
+
+def prune_changes(db, through_version):
+    """Delete item_changes rows up to a version, as log retention does."""
+    def delete(conn):
+        conn.execute('DELETE FROM item_changes WHERE version <= ?', (through_version,))
+        conn.commit()
+    db.run(delete)
+
+
+def quantities(db):
+    return {row[1]: row[2] for row in db.get_all_items()}
+
+
+def collect_pages(fetch):
+    """Follow fetch(cursor) -> (rows, next_cursor) to the end; returns (rows, pages)."""
+    rows, cursor, pages = [], None, 0
+    while True:
+        page, cursor = fetch(cursor)
+        rows += page
+        pages += 1
+        if cursor is None:
+            return rows, pages
@@ -0,0 +1,58 @@
+import pytest
+
+from helpers import add, quantities
+
+
+class TestBatches:
+    def test_atomic_batch_rolls_back_on_any_failure(self, db):
+        add(db, 2)
+        before = (quantities(db), db.get_version())
+        status, results = db.update_qtys([
+            {'name': 'item_00000', 'quantity': 10},
+            {'name': 'missing', 'quantity': 1},
+            {'name': 'item_00001', 'quantity': 11},
+        ])
+        assert status == 400
+        assert [r['status'] for r in results] == [409, 404, 409]
+        assert (quantities(db), db.get_version()) == before
+
+    def test_non_atomic_batch_applies_the_valid_items(self, db):
+        add(db, 2)
+        status, results = db.update_qtys([
+            {'name': 'item_00000', 'quantity': 10},
+            {'name': 'missing', 'quantity': 1},
+        ], atomic=False)
+        assert status == 207
+        assert [r['status'] for r in results] == [200, 404]
+        assert quantities(db) == {'item_00000': 10, 'item_00001': 1}
+
+    def test_duplicate_names_in_one_add_fail_the_batch(self, db):
+        status, results = db.add_items([{'name': 'a', 'quantity': 1}, {'name': 'a', 'quantity': 2}])
+        assert status == 400
+        assert quantities(db) == {}
+
+    def test_atomic_adjustments_roll_back(self, db):
+        add(db, 1)
+        status, results = db.adjust_qtys([
+            {'name': 'item_00000', 'delta': 5},
+            {'name': 'item_00000', 'delta': -100, 'min': 0},
+        ])
+        assert status == 400
+        assert quantities(db) == {'item_00000': 0}
+
+    def test_removing_the_same_name_twice_reports_the_second_as_missing(self, db):
+        add(db, 2)
+        status, results = db.remove_items([{'name': 'item_00000'}, {'name': 'item_00000'}], atomic=False)
+        assert status == 207
+        assert [r['status'] for r in results] == [200, 404]
+        assert quantities(db) == {'item_00001': 1}
+
+    @pytest.mark.parametrize('returning', [True, False])
+    def test_adjust_with_and_without_returning(self, db, returning):
+        db.RETURNING_SUPPORTED = returning and db.RETURNING_SUPPORTED
+        add(db, 1)
+        assert db.adjust_qty({'name': 'item_00000', 'delta': 4}) == (200, 4)
+        status, _ = db.adjust_qty({'name': 'item_00000', 'delta': -5, 'min': 0})
+        assert status == 409
+        assert db.adjust_qty({'name': 'missing', 'delta': 1}) == (404, "Item not found")
+        assert quantities(db) == {'item_00000': 4}
@@ -0,0 +1,55 @@
+import json
+import time
+
+from change_feed import ChangeFeed, encode_event
+
+
+def events(subscription, count, timeout=2.0):
+    received = []
+    while len(received) < count:
+        item = subscription.get(timeout)
+        assert item is not None, f'only {len(received)} of {count} events arrived'
+        received.append(item)
+    return received
+
+
+def test_encode_event():
+    event = encode_event((7, 3, 'crate', 'update', 5))
+    lines = event.split('\n')
+    assert lines[:2] == ['id: 7', 'event: change'] and event.endswith('\n\n')
+    assert json.loads(lines[2][len('data: '):]) == {'version': 7, 'id': 3, 'name': 'crate', 'op': 'update',
+                                                    'quantity': 5}
+
+
+def test_subscriber_gets_changes_made_after_subscribing(db):
+    db.add_items([{'name': 'old', 'quantity': 1}])
+    feed = ChangeFeed(db, poll_interval=0.05)
+    subscription = feed.subscribe()
+    db.add_items([{'name': 'crate', 'quantity': 2}])
+    db.update_qty({'name': 'crate', 'quantity': 3})
+    (v1, e1), (v2, e2) = events(subscription, 2)
+    assert v2 == v1 + 1 == db.get_version()
+    assert [json.loads(e.split('data: ')[1])['quantity'] for e in (e1, e2)] == [2, 3]
+    feed.unsubscribe(subscription)
+    assert feed.subscriber_count() == 0
+
+
+def test_subscribers_are_capped(db):
+    feed = ChangeFeed(db, poll_interval=0.05, max_subscribers=1)
+    subscription = feed.subscribe()
+    assert subscription is not None
+    assert feed.subscribe() is None
+    feed.unsubscribe(subscription)
+
+
+def test_full_buffer_marks_the_subscription_overflowed(db):
+    feed = ChangeFeed(db, poll_interval=0.05, buffer_size=2)
+    subscription = feed.subscribe()
+    db.add_items([{'name': f'item_{i}', 'quantity': i} for i in range(3)])
+    deadline = time.monotonic() + 2
+    while not subscription.overflowed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The buffer kept the first two events; the third did not fit
+    assert subscription.overflowed
+    assert [version for version, _ in events(subscription, 2)] == [1, 2]
+    feed.unsubscribe(subscription)
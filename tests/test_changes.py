@@ -0,0 +1,22 @@
+from helpers import add
+
+
+class TestChangesSince:
+    def test_returns_latest_change_per_item(self, db):
+        add(db, 3)
+        db.update_qty({'name': 'item_00000', 'quantity': 7})
+        status, changes = db.get_changes_since(0)
+        assert status == 200
+        assert [(c[2], c[3], c[4]) for c in changes] == [
+            ('item_00001', 'insert', 1), ('item_00002', 'insert', 2), ('item_00000', 'update', 7)]
+
+    def test_up_to_date_caller_gets_nothing(self, db):
+        add(db, 3)
+        assert db.get_changes_since(db.get_version()) == (200, [])
+
+    def test_empty_database(self, db):
+        assert db.get_changes_since(0) == (200, [])
+
+    def test_version_ahead_of_the_database(self, db):
+        add(db, 3)
+        assert db.get_changes_since(db.get_version() + 1)[0] == 410
@@ -0,0 +1,87 @@
+import gzip
+import io
+import json
+import zlib
+
+import pytest
+
+from compression import BodyTooLarge, GzipMiddleware, gunzip_stream
+
+
+def echo_app(environ, start_response):
+    body = environ['wsgi.input'].read(int(environ.get('CONTENT_LENGTH') or 0))
+    start_response('200 OK', [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))])
+    return [body]
+
+
+def stream_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'application/x-ndjson')])
+    return [b'{}\n' * 1000]
+
+
+def call(app, body=b'', **headers):
+    environ = {'wsgi.input': io.BytesIO(body), 'CONTENT_LENGTH': str(len(body)),
+               **{f'HTTP_{k.upper()}': v for k, v in headers.items()}}
+    response = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        response['status'] = int(status[:3])
+        response['headers'] = dict(response_headers)
+
+    response['body'] = b''.join(app(environ, start_response))
+    return response
+
+
+def test_gunzip_stream_reads_concatenated_members():
+    data = gzip.compress(b'a' * 100) + gzip.compress(b'b' * 100)
+    assert gunzip_stream(io.BytesIO(data), len(data), 1000) == b'a' * 100 + b'b' * 100
+
+
+def test_gunzip_stream_stops_at_the_size_limit():
+    data = gzip.compress(b'\0' * 100_000)
+    with pytest.raises(BodyTooLarge):
+        gunzip_stream(io.BytesIO(data), len(data), 1000)
+
+
+def test_gunzip_stream_rejects_a_truncated_body():
+    data = gzip.compress(b'x' * 1000)[:-10]
+    with pytest.raises(zlib.error):
+        gunzip_stream(io.BytesIO(data), len(data), 10_000)
+
+
+def test_gzip_request_body_is_decompressed():
+    payload = json.dumps([{'name': 'crate', 'quantity': 1}]).encode()
+    response = call(GzipMiddleware(echo_app), gzip.compress(payload), content_encoding='gzip')
+    assert response['status'] == 200 and response['body'] == payload
+
+
+def test_bad_request_bodies():
+    app = GzipMiddleware(echo_app, max_body_size=100)
+    assert call(app, b'not gzip', content_encoding='gzip')['status'] == 400
+    response = call(app, gzip.compress(b' ' * 1000), content_encoding='gzip')
+    assert response['status'] == 413
+    assert json.loads(response['body']) == {'error': 'Decompressed body exceeds 100 bytes'}
+
+
+def test_large_response_is_compressed_for_clients_that_accept_gzip():
+    payload = b'[' + b'0,' * 1000 + b'0]'
+    response = call(GzipMiddleware(echo_app, min_size=1024), payload, accept_encoding='gzip, br')
+    assert response['headers']['Content-Encoding'] == 'gzip'
+    assert response['headers']['Content-Length'] == str(len(response['body']))
+    assert gzip.decompress(response['body']) == payload
+
+
+@pytest.mark.parametrize('app, body, expected, headers', [
+    (echo_app, b'x' * 5000, b'x' * 5000, {}),
+    (echo_app, b'[0]', b'[0]', {'accept_encoding': 'gzip'}),
+    (stream_app, b'', b'{}\n' * 1000, {'accept_encoding': 'gzip'}),
+])
+def test_response_passes_through(app, body, expected, headers):
+    response = call(GzipMiddleware(app, min_size=1024), body, **headers)
+    assert 'Content-Encoding' not in response['headers'] and response['body'] == expected
+
+
+def test_response_compression_can_be_turned_off():
+    payload = b'x' * 5000
+    response = call(GzipMiddleware(echo_app, min_size=None), payload, accept_encoding='gzip')
+    assert 'Content-Encoding' not in response['headers'] and response['body'] == payload
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+import fault_injection
+from fault_injection import FaultInjectionMiddleware, FaultRule, install, load_fault_config
+
+
+def ok_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'ok']
+
+
+def call(app, path='/items', **headers):
+    environ = {'PATH_INFO': path, **{f'HTTP_{k.upper()}': v for k, v in headers.items()}}
+    response = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        response['status'] = int(status[:3])
+
+    body = b''.join(app(environ, start_response))
+    return response['status'], body
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(fault_injection.time, 'sleep', slept.append)
+    return slept
+
+
+def test_nothing_to_inject_leaves_the_app_unwrapped():
+    assert install(ok_app) is ok_app
+
+
+def test_first_matching_rule_wins(sleeps):
+    app = install(ok_app, [
+        FaultRule(route='/items', latency={'distribution': 'fixed', 'ms': 20}),
+        FaultRule(route='*', error_rate=1.0),
+    ])
+    assert call(app, '/items') == (200, b'ok')
+    assert sleeps == [0.02]
+    status, body = call(app, '/other')
+    assert status == 503 and json.loads(body) == {'error': 'Injected error'}
+
+
+def test_delay_past_the_timeout_answers_504(sleeps):
+    app = install(ok_app, [FaultRule(latency={'distribution': 'fixed', 'ms': 500}, timeout_ms=100)])
+    assert call(app)[0] == 504
+    assert sleeps == [0.1]
+
+
+def test_header_faults_are_clamped(sleeps):
+    app = FaultInjectionMiddleware(ok_app, allow_headers=True, max_header_delay_ms=250)
+    assert call(app, x_fault_delay_ms='60000') == (200, b'ok')
+    assert call(app, x_fault_error_rate='1', x_fault_status='418')[0] == 418
+    assert sleeps == [0.25]
+
+
+def test_headers_are_ignored_unless_allowed(sleeps):
+    app = FaultInjectionMiddleware(ok_app, [FaultRule(route='/never')])
+    assert call(app, x_fault_delay_ms='1000', x_fault_error_rate='1') == (200, b'ok')
+    assert sleeps == []
+
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError):
+        FaultRule(latency={'distribution': 'pareto'}).sample_delay_ms()
+
+
+def test_load_fault_config(tmp_path):
+    path = tmp_path / 'faults.json'
+    path.write_text(json.dumps({
+        'allow_headers': True,
+        'max_header_delay_ms': 100,
+        'rules': [{'route': '/add-*', 'error_rate': 0.5, 'error_status': 500}],
+    }))
+    rules, allow_headers, max_header_delay_ms = load_fault_config(str(path))
+    assert [(r.route, r.error_rate, r.error_status) for r in rules] == [('/add-*', 0.5, 500)]
+    assert (allow_headers, max_header_delay_ms) == (True, 100.0)
@@ -0,0 +1,84 @@
+from flask import Flask, jsonify
+
+from metrics import Counter, Histogram, MetricsRegistry, SQLObserver, instrument_app
+from sqlDB import SQLiteDB
+
+
+def test_counter_renders_one_line_per_series():
+    counter = Counter('hits_total', 'Hits', ['route'])
+    counter.inc('/a')
+    counter.inc('/a', amount=2)
+    counter.inc('say "hi"\n')
+    assert counter.render() == ['# HELP hits_total Hits', '# TYPE hits_total counter',
+                                'hits_total{route="/a"} 3', 'hits_total{route="say \\"hi\\"\\n"} 1']
+
+
+def test_series_past_the_cap_are_folded_into_other():
+    counter = Counter('hits_total', 'Hits', ['route'], max_series=2)
+    for route in ('/a', '/b', '/c', '/d', '/a'):
+        counter.inc(route)
+    assert counter.render()[2:] == ['hits_total{route="/a"} 2', 'hits_total{route="/b"} 1',
+                                    'hits_total{route="other"} 2']
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.render()[2:] == ['latency_seconds_bucket{le="0.1"} 2', 'latency_seconds_bucket{le="1.0"} 3',
+                                      'latency_seconds_bucket{le="+Inf"} 4', 'latency_seconds_sum 3.65',
+                                      'latency_seconds_count 4']
+
+
+def test_registry_renders_metrics_and_collectors():
+    registry = MetricsRegistry()
+    registry.gauge('open', 'Open things').inc()
+    registry.add_collector(lambda: [('pool_size', 'gauge', 'Pool size', 4)])
+    assert registry.render().splitlines()[-3:] == ['# HELP pool_size Pool size', '# TYPE pool_size gauge',
+                                                   'pool_size 4']
+
+
+def test_operation_name_and_fingerprint():
+    observer = SQLObserver(MetricsRegistry())
+
+    def select():
+        pass
+    select.__qualname__ = 'SQLiteDB.get_item.<locals>.select'
+    assert observer.operation_name(select) == 'get_item'
+    assert observer.fingerprint('SELECT *\n  FROM items WHERE id IN (?, ?,?)') == 'SELECT * FROM items WHERE id IN (?+)'
+
+
+def test_observer_times_database_operations_and_slow_statements(tmp_path):
+    registry = MetricsRegistry()
+    observer = SQLObserver(registry, slow_query_ms=0)
+    db = SQLiteDB(str(tmp_path / 'observed.db'), observer=observer)
+    try:
+        observer.reset_thread_sql_time()
+        db.add_items([{'name': 'crate', 'quantity': 1}])
+        db.get_item('crate')
+    finally:
+        db.close()
+    text = registry.render()
+    assert 'sqlite_operation_seconds_count{operation="get_item"} 1' in text
+    assert observer.thread_sql_time() > 0
+    assert observer.slow_queries and 'sqlite_slow_queries_total' in text
+
+
+def test_instrument_app_records_requests_by_route():
+    registry = MetricsRegistry()
+    app = Flask(__name__)
+    instrument_app(app, registry)
+
+    @app.route('/items/<int:item_id>')
+    def item(item_id):
+        return jsonify({'id': item_id})
+
+    client = app.test_client()
+    client.get('/items/1')
+    client.get('/items/2')
+    client.get('/missing')
+    text = registry.render()
+    assert 'http_requests_total{route="/items/<int:item_id>",method="GET",status="200"} 2' in text
+    assert 'http_requests_total{route="unmatched",method="GET",status="404"} 1' in text
+    assert 'http_requests_in_flight{route="/items/<int:item_id>"} 0' in text
+    assert 'http_json_encode_seconds_count{route="/items/<int:item_id>"} 2' in text
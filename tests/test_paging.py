@@ -0,0 +1,66 @@
+from helpers import add, collect_pages
+
+
+class TestItemPages:
+    def test_item_pages_cover_every_row_once(self, db):
+        add(db, 25)
+        seen, after_id = [], 0
+        while True:
+            page = db.get_items_page(10, after_id)
+            if not page:
+                break
+            seen += [row[1] for row in page]
+            after_id = page[-1][0]
+        assert seen == [f'item_{i:05d}' for i in range(25)]
+
+    def test_iter_items_reads_batches_without_holding_a_connection(self, db):
+        add(db, 25)
+        rows = db.iter_items(after_id=3, batch_size=10)
+        first = next(rows)
+        # Between batches the pool has its connection back
+        assert db.pool.stats()['in_use'] == 0
+        assert [first[1]] + [row[1] for row in rows] == [f'item_{i:05d}' for i in range(3, 25)]
+
+    def test_iter_items_sees_rows_added_after_its_batch(self, db):
+        add(db, 4)
+        rows = db.iter_items(batch_size=2)
+        names = [next(rows)[1], next(rows)[1]]
+        db.add_items([{'name': 'late', 'quantity': 1}])
+        names += [row[1] for row in rows]
+        assert names == ['item_00000', 'item_00001', 'item_00002', 'item_00003', 'late']
+
+
+class TestLogPages:
+    def test_log_pages_split_rows_with_the_same_timestamp(self, db):
+        # Every row below shares a one-second CURRENT_TIMESTAMP, so pages
+        # can only be told apart by the (action, id) tie-breakers
+        add(db, 12)
+        db.update_qtys([{'name': f'item_{i:05d}', 'quantity': 100 + i} for i in range(12)])
+        db.remove_items([{'name': f'item_{i:05d}'} for i in range(0, 12, 2)])
+
+        def fetch(cursor):
+            status, rows, next_cursor = db.get_logs(cursor=cursor, limit=5)
+            assert status == 200
+            return rows, next_cursor
+
+        rows, pages = collect_pages(fetch)
+        status, everything, _ = db.get_logs(limit=1000)
+        assert rows == everything
+        assert len(rows) == 18 and pages == 4
+        assert len({(row[0], row[1]) for row in rows}) == len(rows)
+
+    def test_log_pages_keep_filters(self, db):
+        add(db, 3)
+        for quantity in range(7):
+            db.update_qty({'name': 'item_00001', 'quantity': quantity + 10})
+        db.update_qty({'name': 'item_00002', 'quantity': 99})
+
+        def fetch(cursor):
+            status, rows, next_cursor = db.get_logs(action='update', item='item_00001', cursor=cursor, limit=3)
+            return rows, next_cursor
+
+        rows, _ = collect_pages(fetch)
+        assert [row[4] for row in rows] == list(range(10, 17))
+
+    def test_invalid_log_cursor(self, db):
+        assert db.get_logs(cursor='not-a-cursor')[0] == 400
@@ -0,0 +1,81 @@
+import sqlite3
+import threading
+
+import pytest
+
+from sqlDB import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), size=2, timeout=0.05)
+    yield pool
+    pool.close()
+
+
+def test_released_connection_is_reused(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert pool.stats() == {'size': 2, 'open': 1, 'idle': 0, 'in_use': 1}
+
+
+def test_size_bounds_open_connections(pool):
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    with pytest.raises(sqlite3.OperationalError, match='Timed out'):
+        pool.acquire()
+    assert pool.stats() == {'size': 2, 'open': 2, 'idle': 0, 'in_use': 2}
+
+
+def test_waiter_gets_a_connection_released_by_another_thread(pool):
+    pool.timeout = 5
+    first, second = pool.acquire(), pool.acquire()
+    timer = threading.Timer(0.05, pool.release, (second,))
+    timer.start()
+    try:
+        assert pool.acquire() is second
+    finally:
+        timer.join()
+    pool.release(first)
+
+
+def test_release_rolls_back_an_open_transaction(pool):
+    conn = pool.acquire()
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.execute('INSERT INTO t VALUES (1)')
+    assert conn.in_transaction
+    pool.release(conn)
+    conn = pool.acquire()
+    assert not conn.in_transaction
+    assert conn.execute('SELECT COUNT(*) FROM t').fetchone() == (0,)
+
+
+def test_stale_broken_connection_is_replaced(pool):
+    pool.health_check_interval = 0
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert replacement.execute('SELECT 1').fetchone() == (1,)
+    assert pool.stats()['open'] == 1
+
+
+def test_close_closes_idle_and_later_released_connections(pool):
+    idle, checked_out = pool.acquire(), pool.acquire()
+    pool.release(idle)
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        idle.execute('SELECT 1')
+    with pytest.raises(sqlite3.ProgrammingError, match='closed'):
+        pool.acquire()
+    pool.release(checked_out)
+    with pytest.raises(sqlite3.ProgrammingError):
+        checked_out.execute('SELECT 1')
+    assert pool.stats()['open'] == 0
+
+
+def test_size_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        ConnectionPool(str(tmp_path / 'pool.db'), size=0)
@@ -0,0 +1,80 @@
+import pytest
+
+from read_cache import ReadCache
+from sqlDB import SQLiteDB
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+def test_hit_at_the_same_version():
+    cache, load = ReadCache(), Loader()
+    assert cache.get_or_load('all', 1, load) == 1
+    assert cache.get_or_load('all', 1, load) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_new_version_reloads():
+    cache, load = ReadCache(), Loader()
+    cache.get_or_load('all', 1, load)
+    assert cache.get_or_load('all', 2, load) == 2
+
+
+def test_expired_entry_reloads():
+    cache, load = ReadCache(ttl=0), Loader()
+    cache.get_or_load('all', 1, load)
+    assert cache.get_or_load('all', 1, load) == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ReadCache(max_entries=2)
+    for key in ('a', 'b'):
+        cache.get_or_load(key, 1, lambda: key)
+    cache.get_or_load('a', 1, Loader())
+    cache.get_or_load('c', 1, lambda: 'c')
+    load = Loader()
+    assert cache.get_or_load('a', 1, load) == 'a'
+    cache.get_or_load('b', 1, load)
+    assert load.calls == 1
+    assert cache.stats()['evictions'] == 2
+
+
+def test_stats():
+    cache = ReadCache(max_entries=8, ttl=5)
+    cache.get_or_load('a', 1, Loader())
+    cache.get_or_load('a', 1, Loader())
+    stats = cache.stats()
+    assert {k: stats[k] for k in ('entries', 'max_entries', 'ttl', 'hits', 'misses', 'hit_rate')} == {
+        'entries': 1, 'max_entries': 8, 'ttl': 5, 'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+
+@pytest.fixture
+def cached_db(tmp_path):
+    db = SQLiteDB(str(tmp_path / 'cached.db'), cache=ReadCache())
+    yield db
+    db.close()
+
+
+def test_write_invalidates_cached_reads(cached_db):
+    cached_db.add_items([{'name': 'crate', 'quantity': 1}])
+    assert [row[2] for row in cached_db.get_all_items()] == [1]
+    cached_db.update_qty({'name': 'crate', 'quantity': 5})
+    assert [row[2] for row in cached_db.get_all_items()] == [5]
+
+
+def test_write_from_another_process_invalidates_by_version(cached_db):
+    cached_db.add_items([{'name': 'crate', 'quantity': 1}])
+    cached_db.get_all_items()
+    # A second SQLiteDB stands in for another worker: it cannot clear this cache
+    other = SQLiteDB(cached_db.db_path)
+    try:
+        other.update_qty({'name': 'crate', 'quantity': 9})
+    finally:
+        other.close()
+    assert [row[2] for row in cached_db.get_all_items()] == [9]
@@ -0,0 +1,68 @@
+import io
+import json
+import logging
+
+import pytest
+from flask import Flask, jsonify, request
+
+from request_log import JSONFormatter, RequestLogger
+
+
+class RecordFormatter(JSONFormatter):
+    """Same output, but not JSONFormatter itself, so records are built and formatted one by one."""
+
+
+def stream_handler(formatter):
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(formatter)
+    return handler
+
+
+@pytest.fixture
+def request_log_name(request):
+    return f'test_{request.node.name}'
+
+
+@pytest.fixture
+def logged_app(request_log_name):
+    fast, slow = stream_handler(JSONFormatter()), stream_handler(RecordFormatter())
+    logger = RequestLogger(name=request_log_name, body_limit=8, handlers=[fast, slow])
+    app = Flask(__name__)
+
+    @app.route('/add-items', methods=['POST'])
+    def add_items():
+        return jsonify({'count': len(request.get_json())}), 201
+
+    logger.install(app)
+
+    def lines():
+        logger.stop()
+        return ([json.loads(line) for line in handler.stream.getvalue().splitlines()] for handler in (fast, slow))
+
+    yield app.test_client(), lines
+    logger.stop()
+
+
+def test_batched_lines_match_records(logged_app):
+    client, lines = logged_app
+    client.post('/add-items', json=[{'name': 'crate', 'quantity': 1}])
+    client.get('/missing')
+    fast, slow = lines()
+    for entry in fast + slow:
+        entry.pop('duration_ms')
+    assert fast == slow
+    assert [(e['msg'], e['level'], e['path']) for e in fast] == [
+        ('POST /add-items 201', 'INFO', '/add-items'),
+        ('GET unmatched 404', 'WARNING', '/missing'),
+    ]
+    assert fast[0]['request_bytes'] == len(b'[{"name": "crate", "quantity": 1}]')
+    assert fast[0]['body'].startswith('[{"name"') and fast[0]['body'].endswith('more bytes]')
+
+
+def test_bad_content_length_is_logged_as_null(logged_app):
+    client, lines = logged_app
+    client.get('/missing', headers={'Content-Length': 'lots'})
+    client.get('/missing')
+    fast, slow = lines()
+    assert [e['request_bytes'] for e in fast] == [None, None]
+    assert len(slow) == 2
@@ -0,0 +1,78 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from helpers import add, prune_changes
+from log_retention import LogRetention, RetentionPolicy
+
+
+def log_rows(db, table):
+    return db.run(lambda conn: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0])
+
+
+def update_all(db, count, quantity):
+    db.update_qtys([{'name': f'item_{i:05d}', 'quantity': quantity} for i in range(count)])
+
+
+class TestPrunedChanges:
+    def test_pruned_history_is_gone(self, db):
+        add(db, 5)
+        prune_changes(db, 3)
+        assert db.get_changes_since(2)[0] == 410
+        status, changes = db.get_changes_since(3)
+        assert status == 200
+        assert [c[0] for c in changes] == [4, 5]
+
+    def test_emptied_change_table_while_inventory_moved_on(self, db):
+        add(db, 3)
+        prune_changes(db, db.get_version())
+        assert db.get_changes_since(1)[0] == 410
+        assert db.get_changes_since(db.get_version()) == (200, [])
+
+
+class TestLogRetention:
+    def test_max_rows_summarizes_the_oldest_rows(self, db):
+        add(db, 5)
+        update_all(db, 5, 10)
+        expired = LogRetention(db, RetentionPolicy(max_rows=2), batch_size=2, pause=0).run_once()
+        assert expired['item_log'] == 3
+        assert log_rows(db, 'item_log') == 2
+        events, net_change = db.run(lambda conn: conn.execute(
+            "SELECT SUM(events), SUM(net_change) FROM log_daily_summary WHERE action = 'update'").fetchone())
+        # item_00000..item_00002 went from 0, 1 and 2 to 10
+        assert (events, net_change) == (3, 27)
+
+    def test_max_rows_prunes_the_change_feed(self, db):
+        add(db, 5)
+        LogRetention(db, RetentionPolicy(max_rows=2, mode='drop'), pause=0).run_once()
+        assert log_rows(db, 'item_changes') == 2
+        assert db.get_changes_since(0)[0] == 410
+        assert db.get_changes_since(3)[0] == 200
+
+    def test_max_age_expires_everything_older(self, db):
+        add(db, 3)
+        update_all(db, 3, 7)
+        db.remove_items([{'name': 'item_00000'}])
+        later = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=2)
+        expired = LogRetention(db, RetentionPolicy(max_age_days=1, mode='drop'), pause=0).run_once(now=later)
+        assert expired == {'item_log': 3, 'delete_log': 1, 'item_changes': 7}
+        assert log_rows(db, 'item_log') == log_rows(db, 'delete_log') == 0
+
+    def test_archive_moves_rows_to_the_archive_file(self, db, tmp_path):
+        add(db, 4)
+        update_all(db, 4, 100)
+        archive_path = str(tmp_path / 'archive.db')
+        LogRetention(db, RetentionPolicy(max_rows=1, mode='archive', archive_path=archive_path), pause=0).run_once()
+        assert log_rows(db, 'item_log') == 1
+        with sqlite3.connect(archive_path) as archive:
+            assert archive.execute('SELECT COUNT(*) FROM item_log').fetchone() == (3,)
+
+    def test_archive_cannot_be_the_database(self, db):
+        with pytest.raises(ValueError):
+            LogRetention(db, RetentionPolicy(mode='archive', archive_path=db.db_path))
+
+    @pytest.mark.parametrize('kwargs', [{'mode': 'shred'}, {'mode': 'archive'}])
+    def test_invalid_policy(self, kwargs):
+        with pytest.raises(ValueError):
+            RetentionPolicy(**kwargs)
@@ -0,0 +1,58 @@
+import pytest
+
+from helpers import add, collect_pages
+
+
+class TestSearchPages:
+    @pytest.mark.parametrize('mode', ['prefix', 'substring'])
+    def test_search_pages(self, db, mode):
+        add(db, 23, prefix='crate')
+
+        def fetch(cursor):
+            status, rows, next_cursor, truncated = db.search_items('crate', mode=mode, limit=10, cursor=cursor)
+            assert status == 200 and not truncated
+            return rows, next_cursor
+
+        rows, pages = collect_pages(fetch)
+        assert sorted(row[1] for row in rows) == [f'crate_{i:05d}' for i in range(23)]
+        assert len(rows) == 23 and pages == 3
+
+
+class TestSubstringCandidates:
+    def test_broad_query_is_flagged_truncated(self, db):
+        if not db.fts_enabled:
+            pytest.skip('SQLite built without FTS5 trigram support')
+        add(db, db.SEARCH_CANDIDATES + 50, prefix='box')
+        rows, cursor = [], None
+        while True:
+            status, page, cursor, truncated = db.search_items('box', limit=500, cursor=cursor)
+            assert status == 200 and truncated
+            rows += page
+            if cursor is None:
+                break
+        assert len(rows) == db.SEARCH_CANDIDATES
+
+    def test_query_within_the_window_is_complete(self, db):
+        if not db.fts_enabled:
+            pytest.skip('SQLite built without FTS5 trigram support')
+        add(db, db.SEARCH_CANDIDATES, prefix='box')
+        status, rows, cursor, truncated = db.search_items('box', limit=db.SEARCH_CANDIDATES)
+        assert status == 200
+        assert len(rows) == db.SEARCH_CANDIDATES and cursor is None and not truncated
+
+
+class TestSearchModes:
+    def test_unknown_mode(self, db):
+        assert db.search_items('crate', mode='regex')[0] == 400
+
+    def test_short_query_searches_by_prefix(self, db):
+        db.add_items([{'name': 'ab_crate', 'quantity': 1}, {'name': 'crab', 'quantity': 1}])
+        status, rows, _, _ = db.search_items('ab')
+        assert status == 200 and [row[1] for row in rows] == ['ab_crate']
+
+    def test_fuzzy_matches_a_typo(self, db):
+        if not db.fts_enabled:
+            pytest.skip('SQLite built without FTS5 trigram support')
+        db.add_items([{'name': 'wooden_crate', 'quantity': 1}, {'name': 'barrel', 'quantity': 1}])
+        status, rows, _, _ = db.search_items('woodne_crate', mode='fuzzy')
+        assert status == 200 and [row[1] for row in rows] == ['wooden_crate']
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from transform_codec import FORMAT_VERSION, HEADER, MAGIC, decode_transforms, encode_transforms, transforms_from_json
+
+
+def test_round_trip():
+    ids = ['crate', 'barrel', 'café', '']
+    rng = np.random.default_rng(0)
+    location, rotation, scale = (rng.standard_normal((len(ids), 3)).astype('<f4') for _ in range(3))
+    batch = decode_transforms(encode_transforms(ids, location, rotation, scale))
+    assert batch.ids == ids
+    np.testing.assert_array_equal(batch.location, location)
+    np.testing.assert_array_equal(batch.rotation, rotation)
+    np.testing.assert_array_equal(batch.scale, scale)
+
+
+def test_round_trip_empty():
+    batch = decode_transforms(encode_transforms([], np.empty((0, 3)), np.empty((0, 3)), np.empty((0, 3))))
+    assert len(batch) == 0
+
+
+@pytest.mark.parametrize('body', [
+    b'',
+    b'XXXX' + bytes(8),
+    encode_transforms(['a'], [[0, 0, 0]], [[0, 0, 0]], [[1, 1, 1]])[:-1],
+])
+def test_malformed_payloads(body):
+    with pytest.raises(ValueError):
+        decode_transforms(body)
+
+
+def test_decoded_arrays_are_views_over_the_body():
+    body = encode_transforms(['crate'], [[1, 2, 3]], [[0, 0, 0]], [[1, 1, 1]])
+    batch = decode_transforms(body)
+    assert not batch.location.flags.writeable
+    assert np.shares_memory(batch.location, np.frombuffer(body, dtype=np.uint8))
+
+
+def test_wrong_version_is_rejected():
+    body = bytearray(encode_transforms(['a'], [[0, 0, 0]], [[0, 0, 0]], [[1, 1, 1]]))
+    HEADER.pack_into(body, 0, MAGIC, FORMAT_VERSION + 1, 1)
+    with pytest.raises(ValueError, match='version 1'):
+        decode_transforms(bytes(body))
+
+
+def replace_id_table(body, count, offsets, blob):
+    names_start = HEADER.size + 9 * 4 * count
+    return body[:names_start] + np.asarray(offsets, dtype='<u4').tobytes() + blob
+
+
+@pytest.mark.parametrize('offsets, blob', [
+    ([0, 2, 1], b'ab'),   # offsets go backwards
+    ([1, 1, 2], b'ab'),   # does not start at 0
+    ([0, 1, 3], b'ab'),   # runs past the blob
+])
+def test_bad_id_table(offsets, blob):
+    body = encode_transforms(['a', 'b'], np.zeros((2, 3)), np.zeros((2, 3)), np.ones((2, 3)))
+    with pytest.raises(ValueError, match='id table'):
+        decode_transforms(replace_id_table(body, 2, offsets, blob))
+
+
+def test_ids_must_be_utf8():
+    body = encode_transforms(['a'], [[0, 0, 0]], [[0, 0, 0]], [[1, 1, 1]])
+    with pytest.raises(ValueError, match='UTF-8'):
+        decode_transforms(replace_id_table(body, 1, [0, 1], b'\xff'))
+
+
+def test_json_leaves_missing_fields_nan():
+    batch = transforms_from_json([{'item_name': 'crate', 'position': [1, 2, 3]}])
+    assert batch.ids == ['crate']
+    np.testing.assert_array_equal(batch.location[0], [1, 2, 3])
+    assert np.isnan(batch.scale[0]).all()
+
+
+@pytest.mark.parametrize('value', [5, [1], [1, 2], [1, 2, 3, 4], ['1', 2, 3], [True, 0, 0], None])
+def test_json_rejects_anything_but_three_numbers(value):
+    with pytest.raises(ValueError):
+        transforms_from_json([{'object': 'crate', 'scale': value}])
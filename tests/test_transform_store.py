@@ -0,0 +1,91 @@
+import numpy as np
+
+from transform_codec import TransformBatch, transforms_from_json
+from transform_store import TransformStore
+
+
+def batch(ids, location, rotation=None, scale=None):
+    def column(values, default):
+        if values is None:
+            return np.full((len(ids), 3), default, dtype=np.float32)
+        return np.asarray(values, dtype=np.float32).reshape(len(ids), 3)
+    return TransformBatch(list(ids), column(location, 0.0), column(rotation, 0.0), column(scale, 1.0))
+
+
+def test_update_and_get():
+    store = TransformStore()
+    assert store.update(batch(['a', 'b'], [[1, 2, 3], [4, 5, 6]]), now=10) == 2
+    assert len(store) == 2
+    assert store.get('a') == {'id': 'a', 'updated_at': 10.0, 'location': [1, 2, 3],
+                              'rotation': [0, 0, 0], 'scale': [1, 1, 1]}
+    assert store.get('missing') is None
+
+
+def test_missing_components_keep_the_previous_value():
+    store = TransformStore()
+    store.update(batch(['a'], [[1, 2, 3]], [[4, 5, 6]]))
+    store.update(transforms_from_json([{'object': 'a', 'rotation': [7, 8, 9]}]))
+    entry = store.get('a')
+    assert (entry['location'], entry['rotation']) == ([1, 2, 3], [7, 8, 9])
+
+
+def test_store_grows_past_its_capacity():
+    store = TransformStore(capacity=2)
+    ids = [f'obj_{i}' for i in range(5)]
+    store.update(batch(ids, [[i, 0, 0] for i in range(5)]))
+    assert len(store) == 5
+    assert [store.get(name)['location'][0] for name in ids] == [0, 1, 2, 3, 4]
+
+
+def test_select_box_and_nearest():
+    store = TransformStore()
+    store.update(batch(['a', 'b', 'c'], [[0, 0, 0], [5, 5, 5], [1, 1, 1]]))
+    assert [e['id'] for e in store.select_box([-1, -1, -1], [2, 2, 2])] == ['a', 'c']
+    assert [e['id'] for e in store.select_box([-1, -1, -1], [2, 2, 2], limit=1)] == ['a']
+    nearest = store.nearest([4, 4, 4], n=2)
+    assert [e['id'] for e in nearest] == ['b', 'c']
+    assert abs(nearest[0]['distance'] - np.sqrt(3)) < 1e-6
+    assert TransformStore().nearest([0, 0, 0]) == []
+
+
+def test_history_keeps_the_latest_updates():
+    store = TransformStore(history_size=2)
+    for t in range(3):
+        store.update(batch(['a'], [[t, 0, 0]]), now=t)
+    history = store.get('a', history=True)['history']
+    assert [(h['updated_at'], h['location'][0]) for h in history] == [(1.0, 1.0), (2.0, 2.0)]
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'transforms.npz')
+    store = TransformStore()
+    store.update(batch(['a', 'b'], [[1, 2, 3], [4, 5, 6]]), now=10)
+    store.save(path)
+    restored = TransformStore()
+    assert restored.load(path) == 2
+    assert restored.get('b') == store.get('b')
+    assert TransformStore().load(str(tmp_path / 'missing.npz')) == 0
+
+
+def test_repeated_id_merges_its_entries():
+    store = TransformStore()
+    objects = [{'object': 'a', 'position': [1, 1, 1]}, {'object': 'a', 'rotation': [2, 2, 2]},
+               {'object': 'b', 'position': [3, 3, 3]}, {'object': 'a', 'position': [4, 4, 4]}]
+    assert store.update(transforms_from_json(objects)) == 2
+    entry = store.get('a')
+    assert (entry['location'], entry['rotation'], entry['scale']) == ([4, 4, 4], [2, 2, 2], [1, 1, 1])
+    assert store.get('b')['location'] == [3, 3, 3]
+
+
+def test_snapshot_saves_only_after_a_change(tmp_path):
+    path = str(tmp_path / 'transforms.npz')
+    store = TransformStore()
+    assert not store.snapshot(path)
+    store.update(batch(['a'], [[1, 2, 3]]))
+    assert store.snapshot(path)
+    assert not store.snapshot(path)
+    store.update(batch(['b'], [[4, 5, 6]]))
+    store.start_snapshots(path, interval=60)
+    store.stop_snapshots(path)
+    restored = TransformStore()
+    assert restored.load(path) == 2
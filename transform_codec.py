@@ -0,0 +1,98 @@
+import struct
+
+import numpy as np
+
+CONTENT_TYPE = 'application/x-dcc-transforms'
+MAGIC = b'DCCT'
+FORMAT_VERSION = 1
+
+# magic, format version, object count
+HEADER = struct.Struct('<4sII')
+FIELDS = ('location', 'rotation', 'scale')
+
+
+class TransformBatch:
+    """Transforms of many objects as three (N, 3) float32 arrays plus their ids.
+
+    ``ids`` is the item_name of each object, or its Blender name when it
+    does not stand in for an item. Values a JSON sender left out are NaN.
+    """
+
+    def __init__(self, ids, location, rotation, scale):
+        self.ids = ids
+        self.location = location
+        self.rotation = rotation
+        self.scale = scale
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def encode_transforms(ids, location, rotation, scale):
+    """Pack a batch into the binary wire format.
+
+    Layout, all little-endian: a 12-byte header (b'DCCT', version, count N),
+    float32 location[N][3], rotation[N][3] and scale[N][3], then the id
+    table as uint32 offsets[N + 1] into a UTF-8 blob of the ids.
+    """
+    names = [str(i).encode('utf-8') for i in ids]
+    offsets = np.zeros(len(names) + 1, dtype='<u4')
+    np.cumsum([len(n) for n in names], out=offsets[1:])
+    arrays = [np.asarray(a, dtype='<f4').reshape(len(names), 3) for a in (location, rotation, scale)]
+    return b''.join([HEADER.pack(MAGIC, FORMAT_VERSION, len(names))]
+                    + [a.tobytes() for a in arrays]
+                    + [offsets.tobytes()] + names)
+
+
+def decode_transforms(body):
+    """Unpack the binary wire format into a TransformBatch.
+
+    The float arrays are read-only views over ``body`` (no copy). Raises
+    ValueError on a malformed payload.
+    """
+    if len(body) < HEADER.size:
+        raise ValueError("Payload is shorter than the header")
+    magic, version, count = HEADER.unpack_from(body)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Not a version 1 transform payload")
+    floats_end = HEADER.size + 9 * 4 * count
+    names_start = floats_end + 4 * (count + 1)
+    if len(body) < names_start:
+        raise ValueError("Payload is truncated")
+
+    floats = np.frombuffer(body, dtype='<f4', count=9 * count, offset=HEADER.size).reshape(3, count, 3)
+    offsets = np.frombuffer(body, dtype='<u4', count=count + 1, offset=floats_end)
+    if offsets[0] != 0 or np.any(np.diff(offsets.astype(np.int64)) < 0) or names_start + int(offsets[-1]) != len(body):
+        raise ValueError("Bad id table")
+    blob = memoryview(body)[names_start:]
+    try:
+        ids = [bytes(blob[a:b]).decode('utf-8') for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+    except UnicodeDecodeError:
+        raise ValueError("Ids are not UTF-8")
+    return TransformBatch(ids, floats[0], floats[1], floats[2])
+
+
+def transforms_from_json(objects):
+    """Build a TransformBatch from the JSON bodies DCC_send produces.
+
+    Each object needs an "item_name" or "object" id; "position", "rotation"
+    and "scale" are optional 3-element lists. Raises ValueError otherwise.
+    """
+    ids = []
+    columns = {field: np.full((len(objects), 3), np.nan, dtype='<f4') for field in FIELDS}
+    for i, obj in enumerate(objects):
+        if not isinstance(obj, dict):
+            raise ValueError(f"Object {i} is not a JSON object")
+        name = obj.get('item_name') or obj.get('object')
+        if not name:
+            raise ValueError(f"Object {i} has no item_name or object")
+        ids.append(str(name))
+        for field, key in zip(FIELDS, ('position', 'rotation', 'scale')):
+            if key in obj:
+                value = obj[key]
+                # Assigning to the row would broadcast a scalar or a 1-element list
+                if (not isinstance(value, (list, tuple)) or len(value) != 3
+                        or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)):
+                    raise ValueError(f"Object {i} has an invalid {key}: expected 3 numbers")
+                columns[field][i] = value
+    return TransformBatch(ids, columns['location'], columns['rotation'], columns['scale'])
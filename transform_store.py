@@ -0,0 +1,231 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from transform_codec import TransformBatch
+
+DEFAULTS = {'location': 0.0, 'rotation': 0.0, 'scale': 1.0}
+
+logger = logging.getLogger('dcc.transform_store')
+
+
+class TransformStore:
+    """Latest transform of every object, kept in growable (N, 3) float32 columns.
+
+    Rows are addressed by id (an item_name or Blender object name) through
+    a dict; everything else is plain numpy so that box selection,
+    nearest-N and export stay vectorized with hundreds of thousands of
+    objects. With ``history_size`` > 0 the most recent updates of all
+    objects are also kept in a ring buffer of that many entries.
+    """
+
+    def __init__(self, capacity=1024, history_size=0):
+        self._lock = threading.Lock()
+        self.ids = []
+        self.rows = {}
+        self.count = 0
+        self.columns = {field: np.full((capacity, 3), value, dtype=np.float32) for field, value in DEFAULTS.items()}
+        self.updated_at = np.zeros(capacity, dtype=np.float64)
+        self.history_size = history_size
+        self.history_rows = np.full(history_size, -1, dtype=np.int64)
+        self.history_time = np.zeros(history_size, dtype=np.float64)
+        self.history_values = np.zeros((history_size, 9), dtype=np.float32)
+        self.history_next = 0
+        self.changes = 0
+        self._saved_changes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, needed):
+        capacity = len(self.updated_at)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for field, value in DEFAULTS.items():
+            column = np.full((capacity, 3), value, dtype=np.float32)
+            column[:self.count] = self.columns[field][:self.count]
+            self.columns[field] = column
+        updated_at = np.zeros(capacity, dtype=np.float64)
+        updated_at[:self.count] = self.updated_at[:self.count]
+        self.updated_at = updated_at
+
+    def _row_indices(self, ids):
+        """Rows for ``ids``, appending rows for ids not seen before."""
+        indices = np.empty(len(ids), dtype=np.int64)
+        new_ids = []
+        for i, name in enumerate(ids):
+            row = self.rows.get(name)
+            if row is None:
+                row = self.count + len(new_ids)
+                self.rows[name] = row
+                new_ids.append(name)
+            indices[i] = row
+        if new_ids:
+            self._grow(self.count + len(new_ids))
+            self.ids.extend(new_ids)
+            self.count += len(new_ids)
+        return indices
+
+    def update(self, batch, now=None):
+        """Store a TransformBatch; NaN components keep the object's previous value."""
+        if not len(batch):
+            return 0
+        now = time.time() if now is None else now
+        with self._lock:
+            rows, fields = _merge_duplicates(self._row_indices(batch.ids), batch)
+            for field, values in fields.items():
+                column = self.columns[field]
+                column[rows] = np.where(np.isnan(values), column[rows], values)
+            self.updated_at[rows] = now
+            self.changes += 1
+            if self.history_size:
+                self._record_history(rows, now)
+        return len(rows)
+
+    def _record_history(self, rows, now):
+        rows = rows[-self.history_size:]
+        slots = (self.history_next + np.arange(len(rows))) % self.history_size
+        self.history_rows[slots] = rows
+        self.history_time[slots] = now
+        self.history_values[slots] = np.hstack([self.columns[field][rows] for field in DEFAULTS])
+        self.history_next = int((self.history_next + len(rows)) % self.history_size)
+
+    def _describe(self, row):
+        entry = {'id': self.ids[row], 'updated_at': float(self.updated_at[row])}
+        for field in DEFAULTS:
+            entry[field] = self.columns[field][row].tolist()
+        return entry
+
+    def get(self, name, history=False):
+        """The latest transform of ``name`` as a dict, or None if it was never sent."""
+        with self._lock:
+            row = self.rows.get(name)
+            if row is None:
+                return None
+            entry = self._describe(row)
+            if history and self.history_size:
+                slots = np.flatnonzero(self.history_rows == row)
+                slots = slots[np.argsort(self.history_time[slots], kind='stable')]
+                entry['history'] = [
+                    {'updated_at': float(self.history_time[slot]),
+                     'location': self.history_values[slot, 0:3].tolist(),
+                     'rotation': self.history_values[slot, 3:6].tolist(),
+                     'scale': self.history_values[slot, 6:9].tolist()}
+                    for slot in slots
+                ]
+            return entry
+
+    def select_box(self, low, high, limit=None):
+        """Ids of the objects whose location lies inside the box [low, high]."""
+        low = np.asarray(low, dtype=np.float32)
+        high = np.asarray(high, dtype=np.float32)
+        with self._lock:
+            location = self.columns['location'][:self.count]
+            rows = np.flatnonzero(np.all((location >= low) & (location <= high), axis=1))
+            if limit is not None:
+                rows = rows[:limit]
+            return [self._describe(row) for row in rows]
+
+    def nearest(self, point, n=10):
+        """The ``n`` objects closest to ``point``, nearest first, with their distance."""
+        point = np.asarray(point, dtype=np.float32)
+        with self._lock:
+            if not self.count or n <= 0:
+                return []
+            distances = np.sum((self.columns['location'][:self.count] - point) ** 2, axis=1)
+            n = min(n, self.count)
+            rows = np.argpartition(distances, n - 1)[:n]
+            rows = rows[np.argsort(distances[rows], kind='stable')]
+            return [dict(self._describe(row), distance=float(np.sqrt(distances[row]))) for row in rows]
+
+    def export(self):
+        """A copy of every stored transform as a TransformBatch."""
+        with self._lock:
+            return TransformBatch(list(self.ids), *(self.columns[field][:self.count].copy() for field in DEFAULTS))
+
+    def save(self, path):
+        """Write the latest transforms (not the history) to an .npz file."""
+        batch = self.export()
+        with self._lock:
+            updated_at = self.updated_at[:self.count].copy()
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, ids=np.array(batch.ids, dtype=str), location=batch.location,
+                 rotation=batch.rotation, scale=batch.scale, updated_at=updated_at)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Merge the transforms saved at ``path`` into the store, if the file exists."""
+        if not os.path.exists(path):
+            return 0
+        with np.load(path) as data:
+            batch = TransformBatch(data['ids'].tolist(), data['location'], data['rotation'], data['scale'])
+            updated_at = data['updated_at']
+        self.update(batch)
+        with self._lock:
+            self.updated_at[[self.rows[name] for name in batch.ids]] = updated_at
+            self._saved_changes = self.changes
+        return len(batch)
+
+    def start_snapshots(self, path, interval=60.0):
+        """Save to ``path`` every ``interval`` seconds (when something changed) on a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._snapshot_loop, args=(path, interval),
+                                        name='transform-snapshots', daemon=True)
+        self._thread.start()
+
+    def _snapshot_loop(self, path, interval):
+        while not self._stop.wait(interval):
+            self.snapshot(path)
+
+    def snapshot(self, path):
+        """Save to ``path`` if the store changed since the last snapshot."""
+        changes = self.changes
+        if changes == self._saved_changes:
+            return False
+        try:
+            self.save(path)
+        except OSError:
+            logger.exception("Error saving the transform store")
+            return False
+        self._saved_changes = changes
+        return True
+
+    def stop_snapshots(self, path):
+        """Stop the snapshot thread and take a final snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.snapshot(path)
+
+
+def _merge_duplicates(rows, batch):
+    """Fold repeated ids in a batch into one row each.
+
+    Fancy assignment with repeated indices keeps an arbitrary one of them,
+    so an id sent twice (say once with a position, once with a rotation)
+    could lose the earlier values to the later entry's NaNs. Per row and
+    component, the last non-NaN value in batch order wins instead.
+    """
+    fields = {field: getattr(batch, field) for field in DEFAULTS}
+    unique, inverse = np.unique(rows, return_inverse=True)
+    if len(unique) == len(rows):
+        return rows, fields
+    positions = np.arange(len(rows))[:, None]
+    merged = {}
+    for field, values in fields.items():
+        values = np.asarray(values, dtype=np.float32)
+        last = np.full((len(unique), 3), -1, dtype=np.int64)
+        np.maximum.at(last, inverse, np.where(np.isnan(values), -1, positions))
+        picked = values[np.maximum(last, 0), np.arange(3)]
+        merged[field] = np.where(last >= 0, picked, np.float32(np.nan))
+    return unique, merged